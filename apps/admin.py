@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.db.models import Count, Avg
 from .models import (
-    App, AppVersion, AppScreenshot, CopyrightClaim, 
-    CopyrightInfringementReport, CopyrightDisputeResolution, CopyrightVerificationToken
+    ApkBlob, App, AppCompliance, AppVersion, AppScreenshot, CopyrightClaim, 
+    CopyrightInfringementReport, CopyrightDisputeResolution, CopyrightVerificationToken,
+    SearchQueryLog, PopularSearchQuery
 )
 
 
@@ -13,9 +14,17 @@ class AppScreenshotInline(admin.TabularInline):
     ordering = ('order',)
 
 
+class AppComplianceInline(admin.StackedInline):
+    model = AppCompliance
+    can_delete = False
+    classes = ('collapse',)
+    raw_id_fields = ('copyright_verified_by', 'source_verified_by')
+    verbose_name_plural = 'Copyright & Compliance'
+
+
 @admin.register(App)
 class AppAdmin(admin.ModelAdmin):
-    inlines = [AppScreenshotInline]
+    inlines = [AppScreenshotInline, AppComplianceInline]
     list_display = (
         "title",
         "category",
@@ -45,7 +54,10 @@ class AppAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
         "release_date",
-        "get_total_reviews"
+        "avg_rating",
+        "total_ratings",
+        "get_total_reviews",
+        "get_rating_histogram"
     )
     
     fieldsets = (
@@ -74,7 +86,7 @@ class AppAdmin(admin.ModelAdmin):
             "fields": ("is_free", "price", "has_iap")
         }),
         ("📊 Metrics & Analytics", {
-            "fields": ("downloads", "install_count", "avg_rating", "total_ratings", "get_total_reviews")
+            "fields": ("downloads", "install_count", "avg_rating", "total_ratings", "get_total_reviews", "get_rating_histogram")
         }),
         ("🔗 Content & Attribution", {
             "fields": ("source_url",)
@@ -106,12 +118,15 @@ class AppAdmin(admin.ModelAdmin):
     get_downloads.admin_order_field = "downloads"
     
     def get_total_reviews(self, obj):
-        """Get total reviews from related reviews"""
-        from reviews.models import Review
-        count = Review.objects.filter(app=obj).count()
-        return count
+        """Denormalized review count (see reviews/stats.py)"""
+        return obj.review_count
     get_total_reviews.short_description = "Total Reviews"
     
+    def get_rating_histogram(self, obj):
+        """Star histogram, 5 down to 1"""
+        return " · ".join(f"{stars}★ {count}" for stars, count, _ in obj.rating_histogram)
+    get_rating_histogram.short_description = "Rating Histogram"
+    
     @admin.action(description="✅ Publish selected apps")
     def publish_apps(self, request, queryset):
         updated = queryset.update(is_published=True)
@@ -157,7 +172,7 @@ class AppVersionAdmin(admin.ModelAdmin):
             "fields": ("description", "size_mb")
         }),
         ("⬇️ Download", {
-            "fields": ("download_link", "file_hash")
+            "fields": ("apk_file", "download_link", "file_hash")
         }),
         ("✅ Status", {
             "fields": ("is_active", "released_at")
@@ -170,6 +185,29 @@ class AppVersionAdmin(admin.ModelAdmin):
         return queryset.select_related("app")
 
 
+@admin.register(ApkBlob)
+class ApkBlobAdmin(admin.ModelAdmin):
+    """Stored app binaries - maintained by uploads and gc_apk_blobs"""
+    list_display = ("name", "package_name", "version_name", "size", "ref_count", "metadata_status", "created_at")
+    list_filter = ("metadata_status", "ref_count")
+    search_fields = ("sha256", "name", "package_name", "signing_cert_sha256")
+    readonly_fields = (
+        "sha256", "name", "size", "ref_count", "created_at", "updated_at",
+        "package_name", "version_name", "version_code", "min_sdk", "target_sdk",
+        "native_abis", "signing_cert_sha256", "icon", "metadata_error", "processed_at",
+    )
+    ordering = ("-created_at",)
+    actions = ["reprocess_metadata"]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description="🔄 Extract metadata again")
+    def reprocess_metadata(self, request, queryset):
+        updated = queryset.update(metadata_status="pending")
+        self.message_user(request, f"{updated} file(s) queued for process_apks.")
+
+
 @admin.register(AppScreenshot)
 class AppScreenshotAdmin(admin.ModelAdmin):
     list_display = ('app', 'order', 'caption', 'created_at')
@@ -376,3 +414,22 @@ class CopyrightVerificationTokenAdmin(admin.ModelAdmin):
             "classes": ("collapse",)
         }),
     )
+
+
+@admin.register(SearchQueryLog)
+class SearchQueryLogAdmin(admin.ModelAdmin):
+    """Read-only view of the batched search query log"""
+    list_display = ("query", "source", "date", "count", "result_count")
+    list_filter = ("source", "date")
+    search_fields = ("query",)
+    date_hierarchy = "date"
+    readonly_fields = ("query", "source", "date", "count", "result_count")
+
+
+@admin.register(PopularSearchQuery)
+class PopularSearchQueryAdmin(admin.ModelAdmin):
+    """Top queries from the last rollup_search_queries run"""
+    list_display = ("rank", "query", "search_count", "result_count", "updated_at")
+    search_fields = ("query",)
+    ordering = ("rank",)
+    readonly_fields = ("query", "rank", "search_count", "result_count", "updated_at")
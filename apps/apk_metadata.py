@@ -0,0 +1,340 @@
+"""
+APK metadata extraction.
+
+``extract_metadata(path)`` reads what uploaders used to type by hand,
+straight from the APK:
+
+- AndroidManifest.xml (binary XML): package, versionCode, versionName,
+  minSdkVersion, targetSdkVersion and the application icon resource
+- resources.arsc: resolves resource references (icon file, a versionName
+  given as @string/...)
+- signing certificate SHA-256: APK Signature Scheme v2/v3 block, falling
+  back to the v1 JAR signature (META-INF/*.RSA|DSA|EC)
+- native ABIs (lib/<abi>/*.so)
+- the launcher icon, as PNG bytes
+
+It has no Django dependencies and returns plain data, so it runs in the
+worker processes of ``manage.py process_apks``.
+"""
+from io import BytesIO
+import hashlib
+import re
+import struct
+import zipfile
+
+# Chunk types (frameworks/base/libs/androidfw/include/androidfw/ResourceTypes.h)
+RES_STRING_POOL_TYPE = 0x0001
+RES_TABLE_TYPE = 0x0002
+RES_XML_TYPE = 0x0003
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+RES_TABLE_PACKAGE_TYPE = 0x0200
+RES_TABLE_TYPE_TYPE = 0x0201
+
+UTF8_FLAG = 0x100
+NO_ENTRY = 0xFFFFFFFF
+TYPE_REFERENCE = 0x01
+TYPE_STRING = 0x03
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+
+# android:* attribute resource ids (names may be stripped by obfuscators)
+ATTRIBUTE_IDS = {
+    0x01010002: 'icon',
+    0x01010003: 'name',
+    0x0101020c: 'minSdkVersion',
+    0x0101021b: 'versionCode',
+    0x0101021c: 'versionName',
+    0x01010270: 'targetSdkVersion',
+    0x0101052c: 'roundIcon',
+}
+
+APK_SIG_BLOCK_MAGIC = b'APK Sig Block 42'
+SIGNATURE_SCHEME_IDS = (0x1b93ad61, 0xf05368c0, 0x7109871a)  # v3.1, v3, v2
+V1_SIGNATURE_RE = re.compile(r'^META-INF/[^/]+\.(RSA|DSA|EC)$', re.IGNORECASE)
+ABI_RE = re.compile(r'^lib/([^/]+)/[^/]+\.so$')
+BITMAP_EXTENSIONS = ('.png', '.webp', '.jpg', '.jpeg')
+ICON_SIZE = 192
+
+# API level -> Android version, for App.min/target_android_version
+ANDROID_VERSIONS = {
+    21: '5.0', 22: '5.1', 23: '6.0', 24: '7.0', 25: '7.1', 26: '8.0', 27: '8.1',
+    28: '9.0', 29: '10.0', 30: '11.0', 31: '12.0', 32: '12.1', 33: '13.0',
+    34: '14.0', 35: '15.0', 36: '16.0',
+}
+
+
+class ApkParseError(ValueError):
+    """The file is not an APK we can read"""
+
+
+# ==================== BINARY XML / RESOURCE TABLE ====================
+
+def _string_pool(data, offset):
+    """Strings of the pool chunk at ``offset``"""
+    header_size, _ = struct.unpack_from('<HI', data, offset + 2)
+    count, _, flags, strings_start = struct.unpack_from('<IIII', data, offset + 8)
+    utf8 = flags & UTF8_FLAG
+    strings = []
+    for index in range(count):
+        position = offset + strings_start + struct.unpack_from('<I', data, offset + header_size + index * 4)[0]
+        if utf8:
+            for _ in range(2):  # character count, then byte count
+                length = data[position]
+                position += 1
+                if length & 0x80:
+                    length = ((length & 0x7F) << 8) | data[position]
+                    position += 1
+            strings.append(data[position:position + length].decode('utf-8', 'replace'))
+        else:
+            length = struct.unpack_from('<H', data, position)[0]
+            position += 2
+            if length & 0x8000:
+                length = ((length & 0x7FFF) << 16) | struct.unpack_from('<H', data, position)[0]
+                position += 2
+            strings.append(data[position:position + length * 2].decode('utf-16-le', 'replace'))
+    return strings
+
+
+def _chunks(data, start, end):
+    """(type, offset, header size, size) of the chunks between start and end"""
+    offset = start
+    while offset + 8 <= end:
+        chunk_type, header_size, size = struct.unpack_from('<HHI', data, offset)
+        if size < 8:
+            raise ApkParseError("Corrupt resource chunk")
+        yield chunk_type, offset, header_size, size
+        offset += size
+
+
+def parse_binary_xml(data):
+    """[(element name, {attribute name: (type, value)})] in document order"""
+    if len(data) < 8 or struct.unpack_from('<H', data, 0)[0] != RES_XML_TYPE:
+        raise ApkParseError("Not a binary XML file")
+    strings, resource_ids, elements = [], [], []
+    for chunk_type, offset, header_size, size in _chunks(data, struct.unpack_from('<H', data, 2)[0], len(data)):
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = _string_pool(data, offset)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            resource_ids = struct.unpack_from(f'<{(size - header_size) // 4}I', data, offset + header_size)
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            _, name, attr_start, attr_size, attr_count = struct.unpack_from('<IIHHH', data, offset + header_size)
+            attributes = {}
+            for index in range(attr_count):
+                position = offset + header_size + attr_start + index * attr_size
+                _, attr_name, raw_value, _, _, value_type, value = struct.unpack_from('<IIIHBBI', data, position)
+                key = ATTRIBUTE_IDS.get(resource_ids[attr_name]) if attr_name < len(resource_ids) else None
+                key = key or (strings[attr_name] if attr_name < len(strings) else '')
+                if value_type == TYPE_STRING:
+                    value = strings[value] if value < len(strings) else ''
+                elif raw_value != NO_ENTRY and raw_value < len(strings):
+                    value_type, value = TYPE_STRING, strings[raw_value]
+                attributes[key] = (value_type, value)
+            elements.append((strings[name] if name < len(strings) else '', attributes))
+    return elements
+
+
+def parse_resource_table(data):
+    """{resource id: [(density, type, value)]} for the simple (non-bag) entries"""
+    if len(data) < 12 or struct.unpack_from('<H', data, 0)[0] != RES_TABLE_TYPE:
+        raise ApkParseError("Not a resource table")
+    values, entries = [], {}
+    for chunk_type, offset, header_size, size in _chunks(data, struct.unpack_from('<H', data, 2)[0], len(data)):
+        if chunk_type == RES_STRING_POOL_TYPE:
+            values = _string_pool(data, offset)
+        elif chunk_type == RES_TABLE_PACKAGE_TYPE:
+            package_id = struct.unpack_from('<I', data, offset + 8)[0]
+            for inner_type, inner, inner_header, _ in _chunks(data, offset + header_size, offset + size):
+                if inner_type == RES_TABLE_TYPE_TYPE:
+                    _read_type_chunk(data, inner, inner_header, package_id, values, entries)
+    return entries
+
+
+def _read_type_chunk(data, offset, header_size, package_id, values, entries):
+    type_id, flags, _, entry_count, entries_start = struct.unpack_from('<BBHII', data, offset + 8)
+    density = struct.unpack_from('<H', data, offset + 20 + 14)[0]  # ResTable_config.density
+    table = offset + header_size
+    if flags & 0x01:  # FLAG_SPARSE: (entry index, offset / 4) pairs
+        slots = [struct.unpack_from('<HH', data, table + i * 4) for i in range(entry_count)]
+        slots = [(index, entry * 4) for index, entry in slots]
+    elif flags & 0x02:  # FLAG_OFFSET16
+        slots = [(i, struct.unpack_from('<H', data, table + i * 2)[0]) for i in range(entry_count)]
+        slots = [(index, entry * 4) for index, entry in slots if entry != 0xFFFF]
+    else:
+        slots = [(i, struct.unpack_from('<I', data, table + i * 4)[0]) for i in range(entry_count)]
+        slots = [(index, entry) for index, entry in slots if entry != NO_ENTRY]
+    for index, entry_offset in slots:
+        position = offset + entries_start + entry_offset
+        entry_size, entry_flags = struct.unpack_from('<HH', data, position)
+        if entry_flags & 0x0008:  # FLAG_COMPACT: type in the high flag byte, data inline
+            value_type, value = entry_flags >> 8, struct.unpack_from('<I', data, position + 4)[0]
+        elif entry_flags & 0x0001:  # FLAG_COMPLEX: styles, arrays... not needed
+            continue
+        else:
+            value_type, value = struct.unpack_from('<BI', data, position + entry_size + 3)
+        if value_type == TYPE_STRING:
+            value = values[value] if value < len(values) else ''
+        resource_id = (package_id << 24) | (type_id << 16) | index
+        entries.setdefault(resource_id, []).append((density, value_type, value))
+
+
+def _resolve(resources, value_type, value, depth=0):
+    """Follow references to [(density, type, value)] candidates"""
+    if value_type != TYPE_REFERENCE:
+        return [(0, value_type, value)]
+    if depth > 5:
+        return []
+    resolved = []
+    for density, entry_type, entry_value in resources.get(value, ()):
+        for _, final_type, final_value in _resolve(resources, entry_type, entry_value, depth + 1):
+            resolved.append((density, final_type, final_value))
+    return resolved
+
+
+def _density_rank(density):
+    # 0 = default (mdpi), 0xFFFE = anydpi (adaptive XML), 0xFFFF = nodpi
+    return {0: 160, 0xFFFE: 0, 0xFFFF: 1}.get(density, density)
+
+
+# ==================== SIGNING CERTIFICATE ====================
+
+def _length_prefixed(data, offset):
+    length = struct.unpack_from('<I', data, offset)[0]
+    return data[offset + 4:offset + 4 + length], offset + 4 + length
+
+
+def _signing_block_certificate(fileobj):
+    """DER certificate of the first v3.1/v3/v2 signer, or None"""
+    fileobj.seek(0, 2)
+    file_size = fileobj.tell()
+    tail_size = min(file_size, 65535 + 22)
+    fileobj.seek(file_size - tail_size)
+    tail = fileobj.read(tail_size)
+    eocd = tail.rfind(b'PK\x05\x06')
+    if eocd < 0:
+        return None
+    central_directory = struct.unpack_from('<I', tail, eocd + 16)[0]
+    if central_directory < 32:
+        return None
+    fileobj.seek(central_directory - 24)
+    block_size, magic = struct.unpack('<Q16s', fileobj.read(24))
+    if magic != APK_SIG_BLOCK_MAGIC or block_size > central_directory:
+        return None
+    fileobj.seek(central_directory - block_size - 8)
+    block = fileobj.read(block_size - 16)[8:]  # skip the leading size field and the magic
+
+    pairs, offset = {}, 0
+    while offset + 12 <= len(block):
+        length, pair_id = struct.unpack_from('<QI', block, offset)
+        pairs[pair_id] = block[offset + 12:offset + 8 + length]
+        offset += 8 + length
+    for scheme in SIGNATURE_SCHEME_IDS:
+        if scheme in pairs:
+            signers, _ = _length_prefixed(pairs[scheme], 0)
+            signer, _ = _length_prefixed(signers, 0)
+            signed_data, _ = _length_prefixed(signer, 0)
+            _, offset = _length_prefixed(signed_data, 0)  # digests
+            certificates, _ = _length_prefixed(signed_data, offset)
+            certificate, _ = _length_prefixed(certificates, 0)
+            return certificate or None
+    return None
+
+
+def _jar_signature_certificate(archive):
+    """DER certificate from a v1 (JAR) signature, or None"""
+    from cryptography.hazmat.primitives.serialization import Encoding, pkcs7
+
+    for name in archive.namelist():
+        if V1_SIGNATURE_RE.match(name):
+            certificates = pkcs7.load_der_pkcs7_certificates(archive.read(name))
+            if certificates:
+                return certificates[0].public_bytes(Encoding.DER)
+    return None
+
+
+# ==================== ICON ====================
+
+def _icon_png(archive, resources, icon_attribute):
+    """The launcher icon as PNG bytes (largest bitmap density), or None"""
+    names = set(archive.namelist())
+    candidates = []
+    if icon_attribute:
+        candidates = [
+            (_density_rank(density), path)
+            for density, value_type, path in _resolve(resources, *icon_attribute)
+            if value_type == TYPE_STRING and path in names and path.lower().endswith(BITMAP_EXTENSIONS)
+        ]
+    if not candidates:
+        # Adaptive (XML-only) icon or no icon attribute: conventional launcher bitmaps
+        candidates = [
+            (archive.getinfo(name).file_size, name)
+            for name in names
+            if re.match(r'^res/(mipmap|drawable)[^/]*/ic_launcher\.\w+$', name) and name.lower().endswith(BITMAP_EXTENSIONS)
+        ]
+    if not candidates:
+        return None
+
+    from PIL import Image
+
+    _, path = max(candidates)
+    try:
+        with Image.open(BytesIO(archive.read(path))) as image:
+            image = image.convert('RGBA')
+            image.thumbnail((ICON_SIZE, ICON_SIZE))
+            output = BytesIO()
+            image.save(output, format='PNG', optimize=True)
+            return output.getvalue()
+    except (OSError, ValueError):
+        return None
+
+
+# ==================== EXTRACTION ====================
+
+def extract_metadata(path):
+    """
+    Metadata of the APK at ``path``: package_name, version_name, version_code,
+    min_sdk, target_sdk, native_abis, signing_cert_sha256, icon (PNG bytes)
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise ApkParseError(f"Not a valid APK archive: {exc}") from exc
+
+    with archive, open(path, 'rb') as fileobj:
+        try:
+            elements = parse_binary_xml(archive.read('AndroidManifest.xml'))
+        except KeyError:
+            raise ApkParseError("AndroidManifest.xml is missing") from None
+        try:
+            resources = parse_resource_table(archive.read('resources.arsc'))
+        except KeyError:
+            resources = {}
+
+        manifest = next((attrs for name, attrs in elements if name == 'manifest'), {})
+        uses_sdk = next((attrs for name, attrs in elements if name == 'uses-sdk'), {})
+        application = next((attrs for name, attrs in elements if name == 'application'), {})
+
+        def text(attributes, key):
+            if key not in attributes:
+                return ''
+            values = [value for _, value_type, value in _resolve(resources, *attributes[key]) if value_type == TYPE_STRING]
+            return values[0] if values else str(attributes[key][1])
+
+        def number(attributes, key):
+            value_type, value = attributes.get(key, (None, None))
+            if value_type in (TYPE_INT_DEC, TYPE_INT_HEX):
+                return value
+            return int(value) if isinstance(value, str) and value.isdigit() else None
+
+        certificate = _signing_block_certificate(fileobj) or _jar_signature_certificate(archive)
+        min_sdk = number(uses_sdk, 'minSdkVersion')
+        return {
+            'package_name': text(manifest, 'package'),
+            'version_name': text(manifest, 'versionName'),
+            'version_code': number(manifest, 'versionCode'),
+            'min_sdk': min_sdk,
+            'target_sdk': number(uses_sdk, 'targetSdkVersion') or min_sdk,
+            'native_abis': sorted({m.group(1) for m in map(ABI_RE.match, archive.namelist()) if m}),
+            'signing_cert_sha256': hashlib.sha256(certificate).hexdigest() if certificate else '',
+            'icon': _icon_png(archive, resources, application.get('icon') or application.get('roundIcon')),
+        }
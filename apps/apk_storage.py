@@ -0,0 +1,72 @@
+"""
+Content-addressed storage of app binaries.
+
+``App.apk_file`` and ``AppVersion.apk_file`` store files under their
+SHA-256, sharded by digest prefix so no directory grows large:
+
+    apks/3f/a2/3fa2...c9.apk
+
+Saving a file that is already stored (a re-upload of the same build, the
+same APK attached to several versions) writes nothing and returns the
+existing name. Each stored file has an ApkBlob row; its ``ref_count`` is
+kept in step with the App/AppVersion rows pointing at it (apps/signals.py)
+and ``manage.py gc_apk_blobs`` deletes blobs nobody references.
+"""
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+ROOT = 'apks'
+READ_SIZE = 64 * 1024
+BLOB_NAME_RE = re.compile(r'^apks/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(\.\w+)?$')
+
+
+def blob_name(sha256, extension=''):
+    """Storage name of the blob with this digest"""
+    return f'{ROOT}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}'
+
+
+def blob_sha256(name):
+    """Digest encoded in a content-addressed name, or '' for other (legacy) names"""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group('sha256') if match else ''
+
+
+def file_sha256(content):
+    hasher = hashlib.sha256()
+    for chunk in content.chunks(READ_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by their SHA-256. Content with a
+    precomputed ``sha256`` attribute (chunked uploads) is not read again.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name  # _save decides the name; identical content shares it
+
+    def _save(self, name, content):
+        from .models import ApkBlob
+
+        sha256 = getattr(content, 'sha256', '') or file_sha256(content)
+        # Register (and touch) the blob before checking the file: gc_apk_blobs
+        # only deletes blobs left untouched for its grace period
+        blob = ApkBlob.register(sha256, blob_name(sha256, os.path.splitext(name)[1]), content.size)
+        if not self.exists(blob.name):
+            # Write under a unique name, then rename: concurrent uploads of the
+            # same file both succeed, and nobody sees a half-written blob
+            directory, filename = os.path.split(blob.name)
+            temporary = super()._save(os.path.join(directory, f'.{uuid.uuid4().hex}.{filename}'), content)
+            os.replace(self.path(temporary), self.path(blob.name))
+        return blob.name
+
+
+apk_storage = ContentAddressedStorage()
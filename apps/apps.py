@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AppsConfig(AppConfig):
     name = 'apps'
+
+    def ready(self):
+        """Register signals when app is ready"""
+        import apps.signals  # noqa
@@ -0,0 +1,173 @@
+"""
+Typo-tolerant autocomplete for the realtime search box.
+
+PostgreSQL: pg_trgm word similarity over ``title`` and ``developer_name``,
+served from the GIN trigram indexes created in migration 0019.
+Other databases (SQLite in development): an in-process trigram index that
+is rebuilt lazily after App rows are saved or deleted (see apps.signals).
+
+Candidates are ranked by similarity first and nudged by popularity.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from .models import App
+
+
+SUGGESTION_LIMIT = 10
+
+# How many candidates to pull from the index before re-ranking by popularity
+CANDIDATE_LIMIT = 50
+
+# Minimum word similarity for a suggestion (pg_trgm default is 0.6, which
+# misses common typos such as "telegarm")
+SIMILARITY_THRESHOLD = getattr(settings, 'SEARCH_TRIGRAM_THRESHOLD', 0.3)
+
+# Share of the final score that comes from downloads (log scaled)
+POPULARITY_WEIGHT = 0.2
+
+WORD_RE = re.compile(r'[\w\u0980-\u09ff]+')  # \w plus the full Bengali block (vowel signs)
+
+
+def suggest_apps(query, limit=SUGGESTION_LIMIT):
+    """
+    Return up to ``limit`` published apps (as AppCard) whose title or
+    developer name is similar to ``query``, best match first.
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    if connections[App.objects.db].vendor == 'postgresql':
+        candidates = _postgres_candidates(query)
+    else:
+        candidates = trigram_index.search(query)
+
+    ranked = sorted(
+        candidates,
+        key=lambda item: _score(item[1], item[2]),
+        reverse=True,
+    )[:limit]
+
+    apps = {app.id: app for app in App.objects.filter(id__in=[app_id for app_id, _, _ in ranked]).cards()}
+    return [apps[app_id] for app_id, _, _ in ranked if app_id in apps]
+
+
+def _score(similarity, downloads):
+    popularity = min(math.log10((downloads or 0) + 1) / 7, 1.0)  # 10M downloads == 1.0
+    return (1 - POPULARITY_WEIGHT) * similarity + POPULARITY_WEIGHT * popularity
+
+
+def _postgres_candidates(query):
+    """(id, similarity, downloads) rows from the pg_trgm GIN indexes"""
+    with transaction.atomic():
+        with connections[App.objects.db].cursor() as cursor:
+            # is_local=true scopes the threshold to this transaction
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                [str(SIMILARITY_THRESHOLD)],
+            )
+        rows = App.objects.filter(
+            is_published=True,
+        ).filter(
+            Q(title__trigram_word_similar=query) |
+            Q(developer_name__trigram_word_similar=query)
+        ).annotate(
+            similarity=Greatest(
+                TrigramWordSimilarity(query, 'title'),
+                TrigramWordSimilarity(query, 'developer_name'),
+            )
+        ).order_by('-similarity').values_list('id', 'similarity', 'downloads')[:CANDIDATE_LIMIT]
+        return list(rows)
+
+
+# ==================== IN-PROCESS TRIGRAM INDEX ====================
+
+def trigrams(text):
+    """pg_trgm style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _similarity(query_grams, text_grams):
+    if not query_grams or not text_grams:
+        return 0.0
+    shared = len(query_grams & text_grams)
+    return shared / (len(query_grams) + len(text_grams) - shared)
+
+
+def _word_similarity(query_grams, text):
+    """Best similarity of the query against the whole text or any single word"""
+    best = _similarity(query_grams, trigrams(text))
+    for word in WORD_RE.findall(text):
+        best = max(best, _similarity(query_grams, trigrams(word)))
+    return best
+
+
+class TrigramIndex:
+    """
+    Posting-list trigram index over published app titles and developer names.
+    Rebuilt on first use after ``invalidate()``; safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stale = True
+        self._docs = {}
+        self._postings = {}
+
+    def invalidate(self):
+        self._stale = True
+
+    def _build(self):
+        # Cleared first so a write that lands mid-build marks the index stale again
+        self._stale = False
+        docs = {}
+        postings = defaultdict(list)
+        rows = App.objects.filter(is_published=True).values_list(
+            'id', 'title', 'developer_name', 'downloads'
+        )
+        for app_id, title, developer_name, downloads in rows.iterator():
+            docs[app_id] = (title or '', developer_name or '', downloads or 0)
+            for gram in trigrams(title or '') | trigrams(developer_name or ''):
+                postings[gram].append(app_id)
+        self._docs = docs
+        self._postings = dict(postings)
+
+    def search(self, query):
+        """(id, similarity, downloads) rows above the similarity threshold"""
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._build()
+
+        query_grams = trigrams(query)
+        overlap = Counter()
+        for gram in query_grams:
+            overlap.update(self._postings.get(gram, ()))
+
+        results = []
+        for app_id, _ in overlap.most_common(CANDIDATE_LIMIT * 4):
+            title, developer_name, downloads = self._docs[app_id]
+            similarity = max(
+                _word_similarity(query_grams, title),
+                _word_similarity(query_grams, developer_name),
+            )
+            if similarity >= SIMILARITY_THRESHOLD:
+                results.append((app_id, similarity, downloads))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:CANDIDATE_LIMIT]
+
+
+trigram_index = TrigramIndex()
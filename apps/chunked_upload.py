@@ -0,0 +1,201 @@
+"""
+Resumable chunked uploads of app files.
+
+A 500 MB APK in one multipart POST exceeds nginx's body limit, holds a
+sync worker for minutes and restarts from zero when the connection drops.
+Instead the browser (static/js/chunked-upload.js) sends the file in
+ordered chunks (apps/views_uploads.py):
+
+    POST uploads/                       {"filename", "size"}  -> {"id", "offset": 0, "chunk_size"}
+    GET  uploads/<id>/                  -> {"offset", "size", "status"}   resume point
+    POST uploads/<id>/chunk/?offset=N   raw bytes             -> {"offset"}
+    POST uploads/<id>/complete/         {"sha256"?}           -> {"sha256", "file"}
+
+Chunks are appended to a part file in CHUNKED_UPLOAD_DIR (outside
+MEDIA_ROOT) and fed to a SHA-256 hasher as they stream in, so
+``file_hash`` is known without re-reading the file. The hasher lives in
+the worker process that handled the previous chunk; a chunk that lands
+on another worker rebuilds it from the part file (the only re-read).
+A chunk cut off mid-way keeps the bytes that arrived - the client
+resumes from the returned offset. On completion the part file is moved
+(renamed) into the content-addressed APK storage, never loaded into memory.
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+CHUNK_SIZE = 8 * 1024 * 1024  # suggested to clients (well under nginx's client_max_body_size)
+MAX_CHUNK_SIZE = 32 * 1024 * 1024
+READ_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 64
+
+
+class UploadError(Exception):
+    """Rejected upload request; ``status`` is the HTTP status for the JSON response"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class _PartFile(File):
+    """Lets FileSystemStorage move the part file instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.name
+
+
+# ==================== HASHERS ====================
+
+_hashers = OrderedDict()  # session id -> (offset, sha256)
+_hashers_lock = threading.Lock()
+
+
+def _cached_hasher(session):
+    with _hashers_lock:
+        cached = _hashers.pop(session.pk, None)
+    if cached is not None and cached[0] == session.received:
+        return cached[1]
+    # Previous chunk went to another worker (or this one restarted): rebuild from disk
+    hasher = hashlib.sha256()
+    remaining = session.received
+    with open(part_path(session), 'rb') as part:
+        while remaining > 0:
+            data = part.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def _keep_hasher(session, hasher):
+    with _hashers_lock:
+        _hashers[session.pk] = (session.received, hasher)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+
+
+def _forget_hasher(session):
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+
+
+# ==================== SESSIONS ====================
+
+def part_path(session):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{session.pk}.part')
+
+
+def create_session(user, filename, size):
+    """Start an upload of ``size`` bytes; validates like AppUploadForm.clean_apk_file"""
+    from .forms import AppUploadForm
+    from .models import UploadSession
+
+    filename = os.path.basename(filename or '').strip()
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in AppUploadForm.ALLOWED_APP_EXTENSIONS:
+        raise UploadError(f"File format '{ext}' is not allowed. Please use APK, EXE, or IPA.")
+    if size <= 0:
+        raise UploadError("The file is empty.")
+    if size > AppUploadForm.MAX_APK_SIZE:
+        raise UploadError(
+            f"App file is too large. Maximum size is 500 MB. "
+            f"Your file is {size / (1024 * 1024):.2f} MB.",
+            status=413,
+        )
+
+    session = UploadSession.objects.create(owner=user, filename=filename, size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(part_path(session), 'wb').close()
+    return session
+
+
+def write_chunk(session_id, user, offset, stream, length):
+    """
+    Append ``length`` bytes from ``stream`` at ``offset`` (must equal the bytes
+    received so far). Returns the session with the new ``received`` offset.
+    """
+    from .models import UploadSession
+
+    if length <= 0:
+        raise UploadError("Empty chunk.")
+    if length > MAX_CHUNK_SIZE:
+        raise UploadError(f"Chunks are limited to {MAX_CHUNK_SIZE // (1024 * 1024)} MB.", status=413)
+
+    with transaction.atomic():
+        # Row lock: chunks of one upload are written one at a time, across workers
+        session = UploadSession.objects.select_for_update().get(pk=session_id, owner=user)
+        if session.status != 'uploading':
+            raise UploadError("This upload is already complete.", status=409, offset=session.received)
+        if offset != session.received:
+            raise UploadError("Unexpected offset - resume from the returned offset.", status=409, offset=session.received)
+        if offset + length > session.size:
+            raise UploadError("Chunk goes past the declared file size.", offset=session.received)
+
+        hasher = _cached_hasher(session)
+        written = 0
+        try:
+            with open(part_path(session), 'r+b') as part:
+                part.seek(offset)
+                part.truncate()  # bytes of an earlier, unacknowledged attempt
+                while written < length:
+                    data = stream.read(min(READ_SIZE, length - written))
+                    if not data:
+                        break
+                    part.write(data)
+                    hasher.update(data)
+                    written += len(data)
+        except OSError:
+            _forget_hasher(session)  # the hasher may have seen bytes that were not written
+            raise
+
+        session.received = offset + written
+        session.save(update_fields=['received', 'updated_at'])
+    _keep_hasher(session, hasher)
+    return session
+
+
+def complete_upload(session_id, user, expected_sha256=''):
+    """Verify the size (and optional client digest) and move the file into storage"""
+    from .models import App, UploadSession
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, owner=user)
+        if session.status == 'complete':
+            return session
+        if session.received != session.size:
+            raise UploadError("The upload is not finished yet.", status=409, offset=session.received)
+
+        digest = _cached_hasher(session).hexdigest()
+        _forget_hasher(session)
+        if expected_sha256 and expected_sha256.lower() != digest:
+            raise UploadError("Checksum mismatch - the file was corrupted in transit.", status=422)
+
+        # Stored by content (apps/apk_storage.py): a file that is already
+        # stored is not written again, and the digest is not recomputed
+        field = App._meta.get_field('apk_file')
+        with _PartFile(open(part_path(session), 'rb'), name=part_path(session)) as part:
+            part.sha256 = digest
+            session.stored_name = field.storage.save(field.generate_filename(None, session.filename), part)
+        if os.path.exists(part_path(session)):
+            os.remove(part_path(session))  # duplicate content, or copied across filesystems
+
+        session.sha256 = digest
+        session.status = 'complete'
+        session.save(update_fields=['sha256', 'stored_name', 'status', 'updated_at'])
+    return session
+
+
+def discard_session(session):
+    """Delete the session and its part file (unused finished files go with gc_apk_blobs)"""
+    _forget_hasher(session)
+    if os.path.exists(part_path(session)):
+        os.remove(part_path(session))
+    session.delete()
@@ -0,0 +1,146 @@
+"""
+APK file delivery.
+
+``app_download`` authorizes and counts in Django, then hands the file over:
+
+- production (``APK_ACCEL_REDIRECT_PREFIX`` set): an empty response with
+  ``X-Accel-Redirect: <prefix><file name>``; nginx streams the file from
+  an ``internal`` location (nginx_jndroid.conf) with byte ranges,
+  Content-Length and its own validators, without tying up a gunicorn worker
+- otherwise (development): a streaming response from Python with the same
+  headers and single-range support (206 / 416, If-Range)
+
+The ETag uses nginx's format (hex mtime - hex size), so a download resumed
+against either path validates the same way.
+"""
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.utils.text import slugify
+
+APK_CONTENT_TYPE = 'application/vnd.android.package-archive'
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def download_filename(app):
+    """<title>-<version>.<ext> of the uploaded file"""
+    extension = os.path.splitext(app.apk_file.name)[1] or '.apk'
+    name = slugify(app.title) or 'app'
+    if app.version:
+        # Slugify between the dots: 1.0.2 stays 1.0.2, not 102
+        version = '.'.join(filter(None, (slugify(part) for part in app.version.split('.'))))
+        name = f'{name}-{version or app.version}'
+    return f'{name}{extension}'
+
+
+def file_validators(field_file):
+    """(etag, mtime) in nginx's format, or (None, None) if the storage has no local path"""
+    try:
+        stat = os.stat(field_file.path)
+    except (NotImplementedError, OSError):
+        return None, None
+    mtime = int(stat.st_mtime)
+    return f'{mtime:x}-{stat.st_size:x}', mtime
+
+
+def requested_range(request, size, etag):
+    """
+    (start, end) for a satisfiable single "Range: bytes=" request, None to send
+    the whole file, or False if the range cannot be satisfied (416)
+    """
+    header = request.META.get('HTTP_RANGE', '').strip()
+    if not header or size == 0:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and (etag is None or if_range.strip() != quote_etag(etag)):
+        return None  # the file changed since the partial download started
+    match = RANGE_RE.match(header)
+    if not match or match.groups() == ('', ''):
+        return None  # multiple or malformed ranges: ignoring Range is allowed
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            return False
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def is_resumed(request):
+    """True for a Range request that does not start at byte 0 (not a new download)"""
+    header = request.META.get('HTTP_RANGE', '').strip()
+    if not header:
+        return False
+    match = RANGE_RE.match(header)
+    return not (match and match.group(1) == '0')
+
+
+def _read_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        while length > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def serve_apk(request, app):
+    """Response delivering ``app.apk_file`` (see module docstring)"""
+    etag, mtime = file_validators(app.apk_file)
+    filename = download_filename(app)
+
+    not_modified = get_conditional_response(
+        request, etag=quote_etag(etag) if etag else None, last_modified=mtime,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    prefix = getattr(settings, 'APK_ACCEL_REDIRECT_PREFIX', '')
+    if prefix:
+        response = HttpResponse(content_type=APK_CONTENT_TYPE)
+        response['X-Accel-Redirect'] = f'{prefix.rstrip("/")}/{quote(app.apk_file.name)}'
+    else:
+        try:
+            fileobj = app.apk_file.storage.open(app.apk_file.name, 'rb')
+        except OSError:
+            raise Http404('APK file not found')
+        size = fileobj.size
+        byte_range = requested_range(request, size, etag)
+        if byte_range is False:
+            fileobj.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(fileobj, content_type=APK_CONTENT_TYPE)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(fileobj, start, end - start + 1),
+                status=206, content_type=APK_CONTENT_TYPE,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    if etag:
+        response['ETag'] = quote_etag(etag)
+        response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = 'private, no-transform'
+    return response
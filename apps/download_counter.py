@@ -0,0 +1,192 @@
+"""
+Buffered download counter.
+
+A download used to be an ``UPDATE apps_app SET downloads = downloads + 1``
+in its own transaction, serializing a popular release on one row lock.
+Now each download is a single atomic ``cache.incr`` on a per-app running
+total in the shared cache (core/cache_backends.py / Redis), and the totals
+are added to ``App.downloads`` in batches - from a background thread
+FLUSH_INTERVAL seconds after a process counts a download (sooner after
+FLUSH_SIZE downloads), at exit, and by ``manage.py flush_download_counts``
+from cron (jndroid.cron) for processes that died.
+
+Crash safety: the cache only ever holds an increasing total per app. A
+flush adds ``total - flushed_total`` to App.downloads and stores the new
+``flushed_total`` (BufferedDownloadCount) in the same transaction, so a
+flush that crashes or runs twice never loses or double counts a batch.
+Only a lost cache entry loses the downloads not flushed yet.
+
+Reads merge the unflushed part back in:
+
+    download_counter.merge_pending(apps)    # app.downloads += pending
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.buffering import BackgroundFlushMixin
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5  # seconds
+FLUSH_SIZE = 100  # downloads recorded by this process
+TOTAL_KEY = 'downloads:total:'
+FLUSHED_KEY = 'downloads:flushed:'
+
+
+def _total_key(app_id):
+    return f'{TOTAL_KEY}{app_id}'
+
+
+def _flushed_key(app_id):
+    return f'{FLUSHED_KEY}{app_id}'
+
+
+class DownloadCounter(BackgroundFlushMixin):
+    """Per-app download totals in the shared cache, flushed to App.downloads in bulk"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty = set()  # app ids this process counted since its last flush
+        self._recorded = 0
+        self._last_flush = time.monotonic()
+        self._init_background_flush()
+
+    # ==================== WRITES ====================
+
+    def record(self, app_id):
+        """Count one download (one cache round trip, no database write)"""
+        try:
+            cache.incr(_total_key(app_id))
+        except ValueError:
+            self._start_total(app_id)
+            cache.incr(_total_key(app_id))
+
+        with self._lock:
+            self._dirty.add(app_id)
+            self._recorded += 1
+            self._flush_soon(
+                self._recorded >= FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+
+    def flush_interval(self):
+        return FLUSH_INTERVAL
+
+    def has_pending(self):
+        return bool(self._dirty)
+
+    def _start_total(self, app_id):
+        """(Re)create a missing total at the flushed watermark, so deltas stay exact"""
+        from .models import BufferedDownloadCount
+
+        flushed = (
+            BufferedDownloadCount.objects.filter(app_id=app_id)
+            .values_list('flushed_total', flat=True).first()
+        ) or 0
+        if cache.add(_total_key(app_id), flushed, None):
+            cache.set(_flushed_key(app_id), flushed, None)
+
+    def _take(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._recorded = 0
+            self._last_flush = time.monotonic()
+        return dirty
+
+    def flush(self, app_ids=None):
+        """
+        Add unflushed downloads to App.downloads. Flushes the apps this process
+        counted, or ``app_ids``. Returns the number of apps updated.
+        """
+        from .models import App, BufferedDownloadCount
+
+        dirty = self._take() if app_ids is None else set(app_ids)
+        found = cache.get_many([_total_key(app_id) for app_id in dirty])
+        totals = {int(key[len(TOTAL_KEY):]): total for key, total in found.items()}
+        if not totals:
+            return 0
+
+        # A deleted app's counter row would fail the FK check and with it the
+        # whole batch, on every retry; its downloads are dropped
+        existing = set(App.objects.filter(pk__in=totals).values_list('pk', flat=True))
+        deleted = [app_id for app_id in totals if app_id not in existing]
+        if deleted:
+            cache.delete_many([_total_key(app_id) for app_id in deleted] + [_flushed_key(app_id) for app_id in deleted])
+            totals = {app_id: total for app_id, total in totals.items() if app_id in existing}
+            if not totals:
+                return 0
+
+        now = timezone.now()
+        flushed = {}
+        try:
+            with transaction.atomic():
+                BufferedDownloadCount.objects.bulk_create(
+                    [BufferedDownloadCount(app_id=app_id) for app_id in totals],
+                    ignore_conflicts=True,
+                )
+                rows = BufferedDownloadCount.objects.select_for_update().filter(app_id__in=totals)
+                for row in rows:
+                    delta = totals[row.app_id] - row.flushed_total
+                    if delta <= 0:
+                        continue
+                    App.objects.filter(pk=row.app_id).update(downloads=F('downloads') + delta)
+                    row.flushed_total = totals[row.app_id]
+                    row.updated_at = now
+                    flushed[row.app_id] = row
+                BufferedDownloadCount.objects.bulk_update(flushed.values(), ['flushed_total', 'updated_at'])
+        except DatabaseError:
+            # The totals stay in the cache - the next flush picks them up
+            logger.warning("Download counter flush failed for %d apps", len(totals), exc_info=True)
+            if app_ids is None:
+                with self._lock:
+                    self._dirty |= dirty
+            return 0
+
+        cache.set_many({_flushed_key(app_id): row.flushed_total for app_id, row in flushed.items()}, None)
+        return len(flushed)
+
+    # ==================== READS ====================
+
+    def pending(self, app_ids):
+        """{app_id: downloads counted but not yet in App.downloads}"""
+        app_ids = list(app_ids)
+        keys = [_total_key(app_id) for app_id in app_ids] + [_flushed_key(app_id) for app_id in app_ids]
+        values = cache.get_many(keys)
+        pending = {}
+        for app_id in app_ids:
+            total = values.get(_total_key(app_id))
+            flushed = values.get(_flushed_key(app_id))
+            if total is not None and flushed is not None and total > flushed:
+                pending[app_id] = total - flushed
+        return pending
+
+    def merge_pending(self, apps):
+        """Add pending downloads to ``downloads`` of App instances or dicts (with 'id')"""
+        apps = list(apps)
+        pending = self.pending(
+            app['id'] if isinstance(app, dict) else app.pk for app in apps
+        )
+        for app in apps:
+            if isinstance(app, dict):
+                app['downloads'] = (app.get('downloads') or 0) + pending.get(app['id'], 0)
+            else:
+                app.downloads = (app.downloads or 0) + pending.get(app.pk, 0)
+        return apps
+
+
+download_counter = DownloadCounter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        download_counter.flush()
+    except Exception:
+        pass
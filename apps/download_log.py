@@ -0,0 +1,146 @@
+"""
+Download history (AppDownload) ingestion.
+
+``app_download`` only appends the event to a per-process buffer - no
+database write before the redirect. A background thread writes the
+buffer with ``bulk_create`` FLUSH_INTERVAL seconds after an event is
+buffered (sooner after FLUSH_SIZE events) and at process exit, like the
+search log (apps/search_log.py, see core/buffering.py).
+
+Events carry their own timestamp, so batching does not shift
+``downloaded_at``. Anonymous downloads are stored with an empty user.
+The buffer is capped at MAX_BUFFERED events: if the database is down for
+long, the newest events are dropped instead of growing without bound.
+
+``manage.py benchmark_download_log`` measures ingestion throughput.
+"""
+import atexit
+import ipaddress
+import logging
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+from core.buffering import BackgroundFlushMixin
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 10  # seconds
+FLUSH_SIZE = 500  # events
+BATCH_SIZE = 1000  # rows per INSERT
+MAX_BUFFERED = 50000
+MAX_USER_AGENT_LENGTH = 500
+
+
+def clean_ip(value):
+    """A valid IP address or None (X-Forwarded-For is client supplied)"""
+    try:
+        return str(ipaddress.ip_address((value or '').strip()))
+    except ValueError:
+        return None
+
+
+class DownloadLogBuffer(BackgroundFlushMixin):
+    """Thread-safe per-process queue of download events, written to AppDownload in bulk"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []  # (app_id, user_id, ip_address, user_agent, downloaded_at)
+        self._last_flush = time.monotonic()
+        self._dropped = 0
+        self._init_background_flush()
+
+    def record(self, app_id, user_id=None, ip_address=None, user_agent=''):
+        event = (
+            app_id, user_id, clean_ip(ip_address),
+            (user_agent or '')[:MAX_USER_AGENT_LENGTH], timezone.now(),
+        )
+        with self._lock:
+            if len(self._pending) >= MAX_BUFFERED:
+                self._dropped += 1
+                return
+            self._pending.append(event)
+            self._flush_soon(
+                len(self._pending) >= FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+
+    def flush_interval(self):
+        return FLUSH_INTERVAL
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            dropped, self._dropped = self._dropped, 0
+            self._last_flush = time.monotonic()
+        if dropped:
+            logger.warning("Download log buffer full, dropped %d events", dropped)
+        return pending
+
+    def _restore(self, pending):
+        with self._lock:
+            room = max(MAX_BUFFERED - len(self._pending), 0)
+            self._pending[:0] = pending[-room:] if room else []
+            self._dropped += len(pending) - min(room, len(pending))
+
+    def flush(self):
+        """Write buffered events to AppDownload. Returns the number of rows written."""
+        from .models import AppDownload
+
+        pending = self._take()
+        if not pending:
+            return 0
+
+        rows = [
+            AppDownload(
+                app_id=app_id, user_id=user_id, ip_address=ip_address,
+                user_agent=user_agent, downloaded_at=downloaded_at,
+            )
+            for app_id, user_id, ip_address, user_agent, downloaded_at in pending
+        ]
+        # One transaction for all batches: a failed flush can be retried without duplicates
+        try:
+            try:
+                with transaction.atomic():
+                    AppDownload.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+            except IntegrityError:
+                # An app or user was deleted after the download - drop its events
+                rows = self._existing(rows)
+                with transaction.atomic():
+                    AppDownload.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        except DatabaseError:
+            # e.g. the database is down - retry on the next flush
+            logger.warning("Download log flush failed, keeping %d events buffered", len(pending), exc_info=True)
+            self._restore(pending)
+            return 0
+        return len(rows)
+
+    def _existing(self, rows):
+        from .models import App
+
+        app_ids = set(App.objects.filter(pk__in={row.app_id for row in rows}).values_list('pk', flat=True))
+        user_ids = set(
+            get_user_model().objects.filter(pk__in={row.user_id for row in rows if row.user_id})
+            .values_list('pk', flat=True)
+        )
+        return [
+            row for row in rows
+            if row.app_id in app_ids and (row.user_id is None or row.user_id in user_ids)
+        ]
+
+
+download_log = DownloadLogBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        download_log.flush()
+    except Exception:
+        pass
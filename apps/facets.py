@@ -0,0 +1,177 @@
+"""
+Faceted counts for the search results page.
+
+All facet counts come from ONE grouped query: the matching apps are grouped
+by (category, age_rating, is_free, has_iap, API bucket) and the resulting
+"cube" - at most categories x 5 x 2 x 2 x 5 rows - is rolled up in Python.
+
+Counts are disjunctive: a facet's counts apply every active filter except
+its own, so users can see how many results switching a value would give.
+The same cube also yields the total for the paginator, so no COUNT(*) is
+run for the results list either.
+"""
+from collections import Counter, namedtuple
+
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from categories.models import Category
+from .models import App
+
+
+# (key, label, lowest API level, highest API level)
+API_LEVEL_BUCKETS = [
+    ('21-22', 'Android 5.x', None, 22),
+    ('23-25', 'Android 6-7', 23, 25),
+    ('26-28', 'Android 8-9', 26, 28),
+    ('29-31', 'Android 10-12', 29, 31),
+    ('32+', 'Android 12L+', 32, None),
+]
+
+FACET_FIELDS = ('category', 'age_rating', 'is_free', 'has_iap', 'api')
+
+BOOLEAN_VALUES = {'1': True, '0': False}
+
+Facet = namedtuple('Facet', 'name label options')
+FacetOption = namedtuple('FacetOption', 'value label count selected url')
+
+
+def api_bucket_expression():
+    whens = []
+    for key, _, low, high in API_LEVEL_BUCKETS:
+        condition = Q()
+        if low is not None:
+            condition &= Q(min_api_level__gte=low)
+        if high is not None:
+            condition &= Q(min_api_level__lte=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(API_LEVEL_BUCKETS[0][0]), output_field=CharField())
+
+
+def parse_filters(params):
+    """Active facet filters from request.GET - unknown values are dropped"""
+    filters = {}
+    category = params.get('category', '').strip()
+    if category:
+        filters['category'] = category
+    age_rating = params.get('age_rating', '').strip()
+    if age_rating in dict(App.AGE_RATING_CHOICES):
+        filters['age_rating'] = age_rating
+    for name in ('is_free', 'has_iap'):
+        value = params.get(name, '').strip()
+        if value in BOOLEAN_VALUES:
+            filters[name] = BOOLEAN_VALUES[value]
+    api = params.get('api', '').strip()
+    if api in {bucket[0] for bucket in API_LEVEL_BUCKETS}:
+        filters['api'] = api
+    return filters
+
+
+def apply_filters(queryset, filters, category_ids=None):
+    """Apply parsed facet filters to an App queryset"""
+    if 'category' in filters:
+        queryset = queryset.filter(category_id=category_ids.get(filters['category'], -1))
+    if 'age_rating' in filters:
+        queryset = queryset.filter(age_rating=filters['age_rating'])
+    for name in ('is_free', 'has_iap'):
+        if name in filters:
+            queryset = queryset.filter(**{name: filters[name]})
+    if 'api' in filters:
+        for key, _, low, high in API_LEVEL_BUCKETS:
+            if key == filters['api']:
+                if low is not None:
+                    queryset = queryset.filter(min_api_level__gte=low)
+                if high is not None:
+                    queryset = queryset.filter(min_api_level__lte=high)
+    return queryset
+
+
+def facet_cube(queryset):
+    """One GROUP BY over the facet dimensions -> {(category_id, age, free, iap, api): n}"""
+    rows = (
+        queryset
+        .order_by()
+        .annotate(api=api_bucket_expression())
+        .values_list('category_id', 'age_rating', 'is_free', 'has_iap', 'api')
+        .annotate(n=Count('id'))
+    )
+    return {row[:5]: row[5] for row in rows}
+
+
+def toggle_url(params, name, value):
+    """Query string that selects ``value`` for facet ``name`` (or clears it if already selected)"""
+    query = params.copy()
+    query.pop('page', None)
+    if query.get(name) == value:
+        query.pop(name)
+    else:
+        query[name] = value
+    return f"?{query.urlencode()}"
+
+
+def build_facets(cube, filters, categories, params):
+    """
+    Roll the cube up into disjunctive facet counts.
+    Returns (facets, total) where total applies every filter.
+    """
+    slug_by_id = {category.id: category.slug for category in categories}
+    counters = {name: Counter() for name in FACET_FIELDS}
+    total = 0
+
+    for (category_id, age_rating, is_free, has_iap, api), n in cube.items():
+        cell = {
+            'category': slug_by_id.get(category_id),
+            'age_rating': age_rating,
+            'is_free': is_free,
+            'has_iap': has_iap,
+            'api': api,
+        }
+        misses = [name for name, value in filters.items() if cell[name] != value]
+        if not misses:
+            total += n
+            for name in FACET_FIELDS:
+                counters[name][cell[name]] += n
+        elif len(misses) == 1:
+            # Matches everything except this one facet -> counts toward that facet only
+            counters[misses[0]][cell[misses[0]]] += n
+
+    def options(name, choices):
+        return [
+            FacetOption(
+                value, label, counters[name][key], filters.get(name) == key,
+                toggle_url(params, name, value),
+            )
+            for key, value, label in choices
+            if counters[name][key] or filters.get(name) == key
+        ]
+
+    facets = [
+        Facet('category', 'Category', options('category', [
+            (c.slug, c.slug, f"{c.icon} {c.name}") for c in categories
+        ])),
+        Facet('age_rating', 'Age rating', options('age_rating', [
+            (key, key, label) for key, label in App.AGE_RATING_CHOICES
+        ])),
+        Facet('is_free', 'Price', options('is_free', [
+            (True, '1', 'Free'), (False, '0', 'Paid'),
+        ])),
+        Facet('has_iap', 'In-app purchases', options('has_iap', [
+            (False, '0', 'No in-app purchases'), (True, '1', 'Has in-app purchases'),
+        ])),
+        Facet('api', 'Minimum Android', options('api', [
+            (key, key, label) for key, label, _, _ in API_LEVEL_BUCKETS
+        ])),
+    ]
+    return facets, total
+
+
+def faceted_search(queryset, params):
+    """
+    Facet a (search-filtered) App queryset.
+    Returns (filtered_queryset, facets, total, filters).
+    """
+    filters = parse_filters(params)
+    categories = list(Category.objects.filter(is_active=True).order_by('order', 'name'))
+    category_ids = {category.slug: category.id for category in categories}
+
+    facets, total = build_facets(facet_cube(queryset), filters, categories, params)
+    return apply_filters(queryset, filters, category_ids), facets, total, filters
@@ -1,10 +1,34 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import App, AppVersion, CopyrightClaim, CopyrightInfringementReport, AppScreenshot
+from .models import App, AppCompliance, AppVersion, CopyrightClaim, CopyrightInfringementReport, AppScreenshot, UploadSession
 import os
 
 
-class AppUploadForm(forms.ModelForm):
+class ComplianceFieldsMixin:
+    """
+    Lets an App ModelForm edit AppCompliance fields as if they were App fields.
+    List them in ``compliance_fields`` (widgets in ``compliance_widgets``);
+    cleaned values are set on the App, which saves its compliance row.
+    """
+    compliance_fields = ()
+    compliance_widgets = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.compliance_fields:
+            model_field = AppCompliance._meta.get_field(name)
+            self.fields[name] = model_field.formfield(widget=self.compliance_widgets.get(name))
+            if self.instance.pk and name not in self.initial:
+                self.initial[name] = getattr(self.instance, name)
+    
+    def _post_clean(self):
+        super()._post_clean()
+        for name in self.compliance_fields:
+            if name in self.cleaned_data:
+                setattr(self.instance, name, self.cleaned_data[name])
+
+
+class AppUploadForm(ComplianceFieldsMixin, forms.ModelForm):
     """Form for uploading a new app with comprehensive validation"""
     
     # File size limits (in bytes)
@@ -15,11 +39,71 @@ class AppUploadForm(forms.ModelForm):
     ALLOWED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
     ALLOWED_APP_EXTENSIONS = {'.apk', '.exe', '.ipa'}
     
+    # Stored on AppCompliance, edited here like regular App fields
+    compliance_fields = (
+        'content_ownership_type',
+        'play_store_link',
+        'developer_website',
+        'copyright_statement',
+        'is_original_content',
+        'copyright_holder_email',
+        'copyright_license_type',
+        'copyright_license_url',
+        'copyright_notice_required',
+    )
+    compliance_widgets = {
+        'content_ownership_type': forms.RadioSelect(attrs={
+            'class': 'form-check-input',
+        }),
+        'play_store_link': forms.URLInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'https://play.google.com/store/apps/details?id=com.example.app',
+            'required': False,
+        }),
+        'developer_website': forms.URLInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'https://www.developer-website.com (optional)',
+            'required': False,
+        }),
+        'copyright_statement': forms.Textarea(attrs={
+            'class': 'form-control',
+            'placeholder': 'State your copyright claim (e.g., "This app is the original creation of...")',
+            'rows': 3,
+        }),
+        'is_original_content': forms.CheckboxInput(attrs={
+            'class': 'form-check-input',
+            'required': 'required',
+        }),
+        'copyright_holder_email': forms.EmailInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'copyright.holder@example.com',
+        }),
+        'copyright_license_type': forms.Select(attrs={
+            'class': 'form-control',
+        }),
+        'copyright_license_url': forms.URLInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'https://example.com/license',
+        }),
+        'copyright_notice_required': forms.CheckboxInput(attrs={
+            'class': 'form-check-input',
+        }),
+    }
+    
+    # Set by static/js/chunked-upload.js when the file was sent in chunks
+    upload_session = forms.UUIDField(required=False, widget=forms.HiddenInput)
+    
+    # Read from the uploaded APK by manage.py process_apks; optional to type in
+    DETECTED_FIELDS = ('size_mb', 'min_api_level', 'target_api_level')
+    
     def __init__(self, *args, user=None, **kwargs):
         """Initialize form with user for conditional field disabling"""
         super().__init__(*args, **kwargs)
         self.user = user
         
+        for name in self.DETECTED_FIELDS:
+            self.fields[name].required = False
+        
         # Pre-fill developer info from user profile if user is provided
         if user:
             # Get full name from user profile
@@ -89,17 +173,40 @@ class AppUploadForm(forms.ModelForm):
                 )
         return apk_file
     
+    def clean_upload_session(self):
+        """Resolve a finished chunked upload of this user"""
+        session_id = self.cleaned_data.get('upload_session')
+        if not session_id:
+            return None
+        session = UploadSession.objects.filter(
+            pk=session_id, owner=self.user, status='complete',
+        ).first() if self.user else None
+        if session is None:
+            raise ValidationError("The uploaded file was not found. Please upload it again.")
+        return session
+    
     def clean(self):
         """Validate that at least one download option is provided"""
         cleaned_data = super().clean()
         apk_file = cleaned_data.get('apk_file')
         download_link = cleaned_data.get('download_link')
         
+        # A chunked upload is already in storage and hashed: use it as the file
+        session = cleaned_data.get('upload_session')
+        if session and not self.files.get('apk_file'):
+            apk_file = cleaned_data['apk_file'] = session.stored_name
+            cleaned_data['file_hash'] = session.sha256
+        
         if not apk_file and not download_link:
             raise ValidationError(
                 "Please provide either an APK file upload or an external download link."
             )
         
+        # Left blank: keep the current (or default) value until the APK is parsed
+        for name in self.DETECTED_FIELDS:
+            if cleaned_data.get(name) is None and name not in self.errors:
+                cleaned_data[name] = getattr(self.instance, name)
+        
         # Validate price for paid apps
         is_free = cleaned_data.get('is_free')
         price = cleaned_data.get('price')
@@ -152,15 +259,6 @@ class AppUploadForm(forms.ModelForm):
             'store_name',
             'store_email',
             'is_published',
-            'content_ownership_type',
-            'play_store_link',
-            'developer_website',
-            'copyright_statement',
-            'is_original_content',
-            'copyright_holder_email',
-            'copyright_license_type',
-            'copyright_license_url',
-            'copyright_notice_required',
         ]
         widgets = {
             'title': forms.TextInput(attrs={
@@ -281,42 +379,6 @@ class AppUploadForm(forms.ModelForm):
             'is_published': forms.CheckboxInput(attrs={
                 'class': 'form-check-input',
             }),
-            'content_ownership_type': forms.RadioSelect(attrs={
-                'class': 'form-check-input',
-            }),
-            'play_store_link': forms.URLInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'https://play.google.com/store/apps/details?id=com.example.app',
-                'required': False,
-            }),
-            'developer_website': forms.URLInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'https://www.developer-website.com (optional)',
-                'required': False,
-            }),
-            'copyright_statement': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'State your copyright claim (e.g., "This app is the original creation of...")',
-                'rows': 3,
-            }),
-            'is_original_content': forms.CheckboxInput(attrs={
-                'class': 'form-check-input',
-                'required': 'required',
-            }),
-            'copyright_holder_email': forms.EmailInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'copyright.holder@example.com',
-            }),
-            'copyright_license_type': forms.Select(attrs={
-                'class': 'form-control',
-            }),
-            'copyright_license_url': forms.URLInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'https://example.com/license',
-            }),
-            'copyright_notice_required': forms.CheckboxInput(attrs={
-                'class': 'form-check-input',
-            }),
         }
 
 
@@ -329,6 +391,7 @@ class AppVersionForm(forms.ModelForm):
             'version_number',
             'description',
             'size_mb',
+            'apk_file',
             'download_link',
             'is_active',
         ]
@@ -348,6 +411,10 @@ class AppVersionForm(forms.ModelForm):
                 'placeholder': 'Size in MB',
                 'step': '0.01',
             }),
+            'apk_file': forms.FileInput(attrs={
+                'class': 'form-control',
+                'accept': '.apk,.exe,.ipa',
+            }),
             'download_link': forms.URLInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'https://...',
@@ -0,0 +1,106 @@
+"""
+Versioned template fragment cache for app cards and detail-page sections.
+
+Fragment keys carry their own version - the app id, ``updated_at`` and
+the counters that change without save() (downloads, ratings) - plus a
+digest of the template source, so nothing has to be deleted: an edited
+app or a redeployed template simply renders under a new key and the old
+entry ages out.
+
+    {% load app_fragments %}
+    {% render_app_cards apps "apps/includes/app_card.html" %}     one get_many per grid
+    {% app_fragment "apps/includes/detail_screenshots.html" app %}
+    {% category_filter categories cat %}
+
+AppScreenshot and AppCompliance writes touch their own/the app's
+``updated_at`` so the detail sections pick them up.
+"""
+from functools import lru_cache
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from core.cache_tags import CATEGORIES, tag_versions
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+KEY_PREFIX = 'fragment:'
+
+# Card columns that change through queryset.update()/F() without touching updated_at
+CARD_VOLATILE_FIELDS = (
+    'downloads', 'avg_rating', 'total_ratings', 'review_count',
+    'category__name', 'category__icon', 'owner__username',
+)
+
+
+@lru_cache(maxsize=None)
+def template_digest(template_name):
+    """Short digest of the template source (per process - changes ship with a restart)"""
+    template = get_template(template_name)
+    source = getattr(template.template, 'source', '')
+    return hashlib.md5(f'{template_name}:{source}'.encode('utf-8')).hexdigest()[:8]
+
+
+def _timestamp(value):
+    return value.timestamp() if value else 0
+
+
+def card_version(app):
+    """id + updated_at + the counters a card shows"""
+    volatile = '|'.join(str(getattr(app, name, '')) for name in CARD_VOLATILE_FIELDS)
+    return f'{app.id}:{_timestamp(app.updated_at)}:{hashlib.md5(volatile.encode("utf-8")).hexdigest()[:8]}'
+
+
+def section_version(app):
+    """id + updated_at of the App row and of its compliance row (when loaded)"""
+    compliance = app._state.fields_cache.get('compliance')
+    return f'{app.id}:{_timestamp(app.updated_at)}:{_timestamp(getattr(compliance, "updated_at", None))}'
+
+
+def fragment_key(template_name, version, *vary):
+    suffix = hashlib.md5(':'.join(str(value) for value in vary).encode('utf-8')).hexdigest()[:8]
+    return f'{KEY_PREFIX}{template_digest(template_name)}:{version}:{suffix}'
+
+
+def render_app_cards(apps, template_name, context=None, request=None, vary=()):
+    """
+    Render one ``template_name`` per app (as ``app``) with a single
+    get_many for the whole grid and a single set_many for the misses.
+    """
+    apps = list(apps)
+    keys = [fragment_key(template_name, card_version(app), *vary) for app in apps]
+    cached = cache.get_many(keys)
+
+    rendered, missing = [], {}
+    for app, key in zip(apps, keys):
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(template_name, {**(context or {}), 'app': app}, request=request)
+            missing[key] = html
+        rendered.append(html)
+    if missing:
+        cache.set_many(missing, FRAGMENT_TIMEOUT)
+    return mark_safe(''.join(rendered))
+
+
+def render_app_fragment(template_name, app, context=None, request=None, vary=()):
+    """One cached detail-page section for ``app``"""
+    key = fragment_key(template_name, section_version(app), *vary)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, {**(context or {}), 'app': app}, request=request)
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html)
+
+
+def render_category_filter(categories, selected, request=None):
+    """Category <select>, versioned by the categories tag (bumped on Category writes)"""
+    template_name = 'apps/includes/category_filter.html'
+    version = tag_versions([CATEGORIES])[CATEGORIES]
+    key = fragment_key(template_name, version, selected)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, {'categories': categories, 'cat': selected}, request=request)
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,98 @@
+"""
+Django Management Command to compare full App rows with the AppCard projection
+Reports rows/sec through the ORM and bytes returned by the database per row
+Usage: python manage.py benchmark_app_cards [--rows 20] [--repeat 50]
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.models import App
+
+
+def _value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    return len(str(value).encode('utf-8'))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-row App listings against the slim cards() projection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=20,
+            help='Rows per listing query, i.e. one page of cards (default: 20)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Timed runs per case (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        base = App.objects.filter(is_published=True).order_by('-rank_score', '-id')
+        cases = [
+            ('full rows (select_related)', base.select_related('category', 'owner')[:rows]),
+            ('cards()', base.cards()[:rows]),
+        ]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📊 App card projection benchmark: {rows} rows/query, {repeat} runs, database: {connection.vendor}'
+        ))
+        self.stdout.write('-' * 84)
+        self.stdout.write(
+            f'{"query":<28}{"columns":>9}{"bytes/row":>11}{"bytes/page":>12}{"median ms":>11}{"rows/sec":>13}'
+        )
+        self.stdout.write('-' * 84)
+
+        results = {}
+        for label, queryset in cases:
+            columns, payload, fetched = self._transfer(queryset)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                count = len(list(queryset.all()))
+                timings.append(time.perf_counter() - started)
+            median = statistics.median(timings)
+            rows_per_sec = count / median if median and count else 0
+            per_row = payload / fetched if fetched else 0
+            results[label] = (per_row, rows_per_sec)
+            self.stdout.write(
+                f'{label:<28}{columns:>9}{per_row:>11,.0f}{payload:>12,}{median * 1000:>11.2f}{rows_per_sec:>13,.0f}'
+            )
+
+        self.stdout.write('-' * 84)
+        (full_bytes, full_rate), (card_bytes, card_rate) = results.values()
+        if full_bytes and full_rate:
+            self.stdout.write(
+                f'cards(): {card_bytes / full_bytes:.0%} of the bytes per row, '
+                f'{card_rate / full_rate:.1f}x the rows/sec'
+            )
+
+    def _transfer(self, queryset):
+        """(column count, payload bytes, rows) for the raw SQL the queryset runs"""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            fetched = cursor.fetchall()
+            columns = len(cursor.description)
+        payload = sum(_value_size(value) for row in fetched for value in row)
+        return columns, payload, len(fetched)
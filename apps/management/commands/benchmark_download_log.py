@@ -0,0 +1,110 @@
+"""
+Django Management Command to benchmark download event ingestion
+Compares the buffered path (DownloadLogBuffer.record + bulk flush) with one
+AppDownload INSERT per download; benchmark rows are deleted afterwards
+Usage: python manage.py benchmark_download_log [--events 20000] [--threads 8] [--single 1000]
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.download_log import MAX_BUFFERED, DownloadLogBuffer
+from apps.models import App, AppDownload
+
+USER_AGENT = 'benchmark-download-log'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark buffered AppDownload ingestion against one INSERT per download'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=20000,
+            help=f'Download events recorded through the buffer (default: 20000, max {MAX_BUFFERED})'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Threads recording events concurrently, like request threads (default: 8)'
+        )
+        parser.add_argument(
+            '--single',
+            type=int,
+            default=1000,
+            help='Events written with one INSERT each, for comparison (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        events = min(options['events'], MAX_BUFFERED)
+        threads = max(options['threads'], 1)
+        single = options['single']
+
+        app_ids = list(App.objects.values_list('id', flat=True)[:100])
+        if not app_ids:
+            raise CommandError('No apps in the database - create some first')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📊 Download ingestion benchmark: {events:,} buffered events from {threads} threads, '
+            f'{single:,} single INSERTs'
+        ))
+        self.stdout.write('-' * 72)
+        self.stdout.write(f'{"path":<34}{"events":>10}{"seconds":>10}{"events/s":>12}{"p99 us":>10}')
+        self.stdout.write('-' * 72)
+
+        try:
+            self.benchmark_buffered(app_ids, events, threads)
+            self.benchmark_single(app_ids, single)
+        finally:
+            deleted, _ = AppDownload.objects.filter(user_agent=USER_AGENT).delete()
+            self.stdout.write('-' * 72)
+            self.stdout.write(f'🧹 Removed {deleted:,} benchmark rows')
+
+    def benchmark_buffered(self, app_ids, events, threads):
+        buffer = DownloadLogBuffer()
+        buffer._flushing = True  # no background flushes: enqueue and flush are timed separately
+        per_thread = events // threads
+        latencies = [[] for _ in range(threads)]
+
+        def record(index):
+            timings = latencies[index]
+            for i in range(per_thread):
+                started = time.perf_counter()
+                buffer.record(app_ids[i % len(app_ids)], ip_address='203.0.113.7', user_agent=USER_AGENT)
+                timings.append(time.perf_counter() - started)
+
+        workers = [threading.Thread(target=record, args=(index,)) for index in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        enqueue_seconds = time.perf_counter() - started
+        all_latencies = sorted(value for timings in latencies for value in timings)
+        self.write_row('record() (request path)', len(all_latencies), enqueue_seconds, all_latencies)
+
+        started = time.perf_counter()
+        written = buffer.flush()
+        self.write_row('flush (bulk_create)', written, time.perf_counter() - started)
+
+    def benchmark_single(self, app_ids, count):
+        if count <= 0:
+            return
+        latencies = []
+        started = time.perf_counter()
+        for i in range(count):
+            begin = time.perf_counter()
+            AppDownload.objects.create(app_id=app_ids[i % len(app_ids)], ip_address='203.0.113.7', user_agent=USER_AGENT)
+            latencies.append(time.perf_counter() - begin)
+        self.write_row('one INSERT per download', count, time.perf_counter() - started, sorted(latencies))
+
+    def write_row(self, label, count, seconds, latencies=None):
+        rate = count / seconds if seconds else 0
+        p99 = ''
+        if latencies:
+            p99 = f'{latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1_000_000:.1f}'
+        self.stdout.write(f'{label:<34}{count:>10,}{seconds:>10.3f}{rate:>12,.0f}{p99:>10}')
@@ -0,0 +1,105 @@
+"""
+Django Management Command to compare paginators on the public app listing
+Django's Paginator (exact COUNT(*)) vs ApproximateCountPaginator vs CursorPaginator
+Usage: python manage.py benchmark_pagination [--per-page 20] [--repeat 20] [--exact-limit 1000]
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from apps.models import App
+from core.pagination import ApproximateCountPaginator, CursorPaginator
+
+
+class Command(BaseCommand):
+    help = 'Benchmark exact-count, approximate-count and cursor pagination on the app listing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-page',
+            type=int,
+            default=20,
+            help='Page size (default: 20)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed runs per case (default: 20)'
+        )
+        parser.add_argument(
+            '--exact-limit',
+            type=int,
+            default=1000,
+            help='ApproximateCountPaginator exact-count threshold; lower it to exercise estimates on small databases'
+        )
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        repeat = options['repeat']
+        exact_limit = options['exact_limit']
+
+        # The listing as it used to be: joined and annotated with a review count
+        queryset = App.objects.filter(is_published=True).select_related(
+            'category', 'owner'
+        ).annotate(num_reviews=Count('reviews')).order_by('-rank_score', '-id')
+
+        total = queryset.count()
+        last_page = max((total + per_page - 1) // per_page, 1)
+        pages = sorted({1, max(last_page // 2, 1), last_page})
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📊 Pagination benchmark: {total:,} published apps, {per_page}/page, {repeat} runs, '
+            f'database: {connection.vendor}'
+        ))
+        self.stdout.write('-' * 78)
+        self.stdout.write(f'{"paginator":<26}{"page":>8}{"median ms":>12}{"p95 ms":>10}{"queries":>9}{"count":>13}')
+        self.stdout.write('-' * 78)
+
+        for page in pages:
+            self._report('Paginator (exact)', page, repeat, lambda page=page: self._offset_page(
+                Paginator(queryset, per_page), page
+            ))
+            self._report('ApproximateCount', page, repeat, lambda page=page: self._offset_page(
+                ApproximateCountPaginator(queryset, per_page, exact_limit=exact_limit), page
+            ))
+
+        # Cursor pagination has no page numbers - walk to the same depth first
+        for page in pages:
+            paginator = CursorPaginator(queryset, per_page)
+            cursor = None
+            for _ in range(page - 1):
+                current = paginator.page(cursor)
+                if not current.has_next:
+                    break
+                cursor = current.next_cursor
+            self._report('CursorPaginator', page, repeat, lambda cursor=cursor: (
+                len(paginator.page(cursor).object_list), '-'
+            ))
+
+    def _offset_page(self, paginator, number):
+        page = paginator.page(number)
+        rows = len(page.object_list)
+        approximate = getattr(paginator, 'is_approximate', False)
+        return rows, f"{'~' if approximate else ''}{paginator.count:,}"
+
+    def _report(self, label, page, repeat, run):
+        with CaptureQueriesContext(connection) as queries:
+            _, count = run()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        self.stdout.write(
+            f'{label:<26}{page:>8}{statistics.median(timings):>12.2f}{p95:>10.2f}'
+            f'{len(queries.captured_queries):>9}{count:>13}'
+        )
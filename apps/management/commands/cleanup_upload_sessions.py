@@ -0,0 +1,49 @@
+"""
+Django Management Command to remove abandoned chunked uploads
+Deletes upload sessions untouched for --hours and their part files; finished
+files that no app uses are removed by gc_apk_blobs. Run from cron (e.g. hourly)
+Usage: python manage.py cleanup_upload_sessions [--hours 24] [--dry-run]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.chunked_upload import discard_session
+from apps.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete stale chunked upload sessions and their files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Delete sessions not updated for this many hours (default: 24)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff).order_by('updated_at')
+
+        removed = 0
+        for session in stale.iterator():
+            self.stdout.write(f'  🗑️ {session.filename} ({session.status}, {session.received:,} bytes)')
+            if not options['dry_run']:
+                discard_session(session)
+            removed += 1
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {verb} {removed} upload session(s)'
+            )
+        )
@@ -0,0 +1,56 @@
+"""
+Django Management Command to flush buffered download counts into App.downloads
+Web workers flush the apps they counted themselves; this sweep (run every
+minute from cron, see jndroid.cron) picks up totals left behind by workers that were killed
+Usage: python manage.py flush_download_counts [--batch-size 500] [--app ID ...]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.download_counter import download_counter
+from apps.models import App
+
+
+class Command(BaseCommand):
+    help = 'Add buffered (cache) download counts to App.downloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Apps per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--app',
+            type=int,
+            nargs='+',
+            dest='app_ids',
+            help='Only flush these app IDs'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        batch_size = options['batch_size']
+        app_ids = options['app_ids'] or App.objects.order_by('id').values_list('id', flat=True).iterator()
+
+        checked = flushed = 0
+        batch = []
+        for app_id in app_ids:
+            batch.append(app_id)
+            if len(batch) >= batch_size:
+                flushed += download_counter.flush(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            flushed += download_counter.flush(batch)
+            checked += len(batch)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Checked {checked} app(s), flushed {flushed} in {elapsed:.2f}s'
+            )
+        )
@@ -0,0 +1,96 @@
+"""
+Django Management Command to delete app binaries that nothing references
+A blob (apps/apk_storage.py) is deleted when no App or AppVersion uses it and it
+was not stored or re-uploaded during the grace period (uploads in progress);
+run from cron, e.g. daily
+Usage: python manage.py gc_apk_blobs [--grace-hours 24] [--recount] [--dry-run]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.apk_storage import apk_storage
+from apps.models import ApkBlob, App, AppVersion
+
+
+class Command(BaseCommand):
+    help = 'Delete unreferenced APK blobs from content-addressed storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=24,
+            help='Keep unreferenced blobs touched within this many hours (default: 24)'
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Recompute every ref_count from App/AppVersion first'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            fixed = self.recount()
+            self.stdout.write(f'🔢 Corrected {fixed} reference count(s)')
+
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        candidates = ApkBlob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+
+        deleted = freed = 0
+        for sha256 in candidates.values_list('sha256', flat=True).iterator():
+            with transaction.atomic():
+                # Re-check under the row lock: an upload may have just reused the blob
+                blob = (
+                    ApkBlob.objects.select_for_update()
+                    .filter(pk=sha256, ref_count=0, updated_at__lt=cutoff).first()
+                )
+                if blob is None or self.referenced(blob.name):
+                    continue
+                self.stdout.write(f'  🗑️ {blob.name} ({blob.size / (1024 * 1024):.1f} MB)')
+                if not options['dry_run']:
+                    apk_storage.delete(blob.name)
+                    blob.delete()
+            deleted += 1
+            freed += blob.size
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {verb} {deleted} blob(s), {freed / (1024 * 1024):.1f} MB'
+            )
+        )
+
+    def referenced(self, name):
+        return (
+            App.objects.filter(apk_file=name).exists()
+            or AppVersion.objects.filter(apk_file=name).exists()
+        )
+
+    def recount(self):
+        counts = {}
+        for model in (App, AppVersion):
+            rows = (
+                model.objects.exclude(apk_file__isnull=True).exclude(apk_file='')
+                .values('apk_file').annotate(refs=Count('pk')).order_by()
+            )
+            for row in rows:
+                counts[row['apk_file']] = counts.get(row['apk_file'], 0) + row['refs']
+
+        changed = []
+        for blob in ApkBlob.objects.only('sha256', 'name', 'ref_count').iterator():
+            refs = counts.get(blob.name, 0)
+            if blob.ref_count != refs:
+                blob.ref_count = refs
+                changed.append(blob)
+        ApkBlob.objects.bulk_update(changed, ['ref_count'], batch_size=500)
+        return len(changed)
@@ -0,0 +1,68 @@
+"""
+Django Management Command to move legacy APK files into content-addressed storage
+Files uploaded before apps/apk_storage.py (flat media/apks/<upload name>) are
+hashed, stored once per distinct content and re-pointed; the old files are
+deleted once nothing uses them. Safe to re-run.
+Usage: python manage.py migrate_apk_storage [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.apk_storage import apk_storage, blob_sha256
+from apps.models import ApkBlob, App, AppVersion
+
+
+class Command(BaseCommand):
+    help = 'Move flat media/apks files into the sharded, deduplicated layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the files that would be moved'
+        )
+
+    def handle(self, *args, **options):
+        legacy = {}  # old name -> blob name
+        moved = missing = 0
+
+        for model in (App, AppVersion):
+            rows = (
+                model.objects.exclude(apk_file__isnull=True).exclude(apk_file='')
+                .values_list('pk', 'apk_file').order_by('pk')
+            )
+            for pk, name in rows.iterator():
+                if blob_sha256(name):
+                    continue
+                if name not in legacy:
+                    if not apk_storage.exists(name):
+                        self.stdout.write(self.style.WARNING(f'  ⚠️ Missing file: {name}'))
+                        missing += 1
+                        legacy[name] = None
+                        continue
+                    if options['dry_run']:
+                        legacy[name] = name
+                    else:
+                        with apk_storage.open(name, 'rb') as fileobj:
+                            legacy[name] = apk_storage.save(name, fileobj)
+                    self.stdout.write(f'  📦 {name} -> {legacy[name]}')
+                if legacy[name] is None or options['dry_run']:
+                    continue
+                # Queryset update: no signals, so count the reference here
+                model.objects.filter(pk=pk).update(apk_file=legacy[name], file_hash=blob_sha256(legacy[name]))
+                ApkBlob.adjust_refs(legacy[name], 1)
+                moved += 1
+
+        removed = 0
+        if not options['dry_run']:
+            for name, new_name in legacy.items():
+                if new_name and apk_storage.exists(name):
+                    apk_storage.delete(name)
+                    removed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Re-pointed {moved} row(s) to {len(set(legacy.values()) - {None})} blob(s), '
+                f'removed {removed} legacy file(s), {missing} missing'
+            )
+        )
@@ -0,0 +1,125 @@
+"""
+Django Management Command to report the memory budget of the search prefix index
+Usage: python manage.py prefix_index_report [--titles 100000] [--from-db]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from apps.prefix_index import PrefixIndex
+
+
+LATIN_WORDS = (
+    "messenger chat video player music photo editor camera browser vpn file manager "
+    "keyboard launcher weather calculator scanner pdf reader notes calendar clock "
+    "fitness health bank wallet shop food delivery taxi maps translate dictionary "
+    "quran bangla news cricket football live tv radio status saver downloader lite "
+    "pro plus cleaner booster battery security antivirus backup cloud drive game "
+    "puzzle racing shooter adventure kids learn english math quiz recipe"
+).split()
+
+BENGALI_WORDS = (
+    "বাংলা কুরআন নামাজ সময় অভিধান খবর ক্রিকেট খেলা গান ভিডিও ছবি ক্যামেরা "
+    "ক্যালকুলেটর আবহাওয়া ব্যাংক বাজার রান্না শিক্ষা ইংরেজি গণিত গল্প কবিতা "
+    "হাদিস দোয়া রেডিও টিভি লাইভ মেসেঞ্জার চ্যাট ফাইল ম্যানেজার কিবোর্ড"
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Build the search prefix index over N titles and report its memory footprint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=100_000,
+            help='Number of synthetic titles to index (default: 100000)'
+        )
+        parser.add_argument(
+            '--from-db',
+            action='store_true',
+            help='Index published apps from the database instead of synthetic titles'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for synthetic titles'
+        )
+
+    def handle(self, *args, **options):
+        if options['from_db']:
+            from apps.models import App
+            rows = list(App.objects.filter(is_published=True).values_list('id', 'title', 'downloads'))
+            source = 'database'
+        else:
+            rows = self._synthetic_rows(options['titles'], options['seed'])
+            source = 'synthetic'
+
+        # Timed build first - tracemalloc slows allocation-heavy code down a lot
+        started = time.perf_counter()
+        PrefixIndex(rows)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        index = PrefixIndex(rows)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        words_bytes = sys.getsizeof(index.words) + sum(sys.getsizeof(w) for w in index.words)
+        short_bytes = sys.getsizeof(index.short) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in index.short.items()
+        )
+        components = [
+            ('words (unique, sorted)', words_bytes),
+            ('offsets array', sys.getsizeof(index.offsets)),
+            ('postings array', sys.getsizeof(index.postings)),
+            ('app_ids array', sys.getsizeof(index.app_ids)),
+            ('short-prefix table', short_bytes),
+        ]
+
+        sample = random.Random(1).sample(index.words, min(1000, len(index.words)))
+        short_us = self._time_lookups(index, [w[:n] for w in sample for n in (1, 2)])
+        long_us = self._time_lookups(index, [w[:n] for w in sample for n in (3, 5)])
+
+        self.stdout.write(self.style.SUCCESS(f'📊 Prefix index memory report ({source})'))
+        self.stdout.write('-' * 60)
+        self.stdout.write(f'Titles indexed:        {len(index.app_ids):,}')
+        self.stdout.write(f'Unique words:          {len(index.words):,}')
+        self.stdout.write(f'Postings:              {len(index.postings):,}')
+        self.stdout.write(f'Short prefixes (1-2):  {len(index.short):,}')
+        self.stdout.write('-' * 60)
+        for label, size in components:
+            self.stdout.write(f'{label:<24} {size / 1024 / 1024:8.2f} MB')
+        self.stdout.write(f'{"retained (tracemalloc)":<24} {(after - before) / 1024 / 1024:8.2f} MB')
+        self.stdout.write(f'{"peak while building":<24} {(peak - before) / 1024 / 1024:8.2f} MB')
+        self.stdout.write('-' * 60)
+        self.stdout.write(f'Build time:            {build_ms:,.0f} ms')
+        self.stdout.write(f'Avg lookup, 1-2 chars: {short_us:,.1f} µs (precomputed table)')
+        self.stdout.write(f'Avg lookup, 3/5 chars: {long_us:,.1f} µs (bisect + merge)')
+        self.stdout.write(
+            'Note: payloads (serialized results) are only kept for apps reachable '
+            f'from short prefixes, at most {len(index.short_prefix_app_ids()):,} apps here.'
+        )
+
+    def _time_lookups(self, index, prefixes):
+        started = time.perf_counter()
+        for prefix in prefixes:
+            index.lookup(prefix)
+        return (time.perf_counter() - started) * 1_000_000 / max(len(prefixes), 1)
+
+    def _synthetic_rows(self, count, seed):
+        rnd = random.Random(seed)
+        rows = []
+        for app_id in range(1, count + 1):
+            vocabulary = BENGALI_WORDS if rnd.random() < 0.35 else LATIN_WORDS
+            words = rnd.sample(vocabulary, rnd.randint(1, 4))
+            # Brand-like unique token so the vocabulary grows like a real catalog
+            words.append(f"{rnd.choice(LATIN_WORDS)[:4]}{app_id:x}")
+            rows.append((app_id, ' '.join(words), int(rnd.paretovariate(1.2) * 100)))
+        return rows
@@ -0,0 +1,180 @@
+"""
+Django Management Command to extract metadata from uploaded APKs
+Parses every pending ApkBlob (manifest, signing certificate, ABIs, icon - see
+apps/apk_metadata.py) in a process pool, then fills version, size_mb, API
+levels and file_hash of the apps using it. Uploads only store the file; this
+runs outside the request cycle, as a service (jndroid_apk_worker.service runs
+it with --loop) or from cron.
+Usage: python manage.py process_apks [--workers 2] [--limit 100] [--loop] [--interval 10] [--retry-failed]
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.apk_metadata import extract_metadata
+from apps.apk_storage import apk_storage
+from apps.models import ApkBlob
+
+
+class Command(BaseCommand):
+    help = 'Extract APK metadata (manifest, certificate, ABIs, icon) for pending uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=max(min(os.cpu_count() or 1, 4) - 1, 1),
+            help='Parser processes (default: CPU count - 1, at most 3)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='APKs per batch (default: 100)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for new uploads every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=10,
+            help='Seconds between checks with --loop (default: 10)'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry APKs whose extraction failed before'
+        )
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        while True:
+            close_old_connections()
+            processed = self.process_batch(statuses, options['limit'], options['workers'])
+            statuses = ['pending']  # retry failures once per run
+            if processed:
+                continue  # there may be more
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def process_batch(self, statuses, limit, workers):
+        started = time.perf_counter()
+        blobs = list(
+            ApkBlob.objects.filter(metadata_status__in=statuses)
+            .order_by('created_at')[:limit]
+        )
+        if not blobs:
+            return 0
+
+        apks = []
+        for blob in blobs:
+            if not blob.name.lower().endswith('.apk'):
+                self.finish(blob, 'skipped')
+                continue
+            try:
+                apks.append((blob, apk_storage.path(blob.name)))
+            except NotImplementedError:
+                self.finish(blob, 'failed', 'Storage has no local paths')
+
+        done = failed = 0
+        broken = []
+        for blob, outcome in self.extract(apks, workers, broken):
+            if self.record(blob, outcome):
+                done += 1
+            else:
+                failed += 1
+
+        # A parser process that dies (e.g. out of memory on a hostile APK) takes
+        # the pool down, and every APK in flight gets BrokenProcessPool. Parse
+        # those again one per pool, so only an APK that kills its own parser fails.
+        retry, broken = (broken, []) if len(apks) > 1 else ([], broken)
+        for apk in retry:
+            for blob, outcome in self.extract([apk], 1, broken):
+                if self.record(blob, outcome):
+                    done += 1
+                else:
+                    failed += 1
+        for blob, _path in broken:
+            self.record(blob, BrokenProcessPool('The parser process died'))
+            failed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Processed {len(blobs)} APK(s): {done} extracted, {failed} failed '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        )
+        return len(blobs)
+
+    def extract(self, apks, workers, broken):
+        """
+        Parse (blob, path) pairs in a fresh process pool, yielding (blob, metadata
+        or exception) as they finish. APKs whose parser process died are appended
+        to ``broken``; APKs the broken pool no longer accepted stay pending.
+        """
+        # "spawn": the parser processes must not inherit this process's database connection
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(apks) or 1), mp_context=context) as pool:
+            futures = {}
+            for blob, path in apks:
+                try:
+                    futures[pool.submit(extract_metadata, path)] = (blob, path)
+                except BrokenProcessPool:
+                    break  # the rest stays pending for the next batch
+            for future in as_completed(futures):
+                blob = futures[future][0]
+                try:
+                    yield blob, future.result()
+                except BrokenProcessPool:
+                    broken.append(futures[future])
+                except Exception as exc:  # corrupt or unusual APK: recorded as failed
+                    yield blob, exc
+
+    def record(self, blob, outcome):
+        """Save extracted metadata or the failure; True if metadata was saved"""
+        if isinstance(outcome, Exception):
+            self.finish(blob, 'failed', f'{type(outcome).__name__}: {outcome}')
+            self.stdout.write(self.style.WARNING(f'  ⚠️ {blob.name}: {outcome}'))
+            return False
+        self.save_metadata(blob, outcome)
+        self.stdout.write(
+            f'  📦 {outcome["package_name"] or blob.name} {outcome["version_name"]} '
+            f'(API {outcome["min_sdk"]}-{outcome["target_sdk"]}, '
+            f'{", ".join(outcome["native_abis"]) or "no native code"})'
+        )
+        return True
+
+    def save_metadata(self, blob, metadata):
+        blob.package_name = metadata['package_name'][:255]
+        blob.version_name = metadata['version_name'][:100]
+        blob.version_code = metadata['version_code']
+        blob.min_sdk = metadata['min_sdk']
+        blob.target_sdk = metadata['target_sdk']
+        blob.native_abis = ','.join(metadata['native_abis'])[:200]
+        blob.signing_cert_sha256 = metadata['signing_cert_sha256']
+        if metadata['icon']:
+            blob.icon.save(f'{blob.sha256[:2]}/{blob.sha256}.png', ContentFile(metadata['icon']), save=False)
+        self.finish(blob, 'done')
+        blob.apply_metadata()
+
+    def finish(self, blob, status, error=''):
+        blob.metadata_status = status
+        blob.metadata_error = error[:255]
+        blob.processed_at = timezone.now()
+        # Not ref_count: uploads may change it concurrently
+        blob.save(update_fields=[
+            'metadata_status', 'metadata_error', 'processed_at', 'package_name', 'version_name',
+            'version_code', 'min_sdk', 'target_sdk', 'native_abis', 'signing_cert_sha256', 'icon',
+        ])
@@ -0,0 +1,49 @@
+"""
+Django Management Command to refresh App.rank_score
+Only apps whose score is missing, older than their last edit, or older than
+MAX_SCORE_AGE are recomputed unless --full is given.
+Usage: python manage.py recompute_rank_scores [--full] [--batch-size 1000] [--limit N]
+Schedule it from cron, e.g. every 15 minutes:
+    */15 * * * * cd /var/www/jndroid.store/backend && venv/bin/python manage.py recompute_rank_scores
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ranking import recompute_rank_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized catalog ranking score in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every app, not only stale scores'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Apps per bulk_update batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Stop after this many apps (spread a large backlog over several runs)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = recompute_rank_scores(
+            batch_size=options['batch_size'],
+            full=options['full'],
+            limit=options['limit'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Recomputed rank_score for {updated} app(s) in {elapsed:.2f}s')
+        )
@@ -0,0 +1,80 @@
+"""
+Django Management Command to roll up the search query log
+Ranks the most searched settled queries (search page, result picked in the
+search box) into PopularSearchQuery and pre-computes their search results
+into the cache.
+Usage: python manage.py rollup_search_queries [--days 7] [--top 50]
+Schedule it from cron, e.g. hourly:
+    0 * * * * cd /var/www/jndroid.store/backend && venv/bin/python manage.py rollup_search_queries
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.models import PopularSearchQuery, SearchQueryLog
+from apps.search import find_search_results
+from apps.search_log import SETTLED_SOURCES, search_log, set_popular_results
+
+
+class Command(BaseCommand):
+    help = 'Rank top search queries and cache their results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Rollup window in days (default: 7)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='How many queries to rank and cache (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        top = options['top']
+
+        # Anything this process buffered (normally nothing for a cron run)
+        search_log.flush()
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rows = (
+            SearchQueryLog.objects
+            .filter(date__gte=since, source__in=SETTLED_SOURCES)
+            .values('query')
+            .annotate(total=Sum('count'), results=Max('result_count'))
+            .order_by('-total', 'query')[:top]
+        )
+
+        popular = [
+            PopularSearchQuery(
+                query=row['query'],
+                rank=rank,
+                search_count=row['total'],
+                result_count=row['results'] or 0,
+            )
+            for rank, row in enumerate(rows, start=1)
+        ]
+
+        with transaction.atomic():
+            PopularSearchQuery.objects.all().delete()
+            PopularSearchQuery.objects.bulk_create(popular)
+
+        self.stdout.write(self.style.SUCCESS(f'📊 Top {len(popular)} queries over the last {days} day(s)'))
+        self.stdout.write('-' * 60)
+
+        for entry in popular:
+            results, fuzzy = find_search_results(entry.query)
+            set_popular_results(entry.query, {'apps': results, 'fuzzy': fuzzy})
+            self.stdout.write(
+                f"#{entry.rank:<3} {entry.query:<40} {entry.search_count:>7} searches, {len(results)} cached result(s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Cached results for {len(popular)} popular queries'))
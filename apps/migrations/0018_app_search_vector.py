@@ -0,0 +1,71 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The search vector is maintained by the database so that every write path
+# (ORM save, queryset.update(), admin bulk actions, raw SQL) keeps it fresh.
+# 'simple' config is used because the catalog mixes Bengali and English and
+# PostgreSQL ships no Bengali stemmer.
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}short_description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}description, '')), 'C')
+"""
+
+CREATE_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION apps_app_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := %s;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """ % SEARCH_VECTOR_SQL.format(row='NEW.'),
+    "DROP TRIGGER IF EXISTS apps_app_search_vector_update ON apps_app;",
+    """
+    CREATE TRIGGER apps_app_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, short_description, description ON apps_app
+    FOR EACH ROW EXECUTE PROCEDURE apps_app_search_vector_trigger();
+    """,
+    "UPDATE apps_app SET search_vector = %s;" % SEARCH_VECTOR_SQL.format(row=''),
+    "CREATE INDEX IF NOT EXISTS apps_app_search_vector_gin ON apps_app USING gin (search_vector);",
+]
+
+DROP_SQL = [
+    "DROP INDEX IF EXISTS apps_app_search_vector_gin;",
+    "DROP TRIGGER IF EXISTS apps_app_search_vector_update ON apps_app;",
+    "DROP FUNCTION IF EXISTS apps_app_search_vector_trigger();",
+]
+
+
+def create_search_trigger(apps, schema_editor):
+    """Install trigger + GIN index on PostgreSQL (no-op on SQLite)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0017_alter_app_store_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='app',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted full-text vector (title > short description > description), maintained by a PostgreSQL trigger and GIN indexed', null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+CREATE_SQL = [
+    "CREATE INDEX IF NOT EXISTS apps_app_title_trgm ON apps_app USING gin (title gin_trgm_ops);",
+    "CREATE INDEX IF NOT EXISTS apps_app_developer_name_trgm ON apps_app USING gin (developer_name gin_trgm_ops);",
+]
+
+DROP_SQL = [
+    "DROP INDEX IF EXISTS apps_app_title_trgm;",
+    "DROP INDEX IF EXISTS apps_app_developer_name_trgm;",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN trigram indexes for autocomplete (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0018_app_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
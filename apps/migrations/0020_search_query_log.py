@@ -0,0 +1,47 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0019_app_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularSearchQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='Normalized query', max_length=100, unique=True)),
+                ('rank', models.PositiveIntegerField(help_text='1 = most searched')),
+                ('search_count', models.PositiveIntegerField(default=0, help_text='Searches within the rollup window')),
+                ('result_count', models.PositiveIntegerField(default=0, help_text='Results for this query at rollup time')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Popular Search Query',
+                'verbose_name_plural': 'Popular Search Queries',
+                'ordering': ['rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchQueryLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='Normalized query (lower-cased, whitespace collapsed)', max_length=100)),
+                ('source', models.CharField(choices=[('api', 'Realtime search box'), ('page', 'Search results page')], default='api', help_text='Where the search came from', max_length=10)),
+                ('date', models.DateField(help_text='Day the searches were made')),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of searches on this day')),
+                ('result_count', models.PositiveIntegerField(default=0, help_text='Results returned the last time this query ran')),
+            ],
+            options={
+                'verbose_name': 'Search Query Log',
+                'verbose_name_plural': 'Search Query Logs',
+                'ordering': ['-date', '-count'],
+                'indexes': [models.Index(fields=['date', '-count'], name='apps_search_date_1d34f2_idx')],
+                'unique_together': {('query', 'source', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0020_search_query_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='app',
+            name='rank_computed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When rank_score was last computed', null=True),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='rank_score',
+            field=models.FloatField(default=0, editable=False, help_text='Denormalized catalog ranking (downloads, Bayesian rating, recency). Maintained by `manage.py recompute_rank_scores`'),
+        ),
+        migrations.AddIndex(
+            model_name='app',
+            index=models.Index(fields=['is_published', 'category', '-rank_score'], name='apps_app_pub_cat_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='app',
+            index=models.Index(fields=['is_published', '-rank_score'], name='apps_app_pub_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='app',
+            index=models.Index(fields=['rank_computed_at'], name='apps_app_rank_computed_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0021_app_rank_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='app',
+            name='rating_count_1',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 1-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='rating_count_2',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 2-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='rating_count_3',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 3-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='rating_count_4',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 4-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='rating_count_5',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 5-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of reviews (maintained on review writes)'),
+        ),
+    ]
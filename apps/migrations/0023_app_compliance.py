@@ -0,0 +1,56 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('apps', '0022_app_review_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppCompliance',
+            fields=[
+                ('app', models.OneToOneField(help_text='App this compliance record belongs to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='compliance', serialize=False, to='apps.app')),
+                ('copyright_statement', models.TextField(blank=True, default='This app is the original creation of the developer listed above.', help_text='Copyright claim statement')),
+                ('is_original_content', models.BooleanField(default=True, help_text='I confirm this is original content and I have rights to distribute it')),
+                ('copyright_verified', models.BooleanField(default=False, help_text='Admin verified copyright claims')),
+                ('has_copyright_claim', models.BooleanField(default=False, help_text='Does this app have a copyright/DMCA claim against it?')),
+                ('copyright_claim_reason', models.TextField(blank=True, help_text='Reason for copyright claim if applicable')),
+                ('takedown_requested', models.BooleanField(default=False, help_text='Owner requested takedown?')),
+                ('takedown_reason', models.TextField(blank=True, help_text='Reason for owner-requested takedown')),
+                ('takedown_requested_at', models.DateTimeField(blank=True, help_text='When takedown was requested', null=True)),
+                ('copyright_registration_number', models.CharField(blank=True, help_text='Official copyright/trademark registration number', max_length=100, null=True, unique=True)),
+                ('copyright_holder_email', models.EmailField(blank=True, help_text='Email of copyright holder for verification', max_length=254)),
+                ('copyright_holder_verified', models.BooleanField(default=False, help_text='Copyright holder email verified?')),
+                ('copyright_protection_level', models.CharField(choices=[('basic', 'Basic - Developer Statement Only'), ('standard', 'Standard - Admin Verified'), ('premium', 'Premium - Registered & Verified')], default='basic', help_text='Level of copyright protection', max_length=20)),
+                ('copyright_license_type', models.CharField(choices=[('proprietary', 'Proprietary/Commercial'), ('mit', 'MIT License'), ('gpl', 'GPL License'), ('apache', 'Apache License'), ('bsd', 'BSD License'), ('custom', 'Custom License'), ('public_domain', 'Public Domain')], default='proprietary', help_text='Type of license/copyright protection', max_length=20)),
+                ('copyright_license_url', models.URLField(blank=True, help_text='URL to license details or full license text')),
+                ('copyright_expiration_date', models.DateField(blank=True, help_text='When copyright protection expires (if applicable)', null=True)),
+                ('copyright_notice_required', models.BooleanField(default=True, help_text='Must show copyright notice in app')),
+                ('copyright_verified_date', models.DateTimeField(blank=True, help_text='When copyright was verified by admin', null=True)),
+                ('copyright_dispute_status', models.CharField(choices=[('none', 'No Dispute'), ('under_investigation', 'Under Investigation'), ('disputed', 'Disputed/Contested'), ('resolved', 'Resolved')], default='none', help_text='Current dispute status', max_length=20)),
+                ('has_infringement_report', models.BooleanField(default=False, help_text='Has any infringement reports against this app?')),
+                ('copyright_infringement_count', models.PositiveIntegerField(default=0, help_text='Number of infringement reports')),
+                ('content_ownership_type', models.CharField(choices=[('original', 'I am the original creator'), ('permission', 'I have legal permission to share'), ('informational', 'Sharing for informational purposes')], default='informational', help_text='Declare your rights/ownership of this content', max_length=20)),
+                ('play_store_link', models.URLField(blank=True, help_text='Link to app on Google Play Store (if available)', null=True)),
+                ('developer_website', models.URLField(blank=True, help_text='Official developer website or portfolio', null=True)),
+                ('verified_external_link', models.BooleanField(default=False, help_text='Admin verified the external link (Play Store or official website)')),
+                ('source_verified_date', models.DateTimeField(blank=True, help_text='When source was verified', null=True)),
+                ('legal_risk_level', models.CharField(choices=[('low', 'Low Risk - Verified Source'), ('medium', 'Medium Risk - Unverified Source'), ('high', 'High Risk - Requires Investigation')], default='medium', help_text='Legal/copyright risk assessment', max_length=20)),
+                ('requires_manual_review', models.BooleanField(default=True, help_text='App requires manual copyright review before publication')),
+                ('admin_review_notes', models.TextField(blank=True, help_text='Admin notes about copyright/ownership verification')),
+                ('copyright_verified_by', models.ForeignKey(blank=True, help_text='Admin who verified copyright', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='copyright_verified_compliance', to=settings.AUTH_USER_MODEL)),
+                ('source_verified_by', models.ForeignKey(blank=True, help_text='Admin who verified the source', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='source_verified_compliance', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'App Compliance',
+                'verbose_name_plural': 'App Compliance',
+            },
+        ),
+    ]
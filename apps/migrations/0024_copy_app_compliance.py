@@ -0,0 +1,84 @@
+from django.db import migrations, transaction
+
+
+# Columns copied between apps_app and apps_appcompliance
+COMPLIANCE_COLUMNS = [
+    'copyright_statement', 'is_original_content', 'copyright_verified',
+    'has_copyright_claim', 'copyright_claim_reason', 'takedown_requested',
+    'takedown_reason', 'takedown_requested_at', 'copyright_registration_number',
+    'copyright_holder_email', 'copyright_holder_verified', 'copyright_protection_level',
+    'copyright_license_type', 'copyright_license_url', 'copyright_expiration_date',
+    'copyright_notice_required', 'copyright_verified_by_id', 'copyright_verified_date',
+    'copyright_dispute_status', 'has_infringement_report', 'copyright_infringement_count',
+    'content_ownership_type', 'play_store_link', 'developer_website',
+    'verified_external_link', 'source_verified_by_id', 'source_verified_date',
+    'legal_risk_level', 'requires_manual_review', 'admin_review_notes',
+]
+
+# Rows per transaction - keeps locks and WAL bursts short on a large table
+BATCH_SIZE = 2000
+
+
+def copy_to_compliance(apps, schema_editor):
+    """Copy the cold columns into AppCompliance, one short transaction per id batch"""
+    App = apps.get_model('apps', 'App')
+    AppCompliance = apps.get_model('apps', 'AppCompliance')
+    db = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        rows = list(
+            App.objects.using(db)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values('id', *COMPLIANCE_COLUMNS)[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        with transaction.atomic(using=db):
+            AppCompliance.objects.using(db).bulk_create(
+                [AppCompliance(app_id=row.pop('id'), **row) for row in rows],
+                ignore_conflicts=True,  # re-runnable after a partial run
+            )
+
+
+def copy_back_to_app(apps, schema_editor):
+    """Reverse: restore the App columns from AppCompliance in batches"""
+    App = apps.get_model('apps', 'App')
+    AppCompliance = apps.get_model('apps', 'AppCompliance')
+    db = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        rows = list(
+            AppCompliance.objects.using(db)
+            .filter(app_id__gt=last_id)
+            .order_by('app_id')
+            .values('app_id', *COMPLIANCE_COLUMNS)[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        apps_batch = []
+        for row in rows:
+            app = App(id=row.pop('app_id'))
+            for column, value in row.items():
+                setattr(app, column, value)
+            apps_batch.append(app)
+        with transaction.atomic(using=db):
+            App.objects.using(db).bulk_update(apps_batch, COMPLIANCE_COLUMNS)
+        last_id = apps_batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own instead of one huge transaction
+    atomic = False
+
+    dependencies = [
+        ('apps', '0023_app_compliance'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_to_compliance, copy_back_to_app),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0024_copy_app_compliance'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='app',
+            name='admin_review_notes',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='content_ownership_type',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_claim_reason',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_dispute_status',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_expiration_date',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_holder_email',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_holder_verified',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_infringement_count',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_license_type',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_license_url',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_notice_required',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_protection_level',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_registration_number',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_statement',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_verified',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_verified_by',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='copyright_verified_date',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='developer_website',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='has_copyright_claim',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='has_infringement_report',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='is_original_content',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='legal_risk_level',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='play_store_link',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='requires_manual_review',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='source_verified_by',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='source_verified_date',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='takedown_reason',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='takedown_requested',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='takedown_requested_at',
+        ),
+        migrations.RemoveField(
+            model_name='app',
+            name='verified_external_link',
+        ),
+    ]
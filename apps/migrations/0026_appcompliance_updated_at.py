@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0025_remove_app_compliance_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appcompliance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Last modified (versions the cached copyright section)'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0026_appcompliance_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BufferedDownloadCount',
+            fields=[
+                ('app', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='buffered_downloads', serialize=False, to='apps.app')),
+                ('flushed_total', models.PositiveBigIntegerField(default=0, help_text='Counter total already added to App.downloads')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Buffered Download Count',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('apps', '0027_buffereddownloadcount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appdownload',
+            name='downloaded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='appdownload',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='app_downloads', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('apps', '0028_appdownload_anonymous'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(help_text='Original file name', max_length=255)),
+                ('size', models.PositiveBigIntegerField(help_text='Declared total size in bytes')),
+                ('received', models.PositiveBigIntegerField(default=0, help_text='Bytes received so far (next chunk offset)')),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete')], default='uploading', max_length=20)),
+                ('sha256', models.CharField(blank=True, help_text='Set when the upload completes', max_length=64)),
+                ('stored_name', models.CharField(blank=True, help_text='Storage name of the finished file', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['owner', '-created_at'], name='apps_upload_owner_i_4d50d3_idx'), models.Index(fields=['updated_at'], name='apps_upload_updated_1e09ce_idx')],
+            },
+        ),
+    ]
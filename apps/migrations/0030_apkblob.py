@@ -0,0 +1,38 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:20
+
+import apps.apk_storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0029_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appversion',
+            name='apk_file',
+            field=models.FileField(blank=True, help_text='APK file of this version (shared with identical uploads)', null=True, storage=apps.apk_storage.ContentAddressedStorage(), upload_to='apks/'),
+        ),
+        migrations.AlterField(
+            model_name='app',
+            name='apk_file',
+            field=models.FileField(blank=True, help_text='Direct APK file for download (stored by SHA256, see apps/apk_storage.py)', null=True, storage=apps.apk_storage.ContentAddressedStorage(), upload_to='apks/'),
+        ),
+        migrations.CreateModel(
+            name='ApkBlob',
+            fields=[
+                ('sha256', models.CharField(help_text='SHA256 of the file content', max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='Storage name (apks/<2>/<2>/<sha256>.<ext>)', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(help_text='File size in bytes')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='App and AppVersion rows using this file')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Last stored or re-uploaded (garbage collection grace period)')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='apps_apkblo_ref_cou_6a2c44_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0030_apkblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apkblob',
+            name='icon',
+            field=models.ImageField(blank=True, help_text='Launcher icon extracted from the APK', null=True, upload_to='apk_icons/'),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='metadata_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='metadata_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Extracted'), ('failed', 'Failed'), ('skipped', 'Not an APK')], db_index=True, default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='min_sdk',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='native_abis',
+            field=models.CharField(blank=True, help_text='Comma-separated ABIs of bundled native libraries (empty = any device)', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='package_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='signing_cert_sha256',
+            field=models.CharField(blank=True, help_text='SHA256 of the signing certificate', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='target_sdk',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='version_code',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apkblob',
+            name='version_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0031_apkblob_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchquerylog',
+            name='source',
+            field=models.CharField(choices=[('api', 'Realtime search box (every request, no longer logged)'), ('box', 'Realtime search box (result picked)'), ('page', 'Search results page')], default='api', help_text='Where the search came from', max_length=10),
+        ),
+    ]
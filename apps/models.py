@@ -1,8 +1,131 @@
+from collections import namedtuple
+from decimal import Decimal
+import uuid
+
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.db.models.query import BaseIterable, ValuesListIterable
+from django.utils import timezone
 from categories.models import Category
+from core.cache_tags import InvalidatingQuerySet, app_tags
+from .apk_metadata import ANDROID_VERSIONS
+from .apk_storage import apk_storage
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+
+# ==================== Card projection ====================
+
+CardCategory = namedtuple('CardCategory', 'id name slug icon')
+CardOwner = namedtuple('CardOwner', 'id username')
+
+
+class AppCard:
+    """
+    Lightweight, read-only stand-in for App in list views and JSON APIs.
+    Built from a narrow values_list() (see AppQuerySet.cards()), it exposes
+    the same attributes card templates use - app.category.name,
+    app.owner.username, app.cover_image.url - without loading the large
+    text columns or instantiating a model.
+    """
+
+    FIELDS = (
+        'id', 'slug', 'title', 'short_description', 'developer_name',
+        'version', 'size_mb', 'target_android_version', 'cover_image',
+        'downloads', 'avg_rating', 'total_ratings', 'review_count',
+        'is_free', 'price', 'rank_score', 'updated_at',
+    )
+    RELATED = (
+        'category_id', 'category__name', 'category__slug', 'category__icon',
+        'owner_id', 'owner__username',
+    )
+    COLUMNS = FIELDS + RELATED
+
+    __slots__ = COLUMNS + ('extra',)
+
+    def __init__(self, *values, extra=None):
+        for name, value in zip(self.COLUMNS, values):
+            setattr(self, name, value)
+        # Stored path -> FieldFile, so templates can use cover_image.url
+        self.cover_image = FieldFile(None, App._meta.get_field('cover_image'), self.cover_image or None)
+        self.extra = extra or {}
+
+    def __getattr__(self, name):
+        # Annotations carried along by the queryset (e.g. search_rank)
+        try:
+            return object.__getattribute__(self, 'extra')[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return f"<AppCard: {self.title}>"
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def category(self):
+        return CardCategory(self.category_id, self.category__name, self.category__slug, self.category__icon)
+
+    @property
+    def owner(self):
+        return CardOwner(self.owner_id, self.owner__username)
+
+    def get_absolute_url(self):
+        from django.urls import reverse
+        return reverse('apps:detail', kwargs={'slug': self.slug})
+
+
+class AppCardIterable(BaseIterable):
+    """Yields AppCard objects for a cards() queryset"""
+
+    def __iter__(self):
+        queryset = self.queryset
+        extra_names = queryset._card_extra
+        column_count = len(AppCard.COLUMNS)
+        for row in ValuesListIterable(queryset, self.chunked_fetch, self.chunk_size):
+            extra = dict(zip(extra_names, row[column_count:])) if extra_names else None
+            yield AppCard(*row[:column_count], extra=extra)
+
+
+class AppQuerySet(InvalidatingQuerySet):
+    # Counters and ranking bookkeeping move constantly; TTLs bound their staleness.
+    # Review aggregates are among them: the review signals bump the app's own tag,
+    # and listings catch up on the next rank recompute (it bumps RANKING)
+    quiet_fields = frozenset({
+        'downloads', 'rank_score', 'rank_computed_at',
+        'review_count', 'total_ratings', 'avg_rating',
+        'rating_count_1', 'rating_count_2', 'rating_count_3', 'rating_count_4', 'rating_count_5',
+    })
+
+    def cache_tags(self):
+        return app_tags(self.order_by().values_list('id', 'category__slug'))
+
+    def cache_tags_for(self, apps):
+        category_ids = {app.category_id for app in apps}
+        slugs = dict(Category.objects.filter(id__in=category_ids).values_list('id', 'slug'))
+        return app_tags((app.id, slugs.get(app.category_id)) for app in apps)
+
+    def cards(self):
+        """
+        Project to AppCard objects: only the columns a listing card needs,
+        plus any annotations already on the queryset (e.g. search_rank).
+        """
+        extra = tuple(self.query.annotations)
+        queryset = self.select_related(None).values_list(*AppCard.COLUMNS, *extra)
+        queryset._iterable_class = AppCardIterable
+        queryset._card_extra = extra
+        return queryset
+
+    def _clone(self):
+        clone = super()._clone()
+        if hasattr(self, '_card_extra'):
+            clone._card_extra = self._card_extra
+        return clone
+
+
 class App(models.Model):
     AGE_RATING_CHOICES = [
         ("3+", "3+ years"),
@@ -90,9 +213,10 @@ class App(models.Model):
     # ==================== Download Options ====================
     apk_file = models.FileField(
         upload_to="apks/",
+        storage=apk_storage,
         blank=True,
         null=True,
-        help_text="Direct APK file for download"
+        help_text="Direct APK file for download (stored by SHA256, see apps/apk_storage.py)"
     )
     download_link = models.URLField(
         blank=True,
@@ -191,6 +315,15 @@ class App(models.Model):
         default=0,
         help_text="Total number of ratings"
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of reviews (maintained on review writes)"
+    )
+    rating_count_1 = models.PositiveIntegerField(default=0, help_text="Number of 1-star ratings")
+    rating_count_2 = models.PositiveIntegerField(default=0, help_text="Number of 2-star ratings")
+    rating_count_3 = models.PositiveIntegerField(default=0, help_text="Number of 3-star ratings")
+    rating_count_4 = models.PositiveIntegerField(default=0, help_text="Number of 4-star ratings")
+    rating_count_5 = models.PositiveIntegerField(default=0, help_text="Number of 5-star ratings")
     
     # ==================== Source & Attribution ====================
     source_url = models.URLField(
@@ -208,6 +341,158 @@ class App(models.Model):
         help_text="Marked for deletion?"
     )
     
+    # ==================== Copyright & Compliance ====================
+    # The copyright, takedown, verification and risk-review fields live in the
+    # one-to-one AppCompliance table (see below) so catalog, search and
+    # download queries read narrow rows. They are still readable/writable as
+    # App attributes (app.copyright_statement, App(takedown_requested=True))
+    # and saved together with the app.
+    COPYRIGHT_PROTECTION_CHOICES = [
+        ('basic', 'Basic - Developer Statement Only'),
+        ('standard', 'Standard - Admin Verified'),
+        ('premium', 'Premium - Registered & Verified'),
+    ]
+    
+    LICENSE_TYPE_CHOICES = [
+        ('proprietary', 'Proprietary/Commercial'),
+        ('mit', 'MIT License'),
+        ('gpl', 'GPL License'),
+        ('apache', 'Apache License'),
+        ('bsd', 'BSD License'),
+        ('custom', 'Custom License'),
+        ('public_domain', 'Public Domain'),
+    ]
+    
+    CONTENT_OWNERSHIP_CHOICES = [
+        ('original', 'I am the original creator'),
+        ('permission', 'I have legal permission to share'),
+        ('informational', 'Sharing for informational purposes'),
+    ]
+    
+    RISK_LEVEL_CHOICES = [
+        ('low', 'Low Risk - Verified Source'),
+        ('medium', 'Medium Risk - Unverified Source'),
+        ('high', 'High Risk - Requires Investigation'),
+    ]
+    
+    # ==================== Ranking ====================
+    rank_score = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Denormalized catalog ranking (downloads, Bayesian rating, recency). "
+                  "Maintained by `manage.py recompute_rank_scores`"
+    )
+    rank_computed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When rank_score was last computed"
+    )
+    
+    # ==================== Search ====================
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted full-text vector (title > short description > description), "
+                  "maintained by a PostgreSQL trigger and GIN indexed"
+    )
+    
+    release_date = models.DateField(
+        auto_now_add=False,
+        default='2026-01-29',
+        help_text="Date when app was first published"
+    )
+    last_update_date = models.DateField(
+        auto_now=True,
+        help_text="Date of last update"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When this listing was created"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last modified"
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "App"
+        verbose_name_plural = "Apps"
+        indexes = [
+            models.Index(fields=['slug']),
+            models.Index(fields=['category']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['avg_rating']),
+            models.Index(fields=['-downloads']),
+            models.Index(fields=['is_published']),
+            # Catalog listings: filter published (+ category), order by rank
+            models.Index(fields=['is_published', 'category', '-rank_score'], name='apps_app_pub_cat_rank_idx'),
+            models.Index(fields=['is_published', '-rank_score'], name='apps_app_pub_rank_idx'),
+            models.Index(fields=['rank_computed_at'], name='apps_app_rank_computed_idx'),
+        ]
+
+    objects = AppQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.title} (v{self.version})"
+    
+    def get_absolute_url(self):
+        from django.urls import reverse
+        return reverse('apps:detail', kwargs={'slug': self.slug})
+    
+    @property
+    def rating_histogram(self):
+        """[(stars, count, percent)] from 5 stars down to 1"""
+        counts = [(stars, getattr(self, f'rating_count_{stars}')) for stars in range(5, 0, -1)]
+        total = sum(count for _, count in counts)
+        return [(stars, count, round(count * 100 / total) if total else 0) for stars, count in counts]
+    
+    def get_compliance(self):
+        """This app's AppCompliance row, or an unsaved one with defaults"""
+        try:
+            return self.compliance
+        except AppCompliance.DoesNotExist:
+            self.compliance = AppCompliance(app=self)
+            return self.compliance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        compliance_fields = None
+        if update_fields is not None:
+            compliance_fields = [name for name in update_fields if name in COMPLIANCE_FIELDS]
+            kwargs['update_fields'] = [name for name in update_fields if name not in COMPLIANCE_FIELDS]
+        adding = self._state.adding
+        
+        if kwargs.get('update_fields') != []:
+            super().save(*args, **kwargs)
+        
+        # Save the compliance row if it was loaded/changed, or create it for new apps
+        if compliance_fields == []:
+            return
+        if 'compliance' in self._state.fields_cache or adding:
+            compliance = self.get_compliance()
+            compliance.app = self
+            if compliance_fields and not compliance._state.adding:
+                compliance.save(update_fields=[*compliance_fields, 'updated_at'])
+            else:
+                compliance.save()
+
+
+class AppCompliance(models.Model):
+    """
+    Copyright, takedown, verification and risk-review data for an App.
+    Split off the hot App row: only the copyright views, the detail page and
+    the admin read it. Fields are proxied on App for backwards compatibility.
+    """
+    app = models.OneToOneField(
+        App,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="compliance",
+        help_text="App this compliance record belongs to"
+    )
+    
     # ==================== Copyright & Legal ====================
     copyright_statement = models.TextField(
         blank=True,
@@ -245,21 +530,6 @@ class App(models.Model):
     )
     
     # ==================== Copyright Registration & Verification ====================
-    COPYRIGHT_PROTECTION_CHOICES = [
-        ('basic', 'Basic - Developer Statement Only'),
-        ('standard', 'Standard - Admin Verified'),
-        ('premium', 'Premium - Registered & Verified'),
-    ]
-    
-    LICENSE_TYPE_CHOICES = [
-        ('proprietary', 'Proprietary/Commercial'),
-        ('mit', 'MIT License'),
-        ('gpl', 'GPL License'),
-        ('apache', 'Apache License'),
-        ('bsd', 'BSD License'),
-        ('custom', 'Custom License'),
-        ('public_domain', 'Public Domain'),
-    ]
     
     copyright_registration_number = models.CharField(
         max_length=100,
@@ -281,14 +551,14 @@ class App(models.Model):
     
     copyright_protection_level = models.CharField(
         max_length=20,
-        choices=COPYRIGHT_PROTECTION_CHOICES,
+        choices=App.COPYRIGHT_PROTECTION_CHOICES,
         default='basic',
         help_text="Level of copyright protection"
     )
     
     copyright_license_type = models.CharField(
         max_length=20,
-        choices=LICENSE_TYPE_CHOICES,
+        choices=App.LICENSE_TYPE_CHOICES,
         default='proprietary',
         help_text="Type of license/copyright protection"
     )
@@ -314,7 +584,7 @@ class App(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name="verified_apps",
+        related_name="copyright_verified_compliance",
         help_text="Admin who verified copyright"
     )
     
@@ -347,15 +617,10 @@ class App(models.Model):
     )
     
     # ==================== Content Ownership & Source Verification ====================
-    CONTENT_OWNERSHIP_CHOICES = [
-        ('original', 'I am the original creator'),
-        ('permission', 'I have legal permission to share'),
-        ('informational', 'Sharing for informational purposes'),
-    ]
     
     content_ownership_type = models.CharField(
         max_length=20,
-        choices=CONTENT_OWNERSHIP_CHOICES,
+        choices=App.CONTENT_OWNERSHIP_CHOICES,
         default='informational',
         help_text="Declare your rights/ownership of this content"
     )
@@ -382,7 +647,7 @@ class App(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name="source_verified_apps",
+        related_name="source_verified_compliance",
         help_text="Admin who verified the source"
     )
     
@@ -392,16 +657,11 @@ class App(models.Model):
         help_text="When source was verified"
     )
     
-    # Platform compliance tracking
-    RISK_LEVEL_CHOICES = [
-        ('low', 'Low Risk - Verified Source'),
-        ('medium', 'Medium Risk - Unverified Source'),
-        ('high', 'High Risk - Requires Investigation'),
-    ]
+    # ==================== Platform Compliance Tracking ====================
     
     legal_risk_level = models.CharField(
         max_length=20,
-        choices=RISK_LEVEL_CHOICES,
+        choices=App.RISK_LEVEL_CHOICES,
         default='medium',
         help_text="Legal/copyright risk assessment"
     )
@@ -416,43 +676,47 @@ class App(models.Model):
         help_text="Admin notes about copyright/ownership verification"
     )
     
-    release_date = models.DateField(
-        auto_now_add=False,
-        default='2026-01-29',
-        help_text="Date when app was first published"
-    )
-    last_update_date = models.DateField(
-        auto_now=True,
-        help_text="Date of last update"
-    )
-    created_at = models.DateTimeField(
-        auto_now_add=True,
-        help_text="When this listing was created"
-    )
     updated_at = models.DateTimeField(
         auto_now=True,
-        help_text="Last modified"
+        help_text="Last modified (versions the cached copyright section)"
     )
-
+    
     class Meta:
-        ordering = ["-created_at"]
-        verbose_name = "App"
-        verbose_name_plural = "Apps"
-        indexes = [
-            models.Index(fields=['slug']),
-            models.Index(fields=['category']),
-            models.Index(fields=['created_at']),
-            models.Index(fields=['avg_rating']),
-            models.Index(fields=['-downloads']),
-            models.Index(fields=['is_published']),
-        ]
-
+        verbose_name = "App Compliance"
+        verbose_name_plural = "App Compliance"
+    
     def __str__(self):
-        return f"{self.title} (v{self.version})"
+        return f"Compliance: {self.app_id}"
+
+
+# Own bookkeeping, not proxied on App (App has its own updated_at)
+_UNPROXIED_COMPLIANCE_FIELDS = {'app', 'updated_at'}
+
+COMPLIANCE_FIELDS = frozenset(
+    field.name for field in AppCompliance._meta.concrete_fields
+    if field.name not in _UNPROXIED_COMPLIANCE_FIELDS
+)
+
+
+def _compliance_property(name):
+    def getter(app):
+        return getattr(app.get_compliance(), name)
     
-    def get_absolute_url(self):
-        from django.urls import reverse
-        return reverse('apps:detail', kwargs={'slug': self.slug})
+    def setter(app, value):
+        setattr(app.get_compliance(), name, value)
+    
+    return property(getter, setter, doc=AppCompliance._meta.get_field(name).help_text)
+
+
+# Backwards-compatible App.<field> access for every compliance field
+# (including <fk>_id attributes such as copyright_verified_by_id)
+for _field in AppCompliance._meta.concrete_fields:
+    if _field.name in _UNPROXIED_COMPLIANCE_FIELDS:
+        continue
+    setattr(App, _field.name, _compliance_property(_field.name))
+    if _field.attname != _field.name:
+        setattr(App, _field.attname, _compliance_property(_field.attname))
+del _field
 
 
 class AppScreenshot(models.Model):
@@ -487,6 +751,118 @@ class AppScreenshot(models.Model):
         return f"{self.app.title} - Screenshot {self.order}"
 
 
+class ApkBlob(models.Model):
+    """
+    A stored app binary (apps/apk_storage.py), shared by every App and
+    AppVersion whose apk_file has the same content
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        primary_key=True,
+        help_text="SHA256 of the file content"
+    )
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Storage name (apks/<2>/<2>/<sha256>.<ext>)"
+    )
+    size = models.PositiveBigIntegerField(help_text="File size in bytes")
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text="App and AppVersion rows using this file"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last stored or re-uploaded (garbage collection grace period)"
+    )
+    
+    # ==================== Extracted Metadata (manage.py process_apks) ====================
+    METADATA_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("done", "Extracted"),
+        ("failed", "Failed"),
+        ("skipped", "Not an APK"),
+    ]
+    metadata_status = models.CharField(
+        max_length=10,
+        choices=METADATA_STATUS_CHOICES,
+        default="pending",
+        db_index=True
+    )
+    package_name = models.CharField(max_length=255, blank=True)
+    version_name = models.CharField(max_length=100, blank=True)
+    version_code = models.PositiveBigIntegerField(null=True, blank=True)
+    min_sdk = models.PositiveSmallIntegerField(null=True, blank=True)
+    target_sdk = models.PositiveSmallIntegerField(null=True, blank=True)
+    native_abis = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Comma-separated ABIs of bundled native libraries (empty = any device)"
+    )
+    signing_cert_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA256 of the signing certificate"
+    )
+    icon = models.ImageField(
+        upload_to="apk_icons/",
+        blank=True,
+        null=True,
+        help_text="Launcher icon extracted from the APK"
+    )
+    metadata_error = models.CharField(max_length=255, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+    @classmethod
+    def register(cls, sha256, name, size):
+        """Record a stored (or re-uploaded) blob; returns the existing row for known content"""
+        blob, created = cls.objects.get_or_create(sha256=sha256, defaults={"name": name, "size": size})
+        if not created:
+            cls.objects.filter(pk=sha256).update(updated_at=timezone.now())
+        return blob
+
+    @classmethod
+    def adjust_refs(cls, name, delta):
+        """Add ``delta`` references to the blob stored as ``name`` (no-op for legacy files)"""
+        if not name:
+            return
+        queryset = cls.objects.filter(name=name)
+        if delta < 0:
+            queryset = queryset.filter(ref_count__gte=-delta)
+        queryset.update(ref_count=models.F("ref_count") + delta, updated_at=timezone.now())
+
+    def apply_metadata(self, **filters):
+        """Copy the extracted metadata to the App/AppVersion rows using this file"""
+        fields = {
+            "file_hash": self.sha256,
+            "size_mb": (Decimal(self.size) / (1024 * 1024)).quantize(Decimal("0.01")),
+        }
+        app_fields = dict(fields)
+        if self.version_name:
+            app_fields["version"] = self.version_name[:40]
+        if self.min_sdk:
+            app_fields["min_api_level"] = self.min_sdk
+            app_fields["min_android_version"] = ANDROID_VERSIONS.get(self.min_sdk, App.min_android_version.field.default)
+        if self.target_sdk:
+            app_fields["target_api_level"] = self.target_sdk
+            app_fields["target_android_version"] = ANDROID_VERSIONS.get(self.target_sdk, App.target_android_version.field.default)
+
+        apps = App.objects.filter(apk_file=self.name, **filters)
+        apps.update(**app_fields)
+        if self.icon:
+            apps.filter(models.Q(cover_image="") | models.Q(cover_image__isnull=True)).update(cover_image=self.icon.name)
+        AppVersion.objects.filter(apk_file=self.name, **filters).update(**fields)
+
+
 class AppVersion(models.Model):
     """
     Track different versions of an app
@@ -511,6 +887,13 @@ class AppVersion(models.Model):
         validators=[MinValueValidator(0)],
         help_text="App size in megabytes"
     )
+    apk_file = models.FileField(
+        upload_to="apks/",
+        storage=apk_storage,
+        blank=True,
+        null=True,
+        help_text="APK file of this version (shared with identical uploads)"
+    )
     download_link = models.URLField(
         blank=True,
         help_text="Download link for this version"
@@ -561,10 +944,15 @@ class Favorite(models.Model):
 
 
 class AppDownload(models.Model):
-    """Track app downloads for user history"""
+    """
+    Track app downloads for user history (user is empty for anonymous downloads).
+    Written in batches by apps/download_log.py, not per request.
+    """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        null=True,
+        blank=True,
         related_name="app_downloads"
     )
     app = models.ForeignKey(
@@ -572,7 +960,8 @@ class AppDownload(models.Model):
         on_delete=models.CASCADE,
         related_name="downloads_by"
     )
-    downloaded_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event is recorded - rows are inserted later, in batches
+    downloaded_at = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True)
     
@@ -584,7 +973,70 @@ class AppDownload(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.user.username} downloaded {self.app.title}"
+        who = self.user.username if self.user_id else "Anonymous"
+        return f"{who} downloaded {self.app.title}"
+
+
+class BufferedDownloadCount(models.Model):
+    """
+    Flush watermark of the buffered download counter (apps/download_counter.py):
+    how many of the app's counted downloads are already included in App.downloads
+    """
+    app = models.OneToOneField(
+        App,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="buffered_downloads"
+    )
+    flushed_total = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Counter total already added to App.downloads"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Buffered Download Count"
+
+    def __str__(self):
+        return f"{self.app_id}: {self.flushed_total}"
+
+
+class UploadSession(models.Model):
+    """
+    Resumable chunked upload of an app file (apps/chunked_upload.py).
+    Chunks are appended in order to a part file outside MEDIA_ROOT; the
+    finished file is moved into storage and attached to an App by
+    AppUploadForm via its ``upload_session`` field.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions"
+    )
+    filename = models.CharField(max_length=255, help_text="Original file name")
+    size = models.PositiveBigIntegerField(help_text="Declared total size in bytes")
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far (next chunk offset)")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Set when the upload completes")
+    stored_name = models.CharField(max_length=255, blank=True, help_text="Storage name of the finished file")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['owner', '-created_at']),
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
 
 
 class CopyrightClaim(models.Model):
@@ -896,3 +1348,81 @@ class CopyrightVerificationToken(models.Model):
     
     def __str__(self):
         return f"Verification Token: {self.app.title} ({self.email})"
+
+
+class SearchQueryLog(models.Model):
+    """
+    Daily search counts per normalized query.
+    Written in batches by apps.search_log - never one row per keystroke.
+    """
+    SOURCE_CHOICES = [
+        ('api', 'Realtime search box (every request, no longer logged)'),
+        ('box', 'Realtime search box (result picked)'),
+        ('page', 'Search results page'),
+    ]
+    
+    query = models.CharField(
+        max_length=100,
+        help_text="Normalized query (lower-cased, whitespace collapsed)"
+    )
+    source = models.CharField(
+        max_length=10,
+        choices=SOURCE_CHOICES,
+        default='api',
+        help_text="Where the search came from"
+    )
+    date = models.DateField(
+        help_text="Day the searches were made"
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of searches on this day"
+    )
+    result_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Results returned the last time this query ran"
+    )
+    
+    class Meta:
+        ordering = ['-date', '-count']
+        verbose_name = "Search Query Log"
+        verbose_name_plural = "Search Query Logs"
+        unique_together = ('query', 'source', 'date')
+        indexes = [
+            models.Index(fields=['date', '-count']),
+        ]
+    
+    def __str__(self):
+        return f"{self.query} ({self.source}, {self.date}): {self.count}"
+
+
+class PopularSearchQuery(models.Model):
+    """
+    Top search queries, rebuilt periodically by `manage.py rollup_search_queries`.
+    Results for these queries are pre-computed into the cache.
+    """
+    query = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Normalized query"
+    )
+    rank = models.PositiveIntegerField(
+        help_text="1 = most searched"
+    )
+    search_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Searches within the rollup window"
+    )
+    result_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Results for this query at rollup time"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['rank']
+        verbose_name = "Popular Search Query"
+        verbose_name_plural = "Popular Search Queries"
+    
+    def __str__(self):
+        return f"#{self.rank} {self.query} ({self.search_count})"
@@ -0,0 +1,237 @@
+"""
+In-process prefix index for search-as-you-type on very short queries.
+
+One- and two-character queries match a huge share of the catalog, so they
+are the most expensive to answer from the database and the least useful to
+rank. Each worker instead keeps a compact, array-backed index of the words
+in published app titles (Bengali and Latin) and answers those prefixes from
+memory, ordered by downloads like the database path.
+
+Layout (see ``PrefixIndex``):
+    words     sorted list of unique lower-cased title words
+    offsets   array('q'), words[i] owns postings[offsets[i]:offsets[i + 1]]
+    postings  array('l') of app ordinals, ascending == most downloaded first
+    app_ids   array('q') mapping ordinal -> App.id
+    short     {prefix (1-2 chars): array('l') of the top ordinals}
+    payloads  serialized search results for apps that appear in ``short``
+
+The index is built when the worker starts (config/wsgi.py) and rebuilt in
+the background after App rows are saved or deleted. Other workers notice a
+change through a version counter in the cache, and through the catalog and
+ranking cache tags (``queryset.update()`` sends no signals). Counters that
+change without bumping a tag (downloads, ratings) are refreshed by
+rebuilding at least every MAX_INDEX_AGE seconds. A failed build is retried
+in the background after RETRY_AFTER_FAILURE seconds; meanwhile short
+queries go to the database.
+
+Run ``python manage.py prefix_index_report`` for a memory budget report.
+"""
+import heapq
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import groupby
+
+from django.core.cache import cache
+
+from core.cache_tags import CATALOG, RANKING, tag_versions
+from .autocomplete import WORD_RE
+
+logger = logging.getLogger(__name__)
+
+
+# Queries up to this length are answered from the precomputed table
+SHORT_PREFIX_LENGTH = 2
+
+# Results kept per short prefix (search_api returns at most 10)
+TOP_K = 10
+
+VERSION_CACHE_KEY = 'apps:prefix_index:version'
+
+# How often a worker checks the shared version counter, and the minimum gap
+# between two rebuilds (bursts of saves coalesce into one rebuild)
+VERSION_CHECK_INTERVAL = 5
+MIN_REBUILD_INTERVAL = 10
+
+# Payloads snapshot downloads and ratings; rebuild at least this often
+MAX_INDEX_AGE = 60 * 15
+
+# Wait this long after a failed build before trying again
+RETRY_AFTER_FAILURE = 60
+
+
+def current_version():
+    """What the index was built from: the save/delete counter plus the cache tags"""
+    versions = tag_versions([CATALOG, RANKING])
+    return cache.get(VERSION_CACHE_KEY), versions[CATALOG], versions[RANKING]
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall((text or '').lower()))
+
+
+class PrefixIndex:
+    """Immutable array-backed word prefix index. ``rows`` are (app_id, title, downloads)."""
+
+    def __init__(self, rows, top_k=TOP_K):
+        # Ordinal order == downloads desc, so "smallest ordinal" == "most popular"
+        rows = sorted(rows, key=lambda row: (-(row[2] or 0), row[0]))
+        self.app_ids = array('q', (row[0] for row in rows))
+
+        word_postings = defaultdict(list)
+        for ordinal, (_, title, _) in enumerate(rows):
+            for word in set(WORD_RE.findall((title or '').lower())):
+                word_postings[word].append(ordinal)
+
+        self.words = sorted(word_postings)
+        self.offsets = array('q', [0])
+        self.postings = array('l')
+        for word in self.words:
+            self.postings.extend(word_postings[word])
+            self.offsets.append(len(self.postings))
+        del word_postings
+
+        self.short = {}
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            for prefix, indexes in groupby(range(len(self.words)), key=lambda i: self.words[i][:length]):
+                if len(prefix) != length:
+                    continue  # word shorter than the prefix; covered by the shorter length
+                ordinals = set()
+                for i in indexes:
+                    ordinals.update(self.postings[self.offsets[i]:self.offsets[i + 1]])
+                self.short[prefix] = array('l', heapq.nsmallest(top_k, ordinals))
+
+        self.payloads = {}
+
+    def short_prefix_app_ids(self):
+        """Every App.id that can be returned for a short prefix"""
+        return {self.app_ids[o] for ordinals in self.short.values() for o in ordinals}
+
+    def lookup(self, prefix, limit=TOP_K):
+        """App ids whose title has a word starting with ``prefix``, most downloaded first"""
+        prefix = normalize(prefix)
+        if not prefix or ' ' in prefix:
+            return []
+
+        if prefix in self.short:
+            return [self.app_ids[o] for o in self.short[prefix][:limit]]
+
+        lo = bisect_left(self.words, prefix)
+        hi = bisect_left(self.words, prefix + '\U0010ffff', lo)
+        slices = [self.postings[self.offsets[i]:self.offsets[i + 1]] for i in range(lo, hi)]
+        ids = []
+        last = None
+        for ordinal in heapq.merge(*slices):
+            if ordinal != last:
+                ids.append(self.app_ids[ordinal])
+                last = ordinal
+                if len(ids) >= limit:
+                    break
+        return ids
+
+
+class LivePrefixIndex:
+    """Per-worker holder that loads, serves and refreshes a PrefixIndex"""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._built_version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._failed_at = None
+        self._dirty = False
+        self._building = False
+
+    def load(self):
+        """Build synchronously (worker start-up). Failures are logged, not raised."""
+        try:
+            self._rebuild()
+        except Exception:
+            self._build_failed()
+            logger.exception("Prefix index build failed")
+
+    def invalidate(self):
+        """Called from App save/delete signals"""
+        self._dirty = True
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, None)
+
+    def results(self, query, limit=TOP_K):
+        """
+        Serialized search results for a short query, or None when the query
+        should go to the database instead.
+        """
+        if len(query.strip()) > SHORT_PREFIX_LENGTH:
+            return None
+        if self._index is None:
+            # Never built (or the build failed): build off the request path
+            self._dirty = True
+            self._maybe_refresh()
+            return None
+        self._maybe_refresh()
+
+        index = self._index
+        prefix = normalize(query)
+        if prefix not in index.short:
+            return [] if prefix and ' ' not in prefix else None
+        return [index.payloads[app_id] for app_id in index.lookup(prefix, limit) if app_id in index.payloads]
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if not self._dirty and now - self._checked_at >= VERSION_CHECK_INTERVAL:
+            self._checked_at = now
+            if now - self._built_at >= MAX_INDEX_AGE or current_version() != self._built_version:
+                self._dirty = True
+        if not self._dirty or self._building or now - self._built_at < MIN_REBUILD_INTERVAL:
+            return
+        if self._failed_at is not None and now - self._failed_at < RETRY_AFTER_FAILURE:
+            return
+        self._building = True
+        threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _build_failed(self):
+        self._failed_at = time.monotonic()
+        self._dirty = True  # retried once RETRY_AFTER_FAILURE has passed
+
+    def _background_rebuild(self):
+        try:
+            self._rebuild()
+        except Exception:
+            self._build_failed()
+            logger.exception("Prefix index refresh failed")
+        finally:
+            self._building = False
+            from django.db import connection
+            connection.close()  # thread-local connection opened by the rebuild
+
+    def _rebuild(self):
+        from .models import App
+        from .search import serialize_search_result
+
+        with self._lock:
+            self._dirty = False
+            version = current_version()
+            started = time.monotonic()
+
+            rows = App.objects.filter(is_published=True).values_list('id', 'title', 'downloads')
+            index = PrefixIndex(rows.iterator())
+            apps = App.objects.filter(id__in=list(index.short_prefix_app_ids())).cards()
+            index.payloads = {app.id: serialize_search_result(app) for app in apps}
+
+            self._index = index
+            self._built_version = version
+            self._built_at = self._checked_at = time.monotonic()
+            self._failed_at = None
+            logger.info(
+                "Prefix index built: %d apps, %d words in %.0f ms",
+                len(index.app_ids), len(index.words), (self._built_at - started) * 1000,
+            )
+
+
+prefix_index = LivePrefixIndex()
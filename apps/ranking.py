@@ -0,0 +1,116 @@
+"""
+Catalog ranking score.
+
+    rank_score = 0.50 * popularity   log10(downloads + 1) / 7, capped at 1 (10M downloads)
+               + 0.35 * rating       Bayesian average over total_ratings, / 5
+               + 0.15 * freshness    0.5 ** (days since last update / 90)
+
+The Bayesian average pulls apps with few ratings towards the catalog mean:
+    (PRIOR_RATINGS * mean + avg_rating * total_ratings) / (PRIOR_RATINGS + total_ratings)
+
+Scores are stored in ``App.rank_score`` and refreshed in batches by
+``manage.py recompute_rank_scores``, so listings can order by one indexed
+column.
+"""
+import math
+from datetime import timedelta
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from core.cache_tags import RANKING, bump_tags
+from .models import App
+
+
+POPULARITY_WEIGHT = 0.50
+RATING_WEIGHT = 0.35
+FRESHNESS_WEIGHT = 0.15
+
+# Downloads at which popularity saturates (log scale)
+POPULARITY_CAP_LOG10 = 7
+
+# Bayesian prior: how many "virtual" ratings at the catalog mean every app starts with
+PRIOR_RATINGS = 10
+DEFAULT_MEAN_RATING = 3.5
+
+FRESHNESS_HALF_LIFE_DAYS = 90
+
+# Scores older than this are recomputed even if the app did not change
+# (downloads move via queryset.update() and freshness decays over time)
+MAX_SCORE_AGE = timedelta(hours=6)
+
+RANK_FIELDS = ('downloads', 'avg_rating', 'total_ratings', 'updated_at', 'created_at')
+
+
+def catalog_mean_rating():
+    """Rating mean across all ratings in the catalog"""
+    totals = App.objects.filter(total_ratings__gt=0).aggregate(
+        weighted=Sum(F('avg_rating') * F('total_ratings')),
+        ratings=Sum('total_ratings'),
+    )
+    if not totals['ratings']:
+        return DEFAULT_MEAN_RATING
+    return float(totals['weighted']) / totals['ratings']
+
+
+def compute_rank_score(app, mean_rating, now=None):
+    now = now or timezone.now()
+
+    popularity = min(math.log10((app.downloads or 0) + 1) / POPULARITY_CAP_LOG10, 1.0)
+
+    total_ratings = app.total_ratings or 0
+    bayesian = (
+        (PRIOR_RATINGS * mean_rating + float(app.avg_rating or 0) * total_ratings)
+        / (PRIOR_RATINGS + total_ratings)
+    )
+    rating = bayesian / 5
+
+    last_change = app.updated_at or app.created_at or now
+    age_days = max((now - last_change).total_seconds() / 86400, 0)
+    freshness = 0.5 ** (age_days / FRESHNESS_HALF_LIFE_DAYS)
+
+    return round(
+        POPULARITY_WEIGHT * popularity + RATING_WEIGHT * rating + FRESHNESS_WEIGHT * freshness,
+        6,
+    )
+
+
+def stale_rank_queryset(now=None, full=False):
+    """Apps whose score is missing, older than the app's last edit, or past MAX_SCORE_AGE"""
+    queryset = App.objects.all()
+    if not full:
+        now = now or timezone.now()
+        queryset = queryset.filter(
+            Q(rank_computed_at__isnull=True) |
+            Q(rank_computed_at__lt=F('updated_at')) |
+            Q(rank_computed_at__lt=now - MAX_SCORE_AGE)
+        )
+    return queryset
+
+
+def recompute_rank_scores(batch_size=1000, full=False, limit=None):
+    """
+    Recompute stale scores in primary-key batches with bulk_update.
+    bulk_update does not touch ``updated_at`` (auto_now), so scoring never
+    makes an app look edited. Returns the number of apps updated.
+    """
+    now = timezone.now()
+    mean_rating = catalog_mean_rating()
+    queryset = stale_rank_queryset(now, full).only('id', *RANK_FIELDS).order_by('id')
+
+    updated = 0
+    last_id = 0
+    while limit is None or updated < limit:
+        size = batch_size if limit is None else min(batch_size, limit - updated)
+        batch = list(queryset.filter(id__gt=last_id)[:size])
+        if not batch:
+            break
+        for app in batch:
+            app.rank_score = compute_rank_score(app, mean_rating, now)
+            app.rank_computed_at = now
+        App.objects.bulk_update(batch, ['rank_score', 'rank_computed_at'])
+        updated += len(batch)
+        last_id = batch[-1].id
+    if updated:
+        bump_tags([RANKING])  # one bump per run: ranked listings' ETags change
+    return updated
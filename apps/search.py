@@ -0,0 +1,131 @@
+"""
+Search backend for the app catalog.
+
+On PostgreSQL, queries run against ``App.search_vector`` (weighted
+title > short_description > description, kept up to date by a trigger and
+GIN indexed - see migration 0018) and results are ranked with ``ts_rank``.
+Other databases (SQLite in development) fall back to ``icontains`` matching.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import DecimalField, F, Q
+from django.db.models.functions import Cast
+
+from categories.models import Category
+from .autocomplete import suggest_apps
+from .models import App
+from .prefix_index import prefix_index
+
+
+SEARCH_CONFIG = 'simple'
+
+# ts_rank returns a float4; cast to numeric so the rank round-trips exactly
+# through a pagination cursor and compares with = / < as a keyset key
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=6)
+
+# Characters with a meaning in tsquery syntax - stripped from user input
+TSQUERY_SPECIAL_CHARS = re.compile(r"[&|!():*<>'\"\\]")
+
+
+def is_full_text_enabled(queryset):
+    """True when the queryset's database supports the tsvector search path"""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def build_search_query(query):
+    """
+    Turn raw user input into a prefix tsquery, e.g. "whats app" -> 'whats:* & app:*'.
+    Prefix matching keeps search-as-you-type working on partial words.
+    Returns None if nothing searchable is left.
+    """
+    terms = TSQUERY_SPECIAL_CHARS.sub(' ', query).split()
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f"{term}:*" for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_apps(queryset, query, match_version=False):
+    """
+    Filter an App queryset by a search query.
+
+    PostgreSQL: GIN-indexed full-text match (plus category-name match),
+    ordered by rank and then by the queryset's existing ordering.
+    Fallback: the legacy icontains OR over title/descriptions/category,
+    keeping the queryset's ordering.
+    ``match_version`` also matches ``version`` (icontains) on both paths, as
+    the app list always did; it is not part of search_vector.
+    """
+    if not is_full_text_enabled(queryset):
+        condition = (
+            Q(title__icontains=query) |
+            Q(short_description__icontains=query) |
+            Q(description__icontains=query) |
+            Q(category__name__icontains=query)
+        )
+        if match_version:
+            condition |= Q(version__icontains=query)
+        return queryset.filter(condition)
+
+    search_query = build_search_query(query)
+    if search_query is None:
+        return queryset.none()
+
+    # Category table is tiny - resolve matching ids up front so the planner
+    # can BitmapOr the GIN index with the category index
+    category_ids = Category.objects.filter(name__icontains=query).values('id')
+
+    condition = Q(search_vector=search_query) | Q(category_id__in=category_ids)
+    if match_version:
+        condition |= Q(version__icontains=query)
+    return queryset.annotate(
+        search_rank=Cast(SearchRank(F('search_vector'), search_query), RANK_FIELD),
+    ).filter(condition).order_by('-search_rank', *queryset.query.order_by)
+
+
+def serialize_search_result(app):
+    """JSON shape of one app in the search_api response"""
+    return {
+        'id': app.id,
+        'title': app.title,
+        'slug': app.slug,
+        'icon': app.cover_image.url if app.cover_image else '/static/images/default-app-icon.png',
+        'short_description': app.short_description[:100] if app.short_description else '',
+        'category': app.category.name or 'অন্যান্য',
+        'rating': round(app.avg_rating or 0, 1),
+        'download_count': app.downloads or 0,
+    }
+
+
+def find_search_results(query, mode=''):
+    """
+    search_api results for a query: (serialized apps, fuzzy flag).
+
+    1-2 characters  -> in-process prefix index (no database)
+    mode=autocomplete -> trigram suggestions
+    otherwise       -> full-text search, falling back to trigram
+                       suggestions when nothing matches (typos)
+    """
+    fuzzy = mode == 'autocomplete'
+
+    short_results = None if fuzzy else prefix_index.results(query)
+    if short_results is not None:
+        return short_results, False
+
+    if fuzzy:
+        apps = suggest_apps(query)
+    else:
+        apps = list(search_apps(
+            App.objects.filter(is_published=True).order_by('-rank_score', '-id'),
+            query,
+        ).cards()[:10])
+        if not apps:
+            apps = suggest_apps(query)
+            fuzzy = True
+
+    return [serialize_search_result(app) for app in apps], fuzzy
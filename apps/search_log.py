@@ -0,0 +1,159 @@
+"""
+Search query log and popular-query result cache.
+
+Searches are counted in a per-process buffer and written to
+``SearchQueryLog`` in bulk (one SELECT + bulk_update/bulk_create per flush)
+from a background thread, FLUSH_INTERVAL seconds after a search is
+buffered or after FLUSH_SIZE distinct queries (core/buffering.py) - never
+one INSERT per keystroke.
+
+Only settled queries are logged: the search results page ('page') and a
+realtime-box query whose result the user picked ('box', search_api with
+``final=1``). The box's per-keystroke requests are not, so "wha", "what"
+and "whats" do not crowd the real queries out of the rollup.
+
+``manage.py rollup_search_queries`` (run from cron) ranks the top queries
+into ``PopularSearchQuery`` and stores their search_api results in the
+cache, so the most common searches are answered without touching the
+database. The results are cached under the catalog tag: an app change
+makes them miss (search_api queries live) until the next rollup.
+"""
+import atexit
+import hashlib
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from core.buffering import BackgroundFlushMixin
+from core.cache_tags import CATALOG, tagged_key
+
+logger = logging.getLogger(__name__)
+
+
+MAX_QUERY_LENGTH = 100
+
+# Single-character keystrokes say nothing about intent - don't log them
+MIN_QUERY_LENGTH = 2
+
+FLUSH_INTERVAL = 30  # seconds
+FLUSH_SIZE = 500  # distinct (query, source) pairs
+
+POPULAR_RESULTS_TIMEOUT = 60 * 60 * 2  # outlives an hourly rollup
+
+# SearchQueryLog sources the rollup ranks ('api' rows are per-keystroke, legacy)
+SETTLED_SOURCES = ('page', 'box')
+
+
+def normalize_query(query):
+    """Lower-case, collapse whitespace, cap length"""
+    return ' '.join((query or '').lower().split())[:MAX_QUERY_LENGTH]
+
+
+def popular_results_key(query):
+    digest = hashlib.md5(normalize_query(query).encode('utf-8')).hexdigest()
+    return tagged_key(f'search:popular:{digest}', [CATALOG])
+
+
+def get_popular_results(query):
+    """Cached search_api payload for a popular query, or None"""
+    return cache.get(popular_results_key(query))
+
+
+def set_popular_results(query, payload):
+    cache.set(popular_results_key(query), payload, POPULAR_RESULTS_TIMEOUT)
+
+
+class SearchLogBuffer(BackgroundFlushMixin):
+    """Thread-safe per-process counter of searches, flushed to the database in bulk"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (query, source) -> [count, result_count]
+        self._last_flush = time.monotonic()
+        self._init_background_flush()
+
+    def record(self, query, source, result_count=0):
+        query = normalize_query(query)
+        if len(query) < MIN_QUERY_LENGTH:
+            return
+
+        with self._lock:
+            entry = self._pending.setdefault((query, source), [0, 0])
+            entry[0] += 1
+            entry[1] = result_count
+            self._flush_soon(
+                len(self._pending) >= FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+
+    def flush_interval(self):
+        return FLUSH_INTERVAL
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        return pending
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, (count, result_count) in pending.items():
+                entry = self._pending.setdefault(key, [0, result_count])
+                entry[0] += count
+
+    def flush(self):
+        """Write buffered counts to SearchQueryLog. Returns number of rows touched."""
+        from .models import SearchQueryLog
+
+        pending = self._take()
+        if not pending:
+            return 0
+
+        today = timezone.localdate()
+        try:
+            with transaction.atomic():
+                existing = {
+                    (row.query, row.source): row
+                    for row in SearchQueryLog.objects.select_for_update().filter(
+                        date=today,
+                        query__in={query for query, _ in pending},
+                    )
+                }
+                to_update, to_create = [], []
+                for (query, source), (count, result_count) in pending.items():
+                    row = existing.get((query, source))
+                    if row is not None:
+                        row.count += count
+                        row.result_count = result_count
+                        to_update.append(row)
+                    else:
+                        to_create.append(SearchQueryLog(
+                            query=query, source=source, date=today,
+                            count=count, result_count=result_count,
+                        ))
+                SearchQueryLog.objects.bulk_update(to_update, ['count', 'result_count'])
+                SearchQueryLog.objects.bulk_create(to_create)
+        except DatabaseError:
+            # e.g. another worker created the same row first - retry on the next flush
+            logger.warning("Search log flush failed, keeping %d entries buffered", len(pending), exc_info=True)
+            self._restore(pending)
+            return 0
+        return len(pending)
+
+
+search_log = SearchLogBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        search_log.flush()
+    except Exception:
+        pass
@@ -0,0 +1,119 @@
+"""
+Django signals for apps app
+Keeps in-process search indexes, cache tags and APK blob reference
+counts in sync with App writes
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from categories.models import Category
+from core.cache_tags import app_tags, bump_tags, category_tag
+from .apk_storage import blob_sha256
+from .autocomplete import trigram_index
+from .prefix_index import prefix_index
+from .models import ApkBlob, App, AppScreenshot, AppVersion
+from .ranking import DEFAULT_MEAN_RATING, compute_rank_score
+
+
+def _quiet_save(update_fields):
+    """save(update_fields=...) touching only counters/ranking (see AppQuerySet.quiet_fields)"""
+    return bool(update_fields) and set(update_fields) <= App.objects.get_queryset().quiet_fields
+
+
+@receiver(pre_save, sender=App)
+def app_rank_score_handler(sender, instance, **kwargs):
+    """
+    Give new apps a provisional rank_score so they show up in ranked listings
+    right away. rank_computed_at stays empty, so the next
+    recompute_rank_scores run scores them against the real catalog mean.
+    """
+    if instance.pk is None and not instance.rank_computed_at:
+        instance.rank_score = compute_rank_score(instance, DEFAULT_MEAN_RATING)
+
+
+@receiver(pre_save, sender=App)
+def app_previous_category_handler(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored category so moving an app invalidates both categories"""
+    instance._previous_category_id = None
+    if instance.pk and not raw and not _quiet_save(update_fields):
+        instance._previous_category_id = (
+            App.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=App)
+@receiver(post_delete, sender=App)
+def app_changed_handler(sender, instance, **kwargs):
+    """Mark in-process search indexes stale after an App is saved or deleted"""
+    trigram_index.invalidate()
+    prefix_index.invalidate()
+
+
+@receiver(post_save, sender=App)
+@receiver(post_delete, sender=App)
+def app_cache_tags_handler(sender, instance, update_fields=None, **kwargs):
+    """Invalidate cached pages/fragments that show this app"""
+    if _quiet_save(update_fields):
+        return
+    category_ids = {instance.category_id, getattr(instance, '_previous_category_id', None)} - {None}
+    slugs = Category.objects.filter(id__in=category_ids).values_list('slug', flat=True)
+    tags = app_tags([(instance.pk, None)])
+    tags.update(category_tag(slug) for slug in slugs)
+    bump_tags(tags)
+
+
+@receiver(post_save, sender=AppScreenshot)
+@receiver(post_delete, sender=AppScreenshot)
+def screenshot_changed_handler(sender, instance, **kwargs):
+    """
+    Touch the app's updated_at: it versions the cached screenshot section
+    (apps/fragments.py) and the update bumps the app's cache tags.
+    """
+    App.objects.filter(pk=instance.app_id).update(updated_at=timezone.now())
+
+
+def _loaded_apk_name(instance):
+    """apk_file name held by the instance, or None if the field is deferred"""
+    if 'apk_file' not in instance.__dict__:
+        return None
+    value = instance.__dict__['apk_file']
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=App)
+@receiver(post_init, sender=AppVersion)
+def apk_file_loaded_handler(sender, instance, **kwargs):
+    """Remember the stored apk_file name to count blob references on save"""
+    instance._stored_apk_name = _loaded_apk_name(instance)
+
+
+@receiver(post_save, sender=App)
+@receiver(post_save, sender=AppVersion)
+def apk_file_saved_handler(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Move a blob reference when apk_file changes; file_hash follows the stored content"""
+    if raw or (update_fields is not None and 'apk_file' not in update_fields):
+        return
+    previous = '' if created else instance._stored_apk_name
+    current = _loaded_apk_name(instance)
+    if previous is None or current is None or previous == current:
+        return  # unchanged, or not loaded (gc_apk_blobs --recount repairs counts)
+    ApkBlob.adjust_refs(current, 1)
+    ApkBlob.adjust_refs(previous, -1)
+    instance._stored_apk_name = current
+
+    sha256 = blob_sha256(current)
+    if sha256 and instance.file_hash != sha256:
+        instance.file_hash = sha256
+        sender.objects.filter(pk=instance.pk).update(file_hash=sha256)
+    # A re-uploaded build was already parsed: fill the fields now, not after process_apks
+    blob = ApkBlob.objects.filter(pk=sha256, metadata_status='done').first() if sha256 else None
+    if blob is not None:
+        blob.apply_metadata(pk=instance.pk)
+
+
+@receiver(post_delete, sender=App)
+@receiver(post_delete, sender=AppVersion)
+def apk_file_deleted_handler(sender, instance, **kwargs):
+    """Drop the deleted row's blob reference (the file goes with gc_apk_blobs)"""
+    ApkBlob.adjust_refs(_loaded_apk_name(instance) or instance._stored_apk_name, -1)
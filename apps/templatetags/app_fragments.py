@@ -0,0 +1,36 @@
+"""
+Template tags for the versioned fragment cache (see apps/fragments.py)
+"""
+from django import template
+
+from apps import fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def render_app_cards(context, apps, template_name, **extra):
+    """Render a grid of cards with one cache round-trip; extra kwargs go to each card"""
+    # Extra objects vary the key by pk (and colour - category cards are tinted with it)
+    vary = [
+        (name, getattr(value, 'pk', value), getattr(value, 'color', ''))
+        for name, value in sorted(extra.items())
+    ]
+    return fragments.render_app_cards(
+        apps, template_name, extra, request=context.get('request'), vary=vary,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def app_fragment(context, template_name, app):
+    """A cached detail-page section; per-user slots inside are rendered for page_user"""
+    page_user = context.get('page_user')
+    return fragments.render_app_fragment(
+        template_name, app, {'page_user': page_user}, request=context.get('request'),
+        vary=[getattr(page_user, 'pk', None)],
+    )
+
+
+@register.simple_tag(takes_context=True)
+def category_filter(context, categories, selected):
+    return fragments.render_category_filter(categories, selected, request=context.get('request'))
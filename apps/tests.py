@@ -1,3 +1,688 @@
-from django.test import TestCase
+import datetime
+import hashlib
+from io import BytesIO, StringIO
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+import zipfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from categories.models import Category
+from . import download_counter as download_counter_module
+from . import download_log as download_log_module
+from . import search as search_module
+from . import search_log as search_log_module
+from .apk_metadata import ApkParseError, extract_metadata
+from .delivery import download_filename, is_resumed, requested_range
+from .management.commands.process_apks import Command as ProcessApksCommand
+from .models import ApkBlob, App, AppCompliance, BufferedDownloadCount, PopularSearchQuery, SearchQueryLog
+
+
+# ==================== DELIVERY ====================
+
+class RequestedRangeTests(SimpleTestCase):
+    factory = RequestFactory()
+    etag = '65f1a2b3-3e8'
+
+    def range_for(self, header, size=1000, **extra):
+        request = self.factory.get('/', HTTP_RANGE=header, **extra)
+        return requested_range(request, size, self.etag)
+
+    def test_no_range_sends_whole_file(self):
+        self.assertIsNone(requested_range(self.factory.get('/'), 1000, self.etag))
+
+    def test_open_ended_range(self):
+        self.assertEqual(self.range_for('bytes=100-'), (100, 999))
+
+    def test_closed_range_is_clamped_to_the_file(self):
+        self.assertEqual(self.range_for('bytes=0-99'), (0, 99))
+        self.assertEqual(self.range_for('bytes=900-5000'), (900, 999))
+
+    def test_suffix_range(self):
+        self.assertEqual(self.range_for('bytes=-100'), (900, 999))
+        self.assertEqual(self.range_for('bytes=-5000'), (0, 999))
+
+    def test_unsatisfiable_ranges(self):
+        self.assertIs(self.range_for('bytes=1000-'), False)
+        self.assertIs(self.range_for('bytes=500-100'), False)
+        self.assertIs(self.range_for('bytes=-0'), False)
+
+    def test_malformed_or_multiple_ranges_are_ignored(self):
+        self.assertIsNone(self.range_for('bytes=-'))
+        self.assertIsNone(self.range_for('bytes=0-10,20-30'))
+        self.assertIsNone(self.range_for('items=0-10'))
+
+    def test_empty_file_ignores_range(self):
+        self.assertIsNone(self.range_for('bytes=0-', size=0))
+
+    def test_if_range_matching_etag(self):
+        self.assertEqual(self.range_for('bytes=100-', HTTP_IF_RANGE=quote_etag(self.etag)), (100, 999))
+
+    def test_if_range_changed_file_sends_whole_file(self):
+        self.assertIsNone(self.range_for('bytes=100-', HTTP_IF_RANGE='"0-0"'))
+        request = self.factory.get('/', HTTP_RANGE='bytes=100-', HTTP_IF_RANGE=quote_etag(self.etag))
+        self.assertIsNone(requested_range(request, 1000, None))
+
+
+class IsResumedTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def test_new_downloads(self):
+        self.assertFalse(is_resumed(self.factory.get('/')))
+        self.assertFalse(is_resumed(self.factory.get('/', HTTP_RANGE='bytes=0-')))
+        self.assertFalse(is_resumed(self.factory.get('/', HTTP_RANGE='bytes=0-1023')))
+
+    def test_resumed_downloads(self):
+        self.assertTrue(is_resumed(self.factory.get('/', HTTP_RANGE='bytes=1024-')))
+        self.assertTrue(is_resumed(self.factory.get('/', HTTP_RANGE='bytes=-1024')))
+
+
+class DownloadFilenameTests(SimpleTestCase):
+    def filename(self, title, version, name='apks/ab/cd/abcd.apk'):
+        return download_filename(SimpleNamespace(title=title, version=version, apk_file=SimpleNamespace(name=name)))
+
+    def test_version_keeps_its_dots(self):
+        self.assertEqual(self.filename('My App', '1.0'), 'my-app-1.0.apk')
+        self.assertEqual(self.filename('My App', '2.10.3 beta'), 'my-app-2.10.3-beta.apk')
+
+    def test_without_version(self):
+        self.assertEqual(self.filename('My App', ''), 'my-app.apk')
+
+
+class DownloadCountingTests(TestCase):
+    """HEAD probes, 304s and resumed requests are served but not counted"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root, APK_ACCEL_REDIRECT_PREFIX='')
+        cls.media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user(username='dev', password='secret-pass-123')
+        category = Category.objects.create(name='Tools', slug='tools')
+        self.app = App(owner=owner, category=category, title='Counter', slug='counter', version='1.0', is_published=True)
+        self.app.apk_file.save('counter.apk', ContentFile(b'x' * 4096), save=False)
+        self.app.save()
+        self.url = reverse('apps:download', kwargs={'slug': self.app.slug})
+
+        patcher = mock.patch('apps.views.download_counter')
+        self.counter = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('apps.views.download_log')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_full_download_is_counted(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="counter-1.0.apk"')
+        self.counter.record.assert_called_once_with(self.app.pk)
+
+    def test_range_from_zero_is_counted(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-1023')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-1023/4096')
+        self.counter.record.assert_called_once_with(self.app.pk)
+
+    def test_resumed_download_is_not_counted(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1024-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'x' * 3072)
+        self.counter.record.assert_not_called()
+
+    def test_unsatisfiable_range_is_not_counted(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */4096')
+        self.counter.record.assert_not_called()
+
+    def test_head_is_not_counted(self):
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.counter.record.assert_not_called()
+
+    def test_missing_file_is_not_found(self):
+        self.app.apk_file.storage.delete(self.app.apk_file.name)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.counter.record.assert_not_called()
+
+    def test_not_modified_is_not_counted(self):
+        etag = self.client.get(self.url)['ETag']
+        self.counter.record.reset_mock()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.counter.record.assert_not_called()
+
+
+# ==================== APK METADATA ====================
+# Synthetic APKs built chunk by chunk (ResourceTypes.h layouts), so the
+# parser's struct offsets are checked without shipping real APK files.
+
+ICON_ID = 0x7F010000
+VERSION_STRING_ID = 0x7F020000
+TYPE_REFERENCE, TYPE_STRING, TYPE_INT_DEC = 0x01, 0x03, 0x10
+NO_ENTRY = 0xFFFFFFFF
+
+
+def _pad4(data):
+    return data + b'\0' * (-len(data) % 4)
+
+
+def string_pool(strings, utf8=False):
+    encoded = []
+    for string in strings:
+        if utf8:
+            raw = string.encode('utf-8')
+            encoded.append(bytes([len(string), len(raw)]) + raw + b'\0')
+        else:
+            encoded.append(struct.pack('<H', len(string)) + string.encode('utf-16-le') + b'\0\0')
+    offsets, position = [], 0
+    for item in encoded:
+        offsets.append(position)
+        position += len(item)
+    header_size = 28
+    strings_start = header_size + 4 * len(strings)
+    body = struct.pack(f'<{len(strings)}I', *offsets) + _pad4(b''.join(encoded))
+    return struct.pack(
+        '<HHIIIIII', 0x0001, header_size, header_size + len(body), len(strings), 0,
+        0x100 if utf8 else 0, strings_start, 0,
+    ) + body
+
+
+def binary_xml(elements, utf8=False):
+    """elements: [(name, [(attribute name, resource id or None, type, value)])]"""
+    names = []
+    for name, attributes in elements:
+        for attribute, resource_id, _, _ in attributes:
+            if resource_id and attribute not in names:
+                names.append(attribute)
+    resource_ids = [
+        next(rid for _, attributes in elements for attr, rid, _, _ in attributes if attr == name)
+        for name in names
+    ]
+    strings = list(names)
+
+    def index(string):
+        if string not in strings:
+            strings.append(string)
+        return strings.index(string)
+
+    chunks = []
+    for name, attributes in elements:
+        packed = b''
+        for attribute, _, value_type, value in attributes:
+            raw = NO_ENTRY
+            if value_type == TYPE_STRING:
+                value = raw = index(value)
+            packed += struct.pack('<IIIHBBI', NO_ENTRY, index(attribute), raw, 8, 0, value_type, value)
+        body = struct.pack('<IIHHHHHH', NO_ENTRY, index(name), 20, 20, len(attributes), 0, 0, 0) + packed
+        chunks.append(struct.pack('<HHIII', 0x0102, 16, 16 + len(body), 1, NO_ENTRY) + body)
+
+    resource_map = struct.pack('<HHI', 0x0180, 8, 8 + 4 * len(resource_ids)) + struct.pack(
+        f'<{len(resource_ids)}I', *resource_ids
+    )
+    body = string_pool(strings, utf8) + resource_map + b''.join(chunks)
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(body)) + body
+
+
+def type_chunk(type_id, entries, density=0, layout='dense'):
+    """entries: {entry index: (type, value)} of one configuration"""
+    entry_data, slots = b'', {}
+    for index, (value_type, value) in sorted(entries.items()):
+        slots[index] = len(entry_data)
+        if layout == 'offset16':  # compact entry: type in the high flag byte
+            entry_data += struct.pack('<HHI', 0, 0x0008 | (value_type << 8), value)
+        else:
+            entry_data += struct.pack('<HHI', 8, 0, 0) + struct.pack('<HBBI', 8, 0, value_type, value)
+    count = max(entries) + 1
+    if layout == 'sparse':
+        table = b''.join(struct.pack('<HH', index, offset // 4) for index, offset in sorted(slots.items()))
+        flags, count = 0x01, len(slots)
+    elif layout == 'offset16':
+        table = b''.join(struct.pack('<H', slots[i] // 4 if i in slots else 0xFFFF) for i in range(count))
+        flags = 0x02
+    else:
+        table = b''.join(struct.pack('<I', slots.get(i, NO_ENTRY)) for i in range(count))
+        flags = 0
+    table = _pad4(table)
+    config = bytearray(64)
+    struct.pack_into('<I', config, 0, 64)
+    struct.pack_into('<H', config, 14, density)
+    header_size = 20 + 64
+    entries_start = header_size + len(table)
+    return struct.pack(
+        '<HHIBBHII', 0x0201, header_size, entries_start + len(entry_data), type_id, flags, 0, count, entries_start,
+    ) + bytes(config) + table + entry_data
+
+
+def resource_table(values, type_chunks, utf8=False):
+    package_header = struct.pack('<I', 0x7F) + 'com.example.demo'.encode('utf-16-le').ljust(256, b'\0') + bytes(20)
+    package_body = b''.join(type_chunks)
+    package = struct.pack('<HHI', 0x0200, 288, 288 + len(package_body)) + package_header + package_body
+    body = string_pool(values, utf8) + package
+    return struct.pack('<HHII', 0x0002, 12, 12 + len(body), 1) + body
+
+
+def png_bytes(size):
+    from PIL import Image
+
+    output = BytesIO()
+    Image.new('RGBA', (size, size), (30, 150, 80, 255)).save(output, format='PNG')
+    return output.getvalue()
+
+
+def signing_certificate():
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'Demo')])
+    now = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=3650))
+        .sign(key, hashes.SHA256())
+    )
+    return certificate, key
+
+
+def _length_prefixed(data):
+    return struct.pack('<I', len(data)) + data
+
+
+def with_v2_signing_block(apk, certificate_der):
+    """Insert an APK Signing Block (v2 signer) before the central directory"""
+    eocd = apk.rfind(b'PK\x05\x06')
+    central_directory = struct.unpack_from('<I', apk, eocd + 16)[0]
+    signed_data = _length_prefixed(b'') + _length_prefixed(_length_prefixed(certificate_der)) + _length_prefixed(b'')
+    signer = _length_prefixed(signed_data) + _length_prefixed(b'') + _length_prefixed(b'')
+    value = _length_prefixed(_length_prefixed(signer))
+    pairs = struct.pack('<QI', 4 + len(value), 0x7109871A) + value
+    block_size = len(pairs) + 8 + 16
+    block = struct.pack('<Q', block_size) + pairs + struct.pack('<Q', block_size) + b'APK Sig Block 42'
+    apk = apk[:central_directory] + block + apk[central_directory:]
+    eocd += len(block)
+    return apk[:eocd + 16] + struct.pack('<I', central_directory + len(block)) + apk[eocd + 20:]
+
+
+def build_apk(path, signature='v2', utf8=False, version_from_resources=False):
+    """Write a minimal APK; returns the signing certificate's SHA-256"""
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.serialization import Encoding, pkcs7
+
+    version_name = (TYPE_REFERENCE, VERSION_STRING_ID) if version_from_resources else (TYPE_STRING, '1.2.3')
+    manifest = binary_xml([
+        ('manifest', [
+            ('versionCode', 0x0101021B, TYPE_INT_DEC, 42),
+            ('versionName', 0x0101021C, *version_name),
+            ('package', None, TYPE_STRING, 'com.example.demo'),
+        ]),
+        ('uses-sdk', [
+            ('minSdkVersion', 0x0101020C, TYPE_INT_DEC, 21),
+            ('targetSdkVersion', 0x01010270, TYPE_INT_DEC, 34),
+        ]),
+        ('application', [('icon', 0x01010002, TYPE_REFERENCE, ICON_ID)]),
+    ], utf8)
+    values = ['res/mipmap-mdpi/ic_launcher.png', 'res/mipmap-xxhdpi/ic_launcher.png', '1.2.3-res']
+    resources = resource_table(values, [
+        type_chunk(0x01, {0: (TYPE_STRING, 0)}, density=160),
+        type_chunk(0x01, {0: (TYPE_STRING, 1)}, density=480, layout='sparse'),
+        type_chunk(0x02, {0: (TYPE_STRING, 2)}, layout='offset16'),
+    ], utf8)
+
+    certificate, key = signing_certificate()
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('AndroidManifest.xml', manifest)
+        archive.writestr('resources.arsc', resources)
+        archive.writestr(values[0], png_bytes(48))
+        archive.writestr(values[1], png_bytes(144))
+        archive.writestr('lib/arm64-v8a/libdemo.so', b'\x7fELF')
+        archive.writestr('lib/x86_64/libdemo.so', b'\x7fELF')
+        if signature == 'v1':
+            signature_file = (
+                pkcs7.PKCS7SignatureBuilder().set_data(b'Signature-Version: 1.0\r\n')
+                .add_signer(certificate, key, hashes.SHA256())
+                .sign(Encoding.DER, [pkcs7.PKCS7Options.DetachedSignature])
+            )
+            archive.writestr('META-INF/CERT.EC', signature_file)
+    apk = buffer.getvalue()
+    certificate_der = certificate.public_bytes(Encoding.DER)
+    if signature == 'v2':
+        apk = with_v2_signing_block(apk, certificate_der)
+    with open(path, 'wb') as output:
+        output.write(apk)
+    return hashlib.sha256(certificate_der).hexdigest()
+
+
+class ExtractMetadataTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, 'demo.apk')
+
+    def test_v2_signed_apk(self):
+        certificate_sha256 = build_apk(self.path, signature='v2')
+        metadata = extract_metadata(self.path)
+        self.assertEqual(metadata['package_name'], 'com.example.demo')
+        self.assertEqual(metadata['version_name'], '1.2.3')
+        self.assertEqual(metadata['version_code'], 42)
+        self.assertEqual((metadata['min_sdk'], metadata['target_sdk']), (21, 34))
+        self.assertEqual(metadata['native_abis'], ['arm64-v8a', 'x86_64'])
+        self.assertEqual(metadata['signing_cert_sha256'], certificate_sha256)
+
+    def test_icon_is_the_densest_bitmap(self):
+        from PIL import Image
+
+        build_apk(self.path)
+        with Image.open(BytesIO(extract_metadata(self.path)['icon'])) as icon:
+            self.assertEqual(icon.size, (144, 144))  # xxhdpi (sparse entry), not mdpi
+
+    def test_v1_signature_utf8_pools_and_string_resource(self):
+        certificate_sha256 = build_apk(self.path, signature='v1', utf8=True, version_from_resources=True)
+        metadata = extract_metadata(self.path)
+        self.assertEqual(metadata['package_name'], 'com.example.demo')
+        self.assertEqual(metadata['version_name'], '1.2.3-res')  # compact offset16 entry
+        self.assertEqual(metadata['signing_cert_sha256'], certificate_sha256)
+        self.assertIsNotNone(metadata['icon'])
+
+    def test_unsigned_apk_has_no_certificate(self):
+        build_apk(self.path, signature=None)
+        self.assertEqual(extract_metadata(self.path)['signing_cert_sha256'], '')
+
+    def test_not_an_apk(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'MZ not a zip')
+        with self.assertRaises(ApkParseError):
+            extract_metadata(self.path)
+
+    def test_missing_manifest(self):
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            archive.writestr('classes.dex', b'dex\n035')
+        with self.assertRaises(ApkParseError):
+            extract_metadata(self.path)
+
+
+class ProcessApksBrokenPoolTests(TestCase):
+    """A parser process that dies fails only its own APK"""
+
+    METADATA = {
+        'package_name': 'com.example.demo', 'version_name': '1.2.3', 'version_code': 42,
+        'min_sdk': 21, 'target_sdk': 34, 'native_abis': [], 'signing_cert_sha256': '', 'icon': None,
+    }
+
+    def setUp(self):
+        self.blobs = [
+            ApkBlob.objects.create(sha256=f'{n:064x}', name=f'apks/00/00/{n:064x}.apk', size=1)
+            for n in (1, 2, 3)
+        ]
+        self.killer = self.blobs[1].name
+
+    def fake_extract(self, apks, workers, broken):
+        if len(apks) > 1:
+            broken.extend(apks)  # the killer APK took the whole pool down
+            return
+        for blob, path in apks:
+            if blob.name == self.killer:
+                broken.append((blob, path))
+            else:
+                yield blob, dict(self.METADATA)
+
+    def test_only_the_killer_apk_fails(self):
+        command = ProcessApksCommand()
+        command.stdout.write = lambda *args, **kwargs: None
+        with mock.patch.object(ProcessApksCommand, 'extract', side_effect=self.fake_extract), \
+                mock.patch('apps.management.commands.process_apks.apk_storage.path', side_effect=lambda name: name):
+            command.process_batch(['pending'], limit=10, workers=2)
+        statuses = dict(ApkBlob.objects.values_list('name', 'metadata_status'))
+        self.assertEqual(statuses.pop(self.killer), 'failed')
+        self.assertEqual(set(statuses.values()), {'done'})
+
+    def test_broken_pool_error_is_not_recorded_for_innocent_apks(self):
+        def extract(apks, workers, broken):
+            return iter(())  # pool broke before accepting anything: nothing in flight
+
+        command = ProcessApksCommand()
+        command.stdout.write = lambda *args, **kwargs: None
+        with mock.patch.object(ProcessApksCommand, 'extract', side_effect=extract), \
+                mock.patch('apps.management.commands.process_apks.apk_storage.path', side_effect=lambda name: name):
+            command.process_batch(['pending'], limit=10, workers=2)
+        self.assertEqual(set(ApkBlob.objects.values_list('metadata_status', flat=True)), {'pending'})
+
+
+# ==================== DOWNLOAD COUNTER ====================
+
+class DownloadCounterTests(TestCase):
+    """Cached totals reach App.downloads exactly once, whatever the flush does"""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user(username='dev', password='secret-pass-123')
+        category = Category.objects.create(name='Tools', slug='tools')
+        self.app = App.objects.create(owner=owner, category=category, title='Counter', slug='counter', downloads=10)
+        cache.delete_many([download_counter_module._total_key(self.app.pk), download_counter_module._flushed_key(self.app.pk)])
+        self.counter = download_counter_module.DownloadCounter()
+
+    def record(self, times):
+        with mock.patch.object(self.counter, '_flush_soon'):  # flushed by the test
+            for _ in range(times):
+                self.counter.record(self.app.pk)
+
+    def downloads(self):
+        return App.objects.values_list('downloads', flat=True).get(pk=self.app.pk)
+
+    def test_repeated_flush_does_not_double_count(self):
+        self.record(3)
+        self.assertEqual(self.counter.pending([self.app.pk]), {self.app.pk: 3})
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.counter.flush(), 0)
+        # Another process flushing the same app finds nothing new either
+        self.assertEqual(download_counter_module.DownloadCounter().flush([self.app.pk]), 0)
+        self.assertEqual(self.downloads(), 13)
+        self.assertEqual(self.counter.pending([self.app.pk]), {})
+
+    def test_failed_flush_keeps_the_counts_buffered(self):
+        self.record(2)
+        with mock.patch.object(BufferedDownloadCount.objects, 'bulk_create', side_effect=DatabaseError), \
+                self.assertLogs('apps.download_counter', 'WARNING'):
+            self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.downloads(), 10)
+        self.assertTrue(self.counter.has_pending())
+        self.assertEqual(self.counter.pending([self.app.pk]), {self.app.pk: 2})
+
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.downloads(), 12)
+
+    def test_quiet_app_is_flushed_by_the_timer(self):
+        flushed = threading.Event()
+
+        def flush():
+            self.counter._take()
+            flushed.set()
+
+        with mock.patch.object(download_counter_module, 'FLUSH_INTERVAL', 0.05), \
+                mock.patch.object(self.counter, 'flush', side_effect=flush):
+            self.counter.record(self.app.pk)
+            self.assertTrue(flushed.wait(2))
+        self.assertFalse(self.counter.has_pending())
+
+
+# ==================== DOWNLOAD LOG ====================
+
+class DownloadLogTimerTests(SimpleTestCase):
+    """Buffered events are written without waiting for the next download"""
+
+    def test_quiet_buffer_is_flushed_by_the_timer(self):
+        flushed = threading.Event()
+        buffer = download_log_module.DownloadLogBuffer()
+
+        def flush():
+            buffer._take()
+            flushed.set()
+
+        with mock.patch.object(download_log_module, 'FLUSH_INTERVAL', 0.05), \
+                mock.patch.object(buffer, 'flush', side_effect=flush):
+            buffer.record(1, ip_address='203.0.113.7')
+            self.assertTrue(flushed.wait(2))
+        self.assertFalse(buffer.has_pending())
+
+    def test_due_buffer_flushes_at_once_and_cancels_the_timer(self):
+        buffer = download_log_module.DownloadLogBuffer()
+        with mock.patch.object(download_log_module, 'FLUSH_SIZE', 2), \
+                mock.patch.object(buffer, '_background_flush') as background_flush:
+            buffer.record(1)
+            self.assertIsNotNone(buffer._timer)
+            buffer.record(1)
+        self.assertIsNone(buffer._timer)
+        background_flush.assert_called_once_with()
+
+
+# ==================== SEARCH LOG ====================
+
+class SearchLoggingTests(TestCase):
+    """Only settled queries are logged and ranked, never per-keystroke prefixes"""
+
+    def setUp(self):
+        patcher = mock.patch('apps.views.search_log')
+        self.search_log = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_keystroke_requests_are_not_logged(self):
+        for prefix in ('wh', 'wha', 'what'):
+            self.client.get(reverse('apps:search_api'), {'q': prefix})
+        self.search_log.record.assert_not_called()
+
+    def test_picked_result_is_logged(self):
+        self.client.get(reverse('apps:search_api'), {'q': 'whatsapp', 'final': '1'})
+        self.search_log.record.assert_called_once_with('whatsapp', 'box', 0)
+
+    def test_rollup_ranks_settled_sources_only(self):
+        today = timezone.localdate()
+        SearchQueryLog.objects.create(query='wha', source='api', date=today, count=50)
+        SearchQueryLog.objects.create(query='whatsapp', source='box', date=today, count=3)
+        SearchQueryLog.objects.create(query='whatsapp', source='page', date=today, count=2)
+        SearchQueryLog.objects.create(query='telegram', source='page', date=today, count=1)
+        call_command('rollup_search_queries', stdout=StringIO())
+        self.assertEqual(
+            list(PopularSearchQuery.objects.order_by('rank').values_list('query', 'search_count')),
+            [('whatsapp', 5), ('telegram', 1)],
+        )
+
+
+class SearchLogTimerTests(SimpleTestCase):
+    def test_quiet_buffer_is_flushed_by_the_timer(self):
+        flushed = threading.Event()
+        buffer = search_log_module.SearchLogBuffer()
+
+        def flush():
+            buffer._take()
+            flushed.set()
+
+        with mock.patch.object(search_log_module, 'FLUSH_INTERVAL', 0.05), \
+                mock.patch.object(buffer, 'flush', side_effect=flush):
+            buffer.record('whatsapp', 'page', 3)
+            self.assertTrue(flushed.wait(2))
+        self.assertFalse(buffer.has_pending())
+
+
+# ==================== SEARCH ====================
+
+class SearchVersionMatchTests(TestCase):
+    """The app list matches versions on the full-text path and the fallback alike"""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user(username='dev', password='secret-pass-123')
+        category = Category.objects.create(name='Tools', slug='tools')
+        App.objects.create(owner=owner, category=category, title='Notes', slug='notes', version='2.7.1', is_published=True)
+        App.objects.create(owner=owner, category=category, title='Timer', slug='timer', version='1.0', is_published=True)
+
+    def lookups(self, match_version):
+        with mock.patch.object(search_module, 'is_full_text_enabled', return_value=True):
+            queryset = search_module.search_apps(App.objects.all(), '2.7', match_version=match_version)
+        (condition,) = queryset.query.where.children
+        return [type(child).__name__ for child in condition.children]
+
+    def test_full_text_path_matches_version_when_asked(self):
+        self.assertIn('IContains', self.lookups(match_version=True))
+        self.assertNotIn('IContains', self.lookups(match_version=False))
+
+    def test_fallback_matches_version_when_asked(self):
+        queryset = App.objects.order_by('id')
+        self.assertEqual([app.slug for app in search_module.search_apps(queryset, '2.7', match_version=True)], ['notes'])
+        self.assertEqual(list(search_module.search_apps(queryset, '2.7')), [])
+
+
+# ==================== COMPLIANCE ====================
+
+class AppComplianceTests(TestCase):
+    """Compliance fields live on AppCompliance but read/write through App"""
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='dev', password='secret-pass-123')
+        self.category = Category.objects.create(name='Tools', slug='tools')
+
+    def create_app(self, **kwargs):
+        return App.objects.create(owner=self.owner, category=self.category, title='Notes', slug='notes', **kwargs)
+
+    def test_new_app_gets_a_compliance_row(self):
+        app = self.create_app(takedown_requested=True, takedown_reason='Reported')
+        compliance = AppCompliance.objects.get(app=app)
+        self.assertTrue(compliance.takedown_requested)
+        self.assertEqual(compliance.takedown_reason, 'Reported')
+        self.assertEqual(compliance.copyright_statement, AppCompliance._meta.get_field('copyright_statement').default)
+
+    def test_proxied_fields_save_with_the_app(self):
+        app = App.objects.get(pk=self.create_app().pk)
+        self.assertEqual(app.legal_risk_level, AppCompliance().legal_risk_level)
+        app.admin_review_notes = 'Checked'
+        app.copyright_verified_by_id = self.owner.pk
+        app.save()
+        compliance = AppCompliance.objects.get(app=app)
+        self.assertEqual(compliance.admin_review_notes, 'Checked')
+        self.assertEqual(compliance.copyright_verified_by, self.owner)
+
+    def test_update_fields_route_to_the_right_table(self):
+        app = App.objects.get(pk=self.create_app().pk)
+        app.downloads = 5
+        with self.assertNumQueries(1):  # App row only; the compliance row is not loaded
+            app.save(update_fields=['downloads'])
+
+        app.takedown_requested = True
+        app.downloads = 9
+        app.save(update_fields=['takedown_requested'])
+        app.refresh_from_db()
+        self.assertEqual(app.downloads, 5)
+        self.assertTrue(AppCompliance.objects.get(app=app).takedown_requested)
+
+    def test_missing_row_is_created_on_save(self):
+        app = self.create_app()
+        AppCompliance.objects.filter(app=app).delete()
+        app = App.objects.get(pk=app.pk)
+        self.assertTrue(app.requires_manual_review)  # unsaved defaults
+        app.requires_manual_review = False
+        app.save()
+        self.assertFalse(AppCompliance.objects.get(app=app).requires_manual_review)
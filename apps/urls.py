@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
 from .views_ledger import app_ledger_view, app_ledger_export, app_info_sheet
+from .views_uploads import upload_chunk, upload_complete, upload_create, upload_status
 
 app_name = "apps"
 
@@ -13,9 +14,14 @@ urlpatterns = [
     path("info/<slug:slug>/", app_info_sheet, name="info_sheet"),
     path("api/popular-apps/", views.popular_apps_api, name="popular_apps_api"),
     path("api/search/", views.search_api, name="search_api"),
+    path("uploads/", upload_create, name="upload_create"),
+    path("uploads/<uuid:session_id>/", upload_status, name="upload_status"),
+    path("uploads/<uuid:session_id>/chunk/", upload_chunk, name="upload_chunk"),
+    path("uploads/<uuid:session_id>/complete/", upload_complete, name="upload_complete"),
     path("<slug:slug>/", views.app_detail, name="detail"),
     path("<slug:slug>/edit/", views.app_edit, name="edit"),
     path("<slug:slug>/delete/", views.app_delete, name="delete"),
+    path("<slug:slug>/favorite/", views.app_favorite_toggle, name="favorite"),
     path("<slug:slug>/download/", views.app_download, name="download"),
     path("<slug:slug>/takedown-request/", views.app_takedown_request, name="takedown_request"),
     path("<slug:slug>/copyright-status/", views.app_copyright_status, name="copyright_status"),
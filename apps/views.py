@@ -1,18 +1,27 @@
-from django.db.models import Avg, Q, Count, F, Sum
+from django.db.models import Avg, F, Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import transaction
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
 from django.utils import timezone
 
-from .models import App, CopyrightClaim, CopyrightInfringementReport, AppScreenshot
+from .models import App, AppCompliance, CopyrightClaim, Favorite, CopyrightInfringementReport, AppScreenshot
+from .delivery import is_resumed, serve_apk
+from .download_counter import download_counter
+from .download_log import download_log
 from .forms import AppUploadForm, AppTakedownRequestForm, CopyrightInfringementReportForm
+from .search import find_search_results, search_apps
+from .search_log import get_popular_results, search_log
 from categories.models import Category
+from core.cache_tags import CATALOG, RANKING, app_tag, category_tag
+from core.conditional import conditional, tag_validators
+from core.stampede import cached_value
+from core.page_cache import mark_page_cacheable
+from core.pagination import approximate_count, paginate
+from core.views import get_client_ip
 
 
 def is_staff(user):
@@ -24,14 +33,10 @@ def app_list(request):
     """Display list of published apps with pagination and filtering"""
     q = request.GET.get("q", "").strip()
     cat = request.GET.get("cat", "").strip()  # category slug
-    page = request.GET.get('page', 1)
+    mark_page_cacheable(request, CATALOG)
 
-    # Base queryset with select_related for performance
-    apps_qs = App.objects.filter(is_published=True).select_related(
-        "category", "owner"
-    ).annotate(
-        review_count=Count("reviews")
-    ).order_by("-created_at")
+    # Base queryset - cards() below selects only the columns the grid shows
+    apps_qs = App.objects.filter(is_published=True).order_by("-rank_score", "-id")
 
     # Get categories for sidebar
     categories = Category.objects.filter(is_active=True).order_by("name")
@@ -40,43 +45,59 @@ def app_list(request):
     if cat:
         apps_qs = apps_qs.filter(category__slug=cat)
 
-    # Apply search filter
+    # Apply search filter (ranked full-text search on PostgreSQL)
     if q:
-        apps_qs = apps_qs.filter(
-            Q(title__icontains=q) |
-            Q(short_description__icontains=q) |
-            Q(description__icontains=q) |
-            Q(version__icontains=q)
-        )
+        apps_qs = search_apps(apps_qs, q, match_version=True)
+    apps_qs = apps_qs.cards()
 
-    # Pagination (20 apps per page)
-    paginator = Paginator(apps_qs, 20)
-    try:
-        apps = paginator.page(page)
-    except PageNotAnInteger:
-        apps = paginator.page(1)
-    except EmptyPage:
-        apps = paginator.page(paginator.num_pages)
+    # Cursor pagination (20 apps per page), ?page=N for page numbers
+    apps = paginate(request, apps_qs, 20)
+
+    # Only the first page shows the total - deeper pages skip counting.
+    # Large result sets get an estimate ("about N apps") instead of COUNT(*)
+    if getattr(apps, 'is_cursor_page', False):
+        if apps.has_previous:
+            total_results, total_is_approximate = None, False
+        else:
+            total_results, total_is_approximate = approximate_count(apps_qs)
+    else:
+        total_results = apps.paginator.count
+        total_is_approximate = apps.paginator.is_approximate
 
     context = {
         "apps": apps,
         "categories": categories,
         "q": q,
         "cat": cat,
-        "total_results": paginator.count,
+        "total_results": total_results,
+        "total_is_approximate": total_is_approximate,
     }
     return render(request, "apps/app_list_new.html", context)
 
 
+def app_detail_validators(request, slug):
+    """ETag/Last-Modified from the app row and its tags, without loading the page"""
+    row = (
+        App.objects.filter(slug=slug, is_published=True)
+        .values_list("id", "updated_at", "category__slug")
+        .first()
+    )
+    if row is None:
+        return None
+    app_id, updated_at, category_slug = row
+    return tag_validators([app_tag(app_id), category_tag(category_slug)], updated_at, html=True)
+
+
+@conditional(app_detail_validators, no_cache=True)
 def app_detail(request, slug):
     """Display detailed app page with reviews and related apps"""
     app = get_object_or_404(
-        App.objects.select_related("category", "owner").annotate(
-            review_count=Count("reviews")
-        ),
+        App.objects.select_related("category", "owner", "compliance"),
         slug=slug,
         is_published=True,
     )
+    mark_page_cacheable(request, app_tag(app.id), category_tag(app.category.slug))
+    download_counter.merge_pending([app])
     
     reviews = app.reviews.select_related("user").order_by('-created_at')
     
@@ -89,15 +110,15 @@ def app_detail(request, slug):
     context = {
         "app": app,
         "reviews": reviews,
-        "reviews_count": reviews.count(),
+        "reviews_count": app.review_count,
         "related_apps": related_apps,
     }
     return render(request, "apps/app_detail.html", context)
 
 
-@require_http_methods(["GET"])
+@require_http_methods(["GET", "HEAD"])
 def app_download(request, slug):
-    """Increment download count and redirect to download link"""
+    """Count the download, then redirect to the download link or deliver the APK"""
     app = get_object_or_404(App, slug=slug, is_published=True)
 
     # Check if download is available
@@ -105,19 +126,28 @@ def app_download(request, slug):
         messages.error(request, 'Download link is not available for this app')
         return redirect('apps:detail', slug=slug)
 
-    # Atomic increment - prevents race conditions
-    with transaction.atomic():
-        App.objects.filter(pk=app.pk).update(downloads=F('downloads') + 1)
-
-    # Redirect to download link
+    # Redirect to download link, else hand the file to nginx (X-Accel-Redirect)
+    # or stream it with Range support - see apps/delivery.py
     if app.download_link:
-        return redirect(app.download_link)
-    
-    if app.apk_file:
-        return redirect(app.apk_file.url)
+        response = redirect(app.download_link)
+    else:
+        response = serve_apk(request, app)
 
-    # Fallback (shouldn't reach here)
-    return redirect('apps:detail', slug=slug)
+    # HEAD probes, 304s and resumed (Range) requests are not new downloads
+    is_new_download = request.method == 'GET' and (
+        app.download_link or (response.status_code in (200, 206) and not is_resumed(request))
+    )
+    if is_new_download:
+        # Buffered increment - flushed to App.downloads in batches (no row lock per click)
+        download_counter.record(app.pk)
+        # Download history - queued in memory, written to AppDownload in bulk
+        download_log.record(
+            app.pk,
+            user_id=request.user.pk if request.user.is_authenticated else None,
+            ip_address=get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        )
+    return response
 
 
 @login_required(login_url='accounts:login')
@@ -233,25 +263,18 @@ def app_edit(request, slug):
 def my_apps(request):
     """View dashboard with all apps uploaded by the current user"""
     # Get user's apps with stats
-    apps = App.objects.filter(owner=request.user).annotate(
-        review_count=Count('reviews')
-    ).order_by('-created_at')
+    apps = App.objects.filter(owner=request.user).order_by('-created_at', '-id')
     
     # Calculate total stats
     total_apps = apps.count()
     total_downloads = apps.aggregate(Sum('downloads'))['downloads__sum'] or 0
+    total_downloads += sum(download_counter.pending(apps.values_list('id', flat=True)).values())
     published_apps = apps.filter(is_published=True).count()
     unpublished_apps = apps.filter(is_published=False).count()
     
-    # Pagination (10 apps per page)
-    page = request.GET.get('page', 1)
-    paginator = Paginator(apps, 10)
-    try:
-        apps = paginator.page(page)
-    except PageNotAnInteger:
-        apps = paginator.page(1)
-    except EmptyPage:
-        apps = paginator.page(paginator.num_pages)
+    # Cursor pagination (10 apps per page), ?page=N for page numbers
+    apps = paginate(request, apps, 10)
+    download_counter.merge_pending(apps)
     
     context = {
         'apps': apps,
@@ -264,6 +287,20 @@ def my_apps(request):
     return render(request, 'apps/my_apps.html', context)
 
 
+@login_required(login_url='accounts:login')
+@require_http_methods(["POST"])
+def app_favorite_toggle(request, slug):
+    """Add/remove an app from the user's favorites (button comes from page_fragments)"""
+    app = get_object_or_404(App, slug=slug, is_published=True)
+    deleted, _ = Favorite.objects.filter(user=request.user, app=app).delete()
+    if deleted:
+        messages.info(request, f"Removed '{app.title}' from your favorites.")
+    else:
+        Favorite.objects.create(user=request.user, app=app)
+        messages.success(request, f"Saved '{app.title}' to your favorites.")
+    return redirect('apps:detail', slug=app.slug)
+
+
 @login_required(login_url='accounts:login')
 def app_delete(request, slug):
     """Soft delete an app (only owner can delete)"""
@@ -290,47 +327,63 @@ def app_delete(request, slug):
 
 # ==================== PWA API ENDPOINTS ====================
 
-@cache_page(60 * 30)  # Cache for 30 minutes
+def catalog_validators(request):
+    """Catalog and ranking tag versions - no database query"""
+    return tag_validators([CATALOG, RANKING])
+
+
+def popular_apps_payload():
+    """Top 20 popular apps with minimal data (cover images as relative URLs)"""
+    popular_apps = App.objects.filter(
+        is_published=True
+    ).order_by('-rank_score', '-id').cards()[:20]
+
+    apps_data = []
+    for app in popular_apps:
+        app_dict = {
+            'id': app.id,
+            'slug': app.slug,
+            'title': app.title,
+            'short_description': app.short_description,
+            'version': app.version,
+            'downloads': app.downloads,
+            'rating': float(app.avg_rating or 0),
+            'category': app.category.name or 'Unknown',
+        }
+
+        # Add cover image if available
+        if app.cover_image:
+            app_dict['cover_image'] = app.cover_image.url
+
+        apps_data.append(app_dict)
+    return {'apps': apps_data, 'timestamp': timezone.now().isoformat()}
+
+
+@conditional(catalog_validators, public=True, max_age=60 * 5)
 @require_http_methods(["GET"])
 def popular_apps_api(request):
     """
     API endpoint for Service Worker to fetch popular apps for offline caching.
     Returns top 20 popular apps with minimal data.
+    The list is shared by all workers for 30 minutes (or until the catalog
+    changes) and refreshed by a single worker (see core/stampede.py).
     """
     try:
-        # Get top apps by download count
-        popular_apps = App.objects.filter(
-            is_published=True
-        ).select_related(
-            'category', 'owner'
-        ).annotate(
-            review_count=Count('reviews')
-        ).order_by('-downloads')[:20]
-        
+        payload = cached_value('api:popular_apps', popular_apps_payload, timeout=60 * 30, tags=[CATALOG])
+
         apps_data = []
-        for app in popular_apps:
-            app_dict = {
-                'id': app.id,
-                'slug': app.slug,
-                'title': app.title,
-                'short_description': app.short_description,
-                'version': app.version,
-                'downloads': app.downloads,
-                'rating': float(app.avg_rating or 0),
-                'category': app.category.name if app.category else 'Unknown',
-            }
-            
-            # Add cover image if available
-            if app.cover_image:
-                app_dict['cover_image'] = request.build_absolute_uri(app.cover_image.url)
-            
+        for app_dict in payload['apps']:
+            app_dict = dict(app_dict)
+            if 'cover_image' in app_dict:
+                app_dict['cover_image'] = request.build_absolute_uri(app_dict['cover_image'])
             apps_data.append(app_dict)
+        download_counter.merge_pending(apps_data)
         
         return JsonResponse({
             'success': True,
             'count': len(apps_data),
             'apps': apps_data,
-            'timestamp': timezone.now().isoformat(),
+            'timestamp': payload['timestamp'],
         })
     
     except Exception as e:
@@ -348,7 +401,7 @@ def app_takedown_request(request, slug):
     Allow app owners to request takedown of their own apps.
     This creates a CopyrightClaim with type 'owner_request'
     """
-    app = get_object_or_404(App, slug=slug)
+    app = get_object_or_404(App.objects.select_related('compliance'), slug=slug)
     
     # Verify user is the owner
     if app.owner != request.user:
@@ -411,7 +464,7 @@ def app_copyright_status(request, slug):
     Show copyright status and claims for an app
     (only visible to app owner)
     """
-    app = get_object_or_404(App, slug=slug)
+    app = get_object_or_404(App.objects.select_related('compliance'), slug=slug)
     
     # Verify user is the owner or staff
     if app.owner != request.user and not request.user.is_staff:
@@ -454,10 +507,13 @@ def app_report_infringement(request, slug):
                     report.status = 'submitted'
                     report.save()
                     
-                    # Update app's infringement report count
-                    app.copyright_infringement_count = F('copyright_infringement_count') + 1
-                    app.has_infringement_report = True
-                    app.save(update_fields=['copyright_infringement_count', 'has_infringement_report'])
+                    # Update app's infringement report count (on the compliance row)
+                    AppCompliance.objects.get_or_create(app=app)
+                    AppCompliance.objects.filter(app=app).update(
+                        copyright_infringement_count=F('copyright_infringement_count') + 1,
+                        has_infringement_report=True,
+                        updated_at=timezone.now(),
+                    )
                     
                     messages.success(
                         request,
@@ -486,7 +542,7 @@ def app_copyright_check(request, slug):
     """
     Show copyright verification status for an app (public view)
     """
-    app = get_object_or_404(App, slug=slug, is_published=True)
+    app = get_object_or_404(App.objects.select_related('compliance'), slug=slug, is_published=True)
     
     context = {
         'app': app,
@@ -495,17 +551,20 @@ def app_copyright_check(request, slug):
     return render(request, 'apps/app_copyright_check.html', context)
 
 
+@conditional(catalog_validators, public=True, max_age=60)
 @require_http_methods(["GET"])
 def search_api(request):
     """
     রিয়েলটাইম API সার্চ এন্ডপয়েন্ট
     GET /api/search/?q=query
+    GET /api/search/?q=query&mode=autocomplete  (ট্রাইগ্রাম সাজেশন)
     
     JSON রেসপন্স রিটার্ন করে:
     {
         "success": bool,
         "query": string,
         "count": int,
+        "fuzzy": bool (ট্রাইগ্রাম সাজেশন থেকে এসেছে কিনা),
         "apps": [
             {
                 "id": int,
@@ -532,33 +591,25 @@ def search_api(request):
             'message': 'কমপক্ষে ১ ক্যারেক্টার টাইপ করুন'
         })
     
-    # সার্চ করো টাইটেল, ডেস্ক্রিপশন, ক্যাটাগরিতে
-    apps = App.objects.filter(
-        is_published=True
-    ).filter(
-        Q(title__icontains=query) |
-        Q(short_description__icontains=query) |
-        Q(description__icontains=query) |
-        Q(category__name__icontains=query)
-    ).select_related('category').order_by('-downloads')[:10]  # ম্যাক্স ১০ রেজাল্ট
+    # ?mode=autocomplete: টাইপো-সহনশীল ট্রাইগ্রাম সাজেশন (টাইটেল + ডেভেলপার নাম)
+    mode = request.GET.get('mode', '').strip()
     
-    # JSON ফরম্যাটে রেসপন্স প্রিপেয়ার করো
-    results = []
-    for app in apps:
-        results.append({
-            'id': app.id,
-            'title': app.title,
-            'slug': app.slug,
-            'icon': app.cover_image.url if app.cover_image else '/static/images/default-app-icon.png',
-            'short_description': app.short_description[:100] if app.short_description else '',
-            'category': app.category.name if app.category else 'অন্যান্য',
-            'rating': round(app.avg_rating or 0, 1),
-            'download_count': app.downloads or 0,
-        })
+    # জনপ্রিয় কোয়েরির রেজাল্ট আগে থেকেই ক্যাশে থাকে (rollup_search_queries)
+    cached = get_popular_results(query) if mode != 'autocomplete' else None
+    if cached is not None:
+        results, fuzzy = cached['apps'], cached['fuzzy']
+    else:
+        results, fuzzy = find_search_results(query, mode)
+    
+    # কোয়েরি লগ (মেমোরিতে বাফার, পরে একসাথে ডাটাবেসে লেখা হয়) - শুধু চূড়ান্ত কোয়েরি:
+    # ইউজার রেজাল্ট বেছে নিলে বক্স ?final=1 পাঠায়; প্রতি কীস্ট্রোকের প্রিফিক্স লগ হয় না
+    if request.GET.get('final') == '1':
+        search_log.record(query, 'box', len(results))
     
     return JsonResponse({
         'success': True,
         'query': query,
         'count': len(results),
+        'fuzzy': fuzzy,
         'apps': results
     })
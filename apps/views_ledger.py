@@ -1,10 +1,9 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Sum, Avg, Count
-from django.core.paginator import Paginator
 from .models import App
 from categories.models import Category
-from reviews.models import Review
+from core.pagination import ApproximateCountPaginator
 
 
 @login_required
@@ -75,22 +74,17 @@ def app_ledger_view(request):
     categories = Category.objects.all().order_by('name')
     
     # Pagination
-    paginator = Paginator(apps, 10)
+    paginator = ApproximateCountPaginator(apps, 10)
     page_number = request.GET.get('page', 1)
     page_obj = paginator.get_page(page_number)
     
-    # Get detailed info for paginated apps
+    # Review stats are denormalized on App - no per-row query
     app_details = []
     for app in page_obj.object_list:
-        reviews = Review.objects.filter(app=app).aggregate(
-            count=Count('id'),
-            avg_rating=Avg('rating')
-        )
-        
         app_details.append({
             'app': app,
-            'review_count': reviews['count'] or 0,
-            'review_rating': reviews['avg_rating'] or 0,
+            'review_count': app.review_count,
+            'review_rating': app.avg_rating,
         })
     
     context = {
@@ -0,0 +1,93 @@
+"""JSON endpoints of the resumable upload protocol (see apps/chunked_upload.py)"""
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from .chunked_upload import CHUNK_SIZE, UploadError, complete_upload, create_session, write_chunk
+from .models import UploadSession
+
+
+def _session_json(session):
+    return {
+        'id': str(session.pk),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.received,
+        'status': session.status,
+        'chunk_size': CHUNK_SIZE,
+    }
+
+
+def _error(exc):
+    data = {'error': str(exc)}
+    if exc.offset is not None:
+        data['offset'] = exc.offset
+    return JsonResponse(data, status=exc.status)
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_create(request):
+    """Start an upload session: {"filename", "size"}"""
+    try:
+        data = json.loads(request.body or b'{}')
+        size = int(data.get('size'))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Expected JSON with "filename" and "size".'}, status=400)
+    try:
+        session = create_session(request.user, data.get('filename'), size)
+    except UploadError as exc:
+        return _error(exc)
+    return JsonResponse(_session_json(session), status=201)
+
+
+@login_required
+@require_http_methods(["GET"])
+def upload_status(request, session_id):
+    """Where to resume: the number of bytes received so far"""
+    session = get_object_or_404(UploadSession, pk=session_id, owner=request.user)
+    data = _session_json(session)
+    if session.status == 'complete':
+        data['sha256'] = session.sha256
+    return JsonResponse(data)
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_chunk(request, session_id):
+    """Append the raw request body at ?offset=N"""
+    try:
+        offset = int(request.GET.get('offset', ''))
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return JsonResponse({'error': 'Expected ?offset=N and a Content-Length.'}, status=400)
+    try:
+        # Streams the body from the request (never request.body: no 8 MB copy in memory)
+        session = write_chunk(session_id, request.user, offset, request, length)
+    except UploadSession.DoesNotExist:
+        return JsonResponse({'error': 'Upload not found.'}, status=404)
+    except UploadError as exc:
+        return _error(exc)
+    return JsonResponse({'offset': session.received, 'size': session.size})
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_complete(request, session_id):
+    """Finish the upload; an optional client "sha256" is verified"""
+    try:
+        expected = json.loads(request.body or b'{}').get('sha256') or ''
+    except (ValueError, AttributeError):
+        expected = ''
+    try:
+        session = complete_upload(session_id, request.user, expected)
+    except UploadSession.DoesNotExist:
+        return JsonResponse({'error': 'Upload not found.'}, status=404)
+    except UploadError as exc:
+        return _error(exc)
+    data = _session_json(session)
+    data['sha256'] = session.sha256
+    return JsonResponse(data)
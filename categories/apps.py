@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CategoriesConfig(AppConfig):
     name = 'categories'
+
+    def ready(self):
+        """Register signals when app is ready"""
+        import categories.signals  # noqa
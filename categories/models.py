@@ -1,6 +1,20 @@
 from django.db import models
+from django.db.models import Count, Q
 from django.utils.text import slugify
 
+from core.cache_tags import CATALOG, CATEGORIES, InvalidatingQuerySet, category_tag
+from core.stampede import cached_value
+
+
+class CategoryQuerySet(InvalidatingQuerySet):
+    def cache_tags(self):
+        slugs = self.order_by().values_list('slug', flat=True)
+        return {CATALOG, CATEGORIES, *(category_tag(slug) for slug in slugs)}
+
+    def cache_tags_for(self, categories):
+        return {CATALOG, CATEGORIES, *(category_tag(category.slug) for category in categories)}
+
+
 class Category(models.Model):
     """
     Category model for organizing apps.
@@ -71,6 +85,8 @@ class Category(models.Model):
         help_text="Whether this category is visible to users"
     )
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         ordering = ["order", "name"]
         verbose_name_plural = "Categories"
@@ -87,3 +103,17 @@ class Category(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+
+
+def published_app_counts():
+    """
+    {category_id: number of published apps}, shared by all workers and
+    recomputed by one of them at a time (see core/stampede.py)
+    """
+    def count():
+        return dict(
+            Category.objects
+            .annotate(app_count=Count("apps", filter=Q(apps__is_published=True)))
+            .values_list("id", "app_count")
+        )
+    return cached_value("categories:app_counts", count, timeout=60 * 30, tags=[CATALOG, CATEGORIES])
@@ -0,0 +1,24 @@
+"""
+Django signals for categories app
+Bumps cache tags when a category is saved or deleted (see core/cache_tags.py)
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache_tags import CATALOG, CATEGORIES, bump_tags, category_tag
+from .models import Category
+
+
+@receiver(post_init, sender=Category)
+def category_loaded_handler(sender, instance, **kwargs):
+    """Remember the stored slug so a rename also invalidates the old URL"""
+    instance._loaded_slug = instance.slug if instance.pk else None
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_cache_tags_handler(sender, instance, **kwargs):
+    """Category name/icon/visibility shows on catalog-wide listings too"""
+    slugs = {instance.slug, getattr(instance, '_loaded_slug', None)} - {None, ''}
+    bump_tags({CATALOG, CATEGORIES, *(category_tag(slug) for slug in slugs)})
+    instance._loaded_slug = instance.slug
@@ -1,101 +1,130 @@
-from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404, render
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 
-from .models import Category
+from .models import Category, published_app_counts
+from apps.download_counter import download_counter
 from apps.models import App
+from core.cache_tags import CATALOG, CATEGORIES, RANKING, category_tag
+from core.conditional import conditional, tag_validators
+from core.page_cache import mark_page_cacheable
+from core.pagination import CursorPaginator, InvalidCursor
 
 
 def category_list(request):
     """
     Display all active categories with app counts
     """
-    categories = (
-        Category.objects
-        .filter(is_active=True)
-        .annotate(app_count=Count("apps", filter=Q(apps__is_published=True)))
-        .order_by("order", "name")
-    )
+    mark_page_cacheable(request, CATALOG)
+    categories = list(Category.objects.filter(is_active=True).order_by("order", "name"))
+    app_counts = published_app_counts()
+    for category in categories:
+        category.app_count = app_counts.get(category.id, 0)
     
     context = {
         "categories": categories,
-        "total_categories": categories.count(),
+        "total_categories": len(categories),
     }
     return render(request, "categories/category_list.html", context)
 
 
+def category_apps_validators(request, slug, html=False):
+    """Catalog, category and ranking tag versions - no database query"""
+    return tag_validators([CATALOG, category_tag(slug), RANKING], html=html)
+
+
+@conditional(lambda request, slug: category_apps_validators(request, slug, html=True), no_cache=True)
 def category_detail(request, slug):
     """
     Display a specific category and all its published apps
     """
-    category = get_object_or_404(
-        Category.objects.annotate(app_count=Count("apps", filter=Q(apps__is_published=True))),
-        slug=slug,
-        is_active=True
-    )
+    mark_page_cacheable(request, CATALOG, category_tag(slug))
+    category = get_object_or_404(Category, slug=slug, is_active=True)
+    category.app_count = published_app_counts().get(category.id, 0)
     
     apps = (
         App.objects
         .filter(is_published=True, category=category)
-        .select_related("owner", "category")
-        .order_by("-downloads", "-avg_rating")
+        .order_by("-rank_score", "-id")
+        .cards()
     )
     
     context = {
         "category": category,
         "apps": apps,
-        "total_apps": apps.count(),
+        "total_apps": category.app_count,
     }
     return render(request, "categories/category_detail.html", context)
 
 
+@conditional(lambda request: tag_validators([CATALOG, CATEGORIES]), public=True, max_age=60 * 5)
 @require_http_methods(["GET"])
 def category_api(request):
     """
     JSON API endpoint for categories
     """
-    categories = (
+    categories = list(
         Category.objects
         .filter(is_active=True)
-        .annotate(app_count=Count("apps", filter=Q(apps__is_published=True)))
-        .values("id", "name", "slug", "icon", "color", "app_count")
+        .values("id", "name", "slug", "icon", "color")
         .order_by("order", "name")
     )
+    app_counts = published_app_counts()
+    for category in categories:
+        category["app_count"] = app_counts.get(category["id"], 0)
     
     return JsonResponse({
         "status": "success",
-        "total": len(list(categories)),
-        "categories": list(categories),
+        "total": len(categories),
+        "categories": categories,
     })
 
 
+@conditional(category_apps_validators, public=True, max_age=60)
 @require_http_methods(["GET"])
 def category_apps_api(request, slug):
     """
     JSON API endpoint for apps in a specific category
+    Cursor paginated: ?limit=50 (max 100), then ?cursor=<next_cursor>
     """
     category = get_object_or_404(Category, slug=slug, is_active=True)
     
+    fields = (
+        "id", "slug", "title", "version",
+        "avg_rating", "total_ratings", "downloads",
+        "size_mb", "is_free", "price"
+    )
     apps = (
         App.objects
         .filter(is_published=True, category=category)
-        .select_related("category")
-        .values(
-            "id", "slug", "title", "platform", "version",
-            "avg_rating", "total_ratings", "downloads",
-            "size_mb", "is_free", "price"
-        )
-        .order_by("-downloads")
+        .only("rank_score", *fields)
+        .order_by("-rank_score", "-id")
     )
     
-    return JsonResponse({
+    try:
+        limit = min(max(int(request.GET.get("limit", 50)), 1), 100)
+    except ValueError:
+        limit = 50
+    cursor = request.GET.get("cursor", "")
+    
+    paginator = CursorPaginator(apps, limit)
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor:
+        return JsonResponse({"status": "error", "message": "Invalid cursor"}, status=400)
+    
+    response = {
         "status": "success",
         "category": {
             "name": category.name,
             "slug": category.slug,
             "icon": category.icon,
         },
-        "total_apps": len(list(apps)),
-        "apps": list(apps),
-    })
+        "apps": [{field: getattr(app, field) for field in fields} for app in download_counter.merge_pending(page)],
+        "next_cursor": page.next_cursor if page.has_next else None,
+        "previous_cursor": page.previous_cursor if page.has_previous else None,
+    }
+    # The total is only counted for the first page
+    if not cursor:
+        response["total_apps"] = apps.count()
+    return JsonResponse(response)
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',  # Full-text & trigram search lookups
 
     # Third-party apps
     'allauth',
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
+    'core.page_cache.PageCacheMiddleware',  # Before sessions: cache hits skip them entirely
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,6 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.page_fragments',
             ],
         },
     },
@@ -133,6 +136,11 @@ if (BASE_DIR / 'static').exists():
     STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Internal nginx location that maps to MEDIA_ROOT (X-Accel-Redirect APK delivery,
+# see apps/delivery.py). Empty: APKs are streamed by Django (development).
+APK_ACCEL_REDIRECT_PREFIX = ''
+# Part files of resumable chunked uploads (apps/chunked_upload.py) - not under MEDIA_ROOT
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'tmp' / 'uploads'
 
 # ==================== EMAIL CONFIGURATION ====================
 # Get email credentials from environment
@@ -167,6 +175,10 @@ ACCOUNT_FORMS = {
     'signup': 'accounts.forms.SignUpForm',
 }
 
+# ==================== PAGE CACHE ====================
+# Shared catalog pages (core/page_cache.py); writes purge them via cache tags
+PAGE_CACHE_TIMEOUT = 60 * 10
+
 # ==================== LOGGING CONFIGURATION ====================
 # Ensure logs directory exists
 LOG_DIR = BASE_DIR / 'logs'
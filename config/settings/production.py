@@ -104,11 +104,39 @@ if not os.getenv('DATABASE_NAME'):
     )
 
 # ==================== CACHING (Production) ====================
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# One cache shared by all gunicorn workers (LocMemCache is per process).
+# CACHE_URL=redis://127.0.0.1:6379/1 or memcached://127.0.0.1:11211 uses that
+# server; otherwise a SQLite file on local disk (no extra service needed).
+CACHE_URL = os.getenv('CACHE_URL', '')
+
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'TIMEOUT': 300,
+        }
+    }
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_URL.removeprefix('memcached://'),
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.SQLiteCache',
+            'LOCATION': os.getenv('CACHE_PATH', str(BASE_DIR / 'cache' / 'jndroid_cache.sqlite3')),
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '50000')),
+                'CULL_FREQUENCY': 4,
+            },
+        }
     }
-}
 
 # ==================== STATIC & MEDIA FILES (Production) ====================
 # Run before deployment: python manage.py collectstatic --noinput
@@ -123,6 +151,9 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 WHITENOISE_COMPRESS_OFFLINE = True
 WHITENOISE_COMPRESSION_QUALITY = 80
 
+# APK downloads are handed to nginx (location /protected-media/ in nginx_jndroid.conf)
+APK_ACCEL_REDIRECT_PREFIX = os.getenv('APK_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
 # ==================== LOGGING (Production) ====================
 # Production logging - use console logging captured by systemd/Gunicorn
 # File logging disabled to avoid permission issues with www-data user
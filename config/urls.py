@@ -24,6 +24,7 @@ from core import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home, name='home'),
+    path('fragments/', views.page_fragments, name='page_fragments'),
     path('search/', search, name='search'),
     path('support/', support, name='support'),
     path('offline-error/', offline_error, name='offline_error'),
@@ -51,4 +52,7 @@ urlpatterns = [
 from django.conf import settings
 from django.conf.urls.static import static
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Development only - in production nginx serves /media/ and APKs go through
+# X-Accel-Redirect (apps/delivery.py), never through the Python workers
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -22,3 +22,13 @@ else:
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
 
 application = get_wsgi_application()
+
+# Load the in-process search prefix index once per worker at start-up
+from apps.prefix_index import prefix_index  # noqa: E402
+
+prefix_index.load()
+
+# Fill this worker's cached template loaders before its first request
+from core.template_warmup import compile_templates  # noqa: E402
+
+compile_templates()
@@ -0,0 +1,73 @@
+"""
+Background flushing for per-process write buffers.
+
+The download counter, the download log and the search log buffer writes in
+memory and hand them to the database in bulk. ``BackgroundFlushMixin`` runs
+those flushes off the request thread:
+
+- right away once the buffer is due (size or age, decided by the caller)
+- otherwise from a timer ``flush_interval()`` seconds after something was
+  buffered, so a quiet worker still writes what it holds
+- again after a flush that left items behind (new arrivals, a failed write)
+
+    with self._lock:
+        self._pending.append(item)
+        self._flush_soon(due=len(self._pending) >= FLUSH_SIZE)
+
+Subclasses create ``self._lock``, call ``_init_background_flush()`` and
+implement ``flush()``, ``has_pending()`` (called with the lock held) and
+``flush_interval()``.
+"""
+import threading
+
+from django.db import connection
+
+
+class BackgroundFlushMixin:
+    """Flushes a buffer from a background thread, immediately or on a timer"""
+
+    def _init_background_flush(self):
+        self._flushing = False
+        self._timer = None
+
+    def flush_interval(self):
+        raise NotImplementedError
+
+    def has_pending(self):
+        raise NotImplementedError
+
+    def _flush_soon(self, due):
+        """Call with ``self._lock`` held, after buffering something"""
+        if self._flushing:
+            return  # the running flush reschedules itself for what is left
+        if due:
+            self._flushing = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            threading.Thread(target=self._background_flush, daemon=True).start()
+        elif self._timer is None:
+            self._schedule(self.flush_interval())
+
+    def _schedule(self, delay):
+        self._timer = threading.Timer(delay, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if self._flushing:
+                return
+            self._flushing = True
+        self._background_flush()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._flushing = False
+                if self.has_pending() and self._timer is None:
+                    self._schedule(self.flush_interval())
+            connection.close()  # this thread's connection
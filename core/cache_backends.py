@@ -0,0 +1,269 @@
+"""
+Shared cache backend for a single box without an external cache server.
+
+LocMemCache is per process, so every gunicorn worker computes and keeps
+its own copy of each cached value. ``SQLiteCache`` stores entries in one
+SQLite file (WAL mode) that every worker on the machine reads and writes:
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.SQLiteCache',
+            'LOCATION': '/var/cache/jndroid/cache.sqlite3',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 50000, 'CULL_FREQUENCY': 4},
+        }
+    }
+
+Entries have TTLs like any Django cache. When the table grows past
+MAX_ENTRIES the least recently used 1/CULL_FREQUENCY of the entries are
+evicted. Last-access times are only rewritten once per ACCESS_RESOLUTION
+seconds per key, so hot hits stay read-only (approximate LRU).
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires REAL,
+        accessed REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed)",
+    "CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires)",
+)
+
+# Seconds between last-access updates for the same key
+ACCESS_RESOLUTION = 30
+# Writes (per process) between checks of the entry count
+CULL_CHECK_INTERVAL = 100
+
+
+class SQLiteCache(BaseCache):
+    """Cross-process LRU + TTL cache in a single SQLite file"""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = os.fspath(location)
+        options = params.get('OPTIONS', {})
+        self._access_resolution = float(options.get('ACCESS_RESOLUTION', ACCESS_RESOLUTION))
+        self._cull_check_interval = int(options.get('CULL_CHECK_INTERVAL', CULL_CHECK_INTERVAL))
+        self._local = threading.local()
+        self._writes = 0
+
+    # -------------------- connection --------------------
+
+    def _connection(self):
+        """One connection per thread, re-opened after a fork (gunicorn preload)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    # -------------------- reads --------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_many([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = self._get_many(list(key_map))
+        return {key_map[key]: value for key, value in found.items()}
+
+    def _get_many(self, keys):
+        if not keys:
+            return {}
+        now = time.time()
+        conn = self._connection()
+        placeholders = ','.join('?' * len(keys))
+        rows = conn.execute(
+            f"SELECT key, value, expires, accessed FROM cache_entries WHERE key IN ({placeholders})",
+            keys,
+        ).fetchall()
+
+        found, expired, touched = {}, [], []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append(key)
+                continue
+            found[key] = pickle.loads(value)
+            if accessed < now - self._access_resolution:
+                touched.append(key)
+
+        if expired:
+            conn.execute(
+                f"DELETE FROM cache_entries WHERE key IN ({','.join('?' * len(expired))}) AND expires <= ?",
+                [*expired, now],
+            )
+        if touched:
+            conn.execute(
+                f"UPDATE cache_entries SET accessed = ? WHERE key IN ({','.join('?' * len(touched))})",
+                [now, *touched],
+            )
+        return found
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            "SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    # -------------------- writes --------------------
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._set_many({key: value}, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._set_many(
+            {self.make_and_validate_key(key, version=version): value for key, value in data.items()},
+            timeout,
+        )
+        return []
+
+    def _set_many(self, data, timeout):
+        if not data:
+            return
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = [(key, self._dumps(value), expires, now) for key, value in data.items()]
+        conn = self._connection()
+        with self._immediate(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self._after_write(conn, len(data))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        conn = self._connection()
+        with self._immediate(conn):
+            conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires <= ?", (key, now))
+            added = conn.execute(
+                "INSERT OR IGNORE INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, self._dumps(value), expires, now),
+            ).rowcount == 1
+        if added:
+            self._after_write(conn, 1)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        return self._connection().execute(
+            "UPDATE cache_entries SET expires = ?, accessed = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), now, key, now),
+        ).rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        """Atomic across processes: read and write happen under one write lock"""
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connection()
+        with self._immediate(conn):
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = pickle.loads(row[0]) + delta
+            conn.execute(
+                "UPDATE cache_entries SET value = ?, accessed = ? WHERE key = ?",
+                (self._dumps(new_value), now, key),
+            )
+        return new_value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._delete_many([key]) > 0
+
+    def delete_many(self, keys, version=None):
+        self._delete_many([self.make_and_validate_key(key, version=version) for key in keys])
+
+    def _delete_many(self, keys):
+        if not keys:
+            return 0
+        return self._connection().execute(
+            f"DELETE FROM cache_entries WHERE key IN ({','.join('?' * len(keys))})", keys,
+        ).rowcount
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entries")
+
+    # -------------------- eviction --------------------
+
+    def _after_write(self, conn, count):
+        self._writes += count
+        if self._writes >= self._cull_check_interval:
+            self._writes = 0
+            self.cull(conn)
+
+    def cull(self, conn=None):
+        """Drop expired entries, then the least recently used ones above MAX_ENTRIES"""
+        conn = conn or self._connection()
+        now = time.time()
+        conn.execute("DELETE FROM cache_entries WHERE expires <= ?", (now,))
+        total = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        if total <= self._max_entries:
+            return 0
+        if self._cull_frequency == 0:
+            conn.execute("DELETE FROM cache_entries")
+            return total
+        evict = total - self._max_entries + self._max_entries // self._cull_frequency
+        return conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY accessed LIMIT ?)",
+            (evict,),
+        ).rowcount
+
+    @staticmethod
+    def _immediate(conn):
+        return _ImmediateTransaction(conn)
+
+    def close(self, **kwargs):
+        # Connections are reused across requests (like LocMemCache, nothing to release)
+        pass
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT: takes the write lock up front"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
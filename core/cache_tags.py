@@ -0,0 +1,141 @@
+"""
+Tag-based cache invalidation.
+
+Cached entries declare the tags they depend on; the cache key embeds the
+current version of each tag, so bumping a tag makes every entry that
+declared it unreachable (the old entries simply age out):
+
+    payload = get_or_set_tagged(
+        'api:popular', [CATALOG], build_payload, timeout=60 * 30,
+    )
+
+(for hot, expensive values use ``core.stampede.cached_value``, which
+takes the same tags but recomputes in one process at a time)
+
+Tags in use:
+
+    app:<id>          one app (detail page, its reviews and screenshots)
+    category:<slug>   one category and its listings
+    catalog           anything listing apps across categories
+    categories        the list of categories itself (names, icons, order)
+    ranking           rank_score order of listings (bumped once per
+                      recompute_rank_scores run - the score writes are quiet)
+
+Writes bump the tags through signals (apps/signals.py, reviews/signals.py,
+categories/signals.py) and, for ``queryset.update()`` / ``bulk_update()``
+which send no signals, through ``InvalidatingQuerySet``. Bumps run after
+the surrounding transaction commits.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import models, transaction
+
+CATALOG = 'catalog'
+CATEGORIES = 'categories'
+RANKING = 'ranking'
+TAG_KEY_PREFIX = 'cachetag:'
+
+
+def app_tag(app_id):
+    return f'app:{app_id}'
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def app_tags(rows):
+    """Tags for (app_id, category_slug) pairs, plus the catalog tag"""
+    tags = {CATALOG}
+    for app_id, category_slug in rows:
+        tags.add(app_tag(app_id))
+        if category_slug:
+            tags.add(category_tag(category_slug))
+    return tags
+
+
+# ==================== TAG VERSIONS ====================
+
+def _new_version():
+    return str(time.time_ns())
+
+
+def tag_versions(tags):
+    """{tag: version}; tags never seen (or evicted) get a fresh version"""
+    tags = sorted(set(tags))
+    keys = {f'{TAG_KEY_PREFIX}{tag}': tag for tag in tags}
+    found = cache.get_many(list(keys))
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {tag: found[key] for key, tag in keys.items()}
+
+
+def bump_tags(tags):
+    """Invalidate everything cached under ``tags`` once the current transaction commits"""
+    tags = set(tags)
+    if not tags:
+        return
+
+    def bump():
+        version = _new_version()
+        cache.set_many({f'{TAG_KEY_PREFIX}{tag}': version for tag in tags}, None)
+
+    transaction.on_commit(bump)
+
+
+def tagged_key(key, tags):
+    """``key`` plus a digest of the current tag versions"""
+    versions = tag_versions(tags)
+    digest = hashlib.md5(
+        '|'.join(f'{tag}={version}' for tag, version in sorted(versions.items())).encode('utf-8')
+    ).hexdigest()[:16]
+    return f'{key}:{digest}'
+
+
+def get_or_set_tagged(key, tags, default, timeout=None):
+    """cache.get_or_set under a tag-versioned key; ``default`` may be a callable"""
+    return cache.get_or_set(tagged_key(key, tags), default, timeout)
+
+
+# ==================== BULK WRITES ====================
+
+class InvalidatingQuerySet(models.QuerySet):
+    """
+    QuerySet whose update()/bulk_update() bump the cache tags of the rows
+    they touch. Subclasses implement ``cache_tags()`` (tags of the rows
+    matched by the queryset) and ``cache_tags_for(objs)``.
+    Writes touching only ``quiet_fields`` (counters, ranking bookkeeping)
+    do not invalidate anything; their staleness is bounded by cache TTLs.
+    """
+
+    quiet_fields = frozenset()
+
+    def cache_tags(self):
+        raise NotImplementedError
+
+    def cache_tags_for(self, objs):
+        raise NotImplementedError
+
+    def update(self, **kwargs):
+        if not set(kwargs) - self.quiet_fields:
+            return super().update(**kwargs)
+        tags = self.cache_tags()
+        rows = super().update(**kwargs)
+        if rows:
+            bump_tags(tags)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        if rows and set(fields) - self.quiet_fields:
+            bump_tags(self.cache_tags_for(objs))
+        return rows
+
+    bulk_update.alters_data = True
@@ -0,0 +1,121 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for pages and JSON APIs.
+
+Validators are computed from cheap sources - cache tag versions (see
+core/cache_tags.py) and ``updated_at`` columns - *before* the view runs,
+so a client revalidating an unchanged resource gets a 304 without the
+expensive queries or template rendering:
+
+    @conditional(lambda request, slug: tag_validators([category_tag(slug)]), max_age=60)
+    def category_api(request, slug): ...
+
+A tag version is the time_ns of its last bump, so it doubles as a
+Last-Modified date. HTML validators also include ``release_digest()``,
+so a deploy that changes templates does not keep serving old pages.
+"""
+import datetime
+from functools import lru_cache, wraps
+import hashlib
+import os
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache_tags import tag_versions
+
+
+class Validators:
+    """An ETag (unquoted) and an optional Last-Modified datetime"""
+
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def last_modified_timestamp(self):
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+
+@lru_cache(maxsize=None)
+def release_digest():
+    """Digest of the template files (names + mtimes), the same in every worker"""
+    entries = []
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                entries.append(f'{path}:{os.path.getmtime(path)}')
+    return hashlib.md5('|'.join(sorted(entries)).encode('utf-8')).hexdigest()[:8]
+
+
+def _version_datetime(version):
+    try:
+        return datetime.datetime.fromtimestamp(int(version) / 1e9, tz=datetime.timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def tag_validators(tags, *extra, html=False):
+    """
+    Validators for a resource depending on ``tags``; ``extra`` values
+    (``updated_at`` datetimes, query strings...) are mixed into the ETag
+    and datetimes also count towards Last-Modified.
+    """
+    versions = tag_versions(tags)
+    parts = [f'{tag}={version}' for tag, version in sorted(versions.items())]
+    parts += [value.isoformat() if isinstance(value, datetime.datetime) else str(value) for value in extra]
+    if html:
+        parts.append(release_digest())
+
+    dates = [_version_datetime(version) for version in versions.values()]
+    dates += [value for value in extra if isinstance(value, datetime.datetime)]
+    dates = [value for value in dates if value is not None]
+    return Validators(
+        hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest(),
+        min(max(dates), timezone.now()) if dates else None,
+    )
+
+
+def set_validators(response, validators):
+    """Add ETag / Last-Modified to ``response`` unless the view already did"""
+    if validators.etag and not response.has_header('ETag'):
+        response['ETag'] = quote_etag(validators.etag)
+    if validators.last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(validators.last_modified_timestamp)
+
+
+def conditional(validators_func, **cache_control):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before calling the view.
+
+    ``validators_func(request, *args, **kwargs)`` returns ``Validators``, or
+    None when they cannot be computed (e.g. the object does not exist - the
+    view then runs and produces its own 404). ``cache_control`` is passed
+    to ``patch_cache_control`` for 200 and 304 responses.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            validators = validators_func(request, *args, **kwargs)
+            if validators is None:
+                return view_func(request, *args, **kwargs)
+
+            response = get_conditional_response(
+                request,
+                etag=quote_etag(validators.etag),
+                last_modified=validators.last_modified_timestamp,
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            set_validators(response, validators)
+            if cache_control:
+                patch_cache_control(response, **cache_control)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,16 @@
+from django.contrib.auth.models import AnonymousUser
+
+from .page_cache import is_shared_page
+
+
+def page_fragments(request):
+    """
+    ``page_user`` is the user the page body is rendered for: anonymous on
+    shared (cached) pages, whose per-user fragments load after the page
+    (see static/js/fragments.js), the real user everywhere else.
+    """
+    shared = is_shared_page(request)
+    return {
+        'shared_page': shared,
+        'page_user': AnonymousUser() if shared else getattr(request, 'user', AnonymousUser()),
+    }
@@ -0,0 +1,91 @@
+"""
+Django Management Command to compare cache backends
+Hit/miss/set latency of LocMemCache vs the shared SQLiteCache (and the configured default)
+Usage: python manage.py benchmark_cache [--keys 1000] [--repeat 5000] [--payload 2048]
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.cache_backends import SQLiteCache
+
+
+class Command(BaseCommand):
+    help = 'Benchmark LocMemCache against the shared SQLite cache (and the configured default cache)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keys',
+            type=int,
+            default=1000,
+            help='Distinct keys written before timing reads (default: 1000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5000,
+            help='Timed operations per case (default: 5000)'
+        )
+        parser.add_argument(
+            '--payload',
+            type=int,
+            default=2048,
+            help='Approximate bytes per cached value (default: 2048)'
+        )
+
+    def handle(self, *args, **options):
+        keys = options['keys']
+        repeat = options['repeat']
+        payload = options['payload']
+
+        value = {'title': 'x' * payload, 'downloads': 12345, 'ids': list(range(20))}
+        with tempfile.TemporaryDirectory() as tmp:
+            backends = [
+                ('LocMemCache', LocMemCache('benchmark', {'OPTIONS': {'MAX_ENTRIES': keys * 2}})),
+                ('SQLiteCache', SQLiteCache(os.path.join(tmp, 'cache.sqlite3'), {'OPTIONS': {'MAX_ENTRIES': keys * 2}})),
+            ]
+            default = caches['default']
+            if not isinstance(default, (LocMemCache, SQLiteCache)):
+                backends.append((f'default ({type(default).__name__})', default))
+
+            self.stdout.write(self.style.SUCCESS(
+                f'📊 Cache benchmark: {keys:,} keys, ~{payload:,} bytes/value, {repeat:,} ops per case'
+            ))
+            self.stdout.write('-' * 72)
+            self.stdout.write(f'{"backend":<30}{"operation":<14}{"median us":>14}{"p95 us":>14}')
+            self.stdout.write('-' * 72)
+
+            for label, cache in backends:
+                names = [f'benchmark:{i}' for i in range(keys)]
+                cache.set_many({name: value for name in names}, 300)
+
+                cases = [
+                    ('get (hit)', lambda i: cache.get(names[i % keys])),
+                    ('get (miss)', lambda i: cache.get(f'benchmark:missing:{i}')),
+                    ('set', lambda i: cache.set(names[i % keys], value, 300)),
+                    ('get_many(20)', lambda i: cache.get_many(names[i % max(keys - 20, 1):][:20])),
+                ]
+                for operation, run in cases:
+                    timings = []
+                    for i in range(repeat):
+                        started = time.perf_counter()
+                        run(i)
+                        timings.append((time.perf_counter() - started) * 1_000_000)
+                    timings.sort()
+                    p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+                    self.stdout.write(
+                        f'{label:<30}{operation:<14}{statistics.median(timings):>14.1f}{p95:>14.1f}'
+                    )
+                cache.delete_many(names)
+                self.stdout.write('-' * 72)
+
+        self.stdout.write(
+            'LocMemCache is per process: with N gunicorn workers every value is computed N times.\n'
+            'The shared backends compute it once for all workers.'
+        )
@@ -0,0 +1,151 @@
+"""
+Django Management Command to warm the caches after a deploy
+Requests the home page, category listings, popular apps and the top-N app
+detail pages so the first visitors get cache hits
+Usage: python manage.py warm_caches [--top 50] [--workers 8] [--host jndroid.store] [--url https://jndroid.store]
+
+Without --url the pages are rendered in this process through the full
+middleware stack, which fills the shared cache (page cache, fragments,
+popular apps, category counts). With --url they are fetched from the running
+site instead, so the cache is written by the service user.
+
+Templates are not this command's job: each gunicorn worker compiles all of
+them at start-up (config/wsgi.py, core/template_warmup.py).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from apps.models import App
+from categories.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Warm the page/fragment caches (run after a deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='Number of top-ranked app detail pages to warm (default: 50)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Concurrent requests (default: 8)'
+        )
+        parser.add_argument(
+            '--host',
+            default='',
+            help='Host header for in-process requests (default: first ALLOWED_HOSTS entry)'
+        )
+        parser.add_argument(
+            '--url',
+            default='',
+            help='Fetch pages from this running site instead of rendering them in-process'
+        )
+
+    def handle(self, *args, **options):
+        self.base_url = options['url'].rstrip('/')
+        self.host = options['host'] or next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost'
+        )
+        self.local = threading.local()
+        workers = max(options['workers'], 1)
+
+        target = self.base_url or f'{self.host} (in-process)'
+        self.stdout.write(self.style.SUCCESS(f'🔥 Warming caches for {target} with {workers} workers'))
+        self.stdout.write('-' * 72)
+        self.stdout.write(f'{"group":<20}{"keys":>8}{"failed":>8}{"wall ms":>12}{"slowest ms":>12}  slowest key')
+        self.stdout.write('-' * 72)
+
+        started = time.perf_counter()
+        failed = 0
+        for group, paths in self.page_groups(options['top']):
+            failed += self.report(group, self.fetch_all, (paths, workers))
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write('-' * 72)
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️  Caches warmed in {elapsed:.0f} ms, {failed} key(s) failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Caches warmed in {elapsed:.0f} ms'))
+
+    # ==================== KEY GROUPS ====================
+
+    def page_groups(self, top):
+        categories = list(Category.objects.filter(is_active=True).values_list('slug', flat=True))
+        top_apps = list(
+            App.objects.filter(is_published=True)
+            .order_by('-rank_score', '-id')
+            .values_list('slug', flat=True)[:top]
+        )
+        return [
+            ('home shelves', [reverse('home'), reverse('apps:list')]),
+            ('categories', [
+                reverse('categories:list'),
+                reverse('categories:api_list'),
+                *(reverse('categories:detail', args=[slug]) for slug in categories),
+                *(reverse('categories:api_apps', args=[slug]) for slug in categories),
+            ]),
+            ('popular apps', [reverse('apps:popular_apps_api')]),
+            ('app details', [reverse('apps:detail', args=[slug]) for slug in top_apps]),
+        ]
+
+    # ==================== FETCHING ====================
+
+    def fetch_all(self, paths, workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.fetch, paths))
+
+    def fetch(self, path):
+        started = time.perf_counter()
+        try:
+            status = self.fetch_remote(path) if self.base_url else self.fetch_local(path)
+        except (OSError, urllib.error.URLError) as e:
+            self.stderr.write(f'  ⚠️  {path}: {e}')
+            status = None
+        if status is not None and status != 200:
+            self.stderr.write(f'  ⚠️  {path}: HTTP {status}')
+        return path, status == 200, time.perf_counter() - started
+
+    def fetch_local(self, path):
+        # Client is not thread-safe: one per pool thread
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST=self.host)
+        return client.get(path, secure=not settings.DEBUG).status_code
+
+    def fetch_remote(self, path):
+        request = urllib.request.Request(
+            f'{self.base_url}{path}',
+            headers={'Accept-Encoding': 'gzip', 'User-Agent': 'jndroid-warm-caches'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    # ==================== OUTPUT ====================
+
+    def report(self, group, warm, args):
+        """Run one key group and print its wall time and slowest key"""
+        started = time.perf_counter()
+        results = warm(*args)
+        wall = (time.perf_counter() - started) * 1000
+        failed = sum(1 for _key, ok, _seconds in results if not ok)
+        slowest_key, _ok, slowest = max(results, key=lambda result: result[2], default=('-', True, 0))
+        line = f'{group:<20}{len(results):>8}{failed:>8}{wall:>12.0f}{slowest * 1000:>12.0f}  {slowest_key}'
+        self.stdout.write(self.style.ERROR(line) if failed else line)
+        return failed
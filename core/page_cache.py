@@ -0,0 +1,187 @@
+"""
+Full-page cache for catalog pages.
+
+``PageCacheMiddleware`` sits in front of the session, auth and message
+middleware. For a GET/HEAD it looks the page up by URL name, path and the
+query params that page actually reads (CACHED_PAGES), and on a hit returns
+the stored gzip body without touching the ORM, templates or sessions.
+
+Views opt in and declare what the page depends on:
+
+    mark_page_cacheable(request, app_tag(app.id), category_tag(app.category.slug))
+
+The tag versions are recorded next to the stored body; a write that bumps
+any of them (see core/cache_tags.py) makes exactly those pages miss.
+
+Cacheable ("shared") pages render the same body for everyone: the user
+menu, flash messages and per-app actions are rendered for an anonymous
+user and swapped in after load from ``core.views.page_fragments``
+(hole punching, see templates/fragments/ and static/js/fragments.js).
+The ``jn_fragments`` cookie tells the script whether the visitor has a
+session or pending messages, i.e. whether there is anything to fetch.
+
+Stored ETag / Last-Modified headers (see core/conditional.py) are honoured
+on hits: a revalidating browser gets a 304 straight from the cache.
+"""
+import gzip
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import parse_http_date_safe
+
+from .cache_tags import tag_versions
+
+# URL name -> query params that change the page (everything else is ignored)
+CACHED_PAGES = {
+    'apps:list': ('q', 'cat', 'page', 'cursor'),
+    'apps:detail': (),
+    'categories:list': (),
+    'categories:detail': (),
+}
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+KEY_PREFIX = 'pagecache:'
+# Headers that must not be replayed to other visitors
+SKIP_HEADERS = {'set-cookie', 'content-length', 'content-encoding'}
+# Readable by JS (not HttpOnly): "this visitor has per-user fragments"
+FRAGMENT_HINT_COOKIE = 'jn_fragments'
+
+
+def mark_page_cacheable(request, *tags):
+    """
+    Allow the middleware to store this response under ``tags``.
+    Call it as early as possible in the view: tag versions are read here,
+    so a write that lands while the page renders still invalidates it.
+    """
+    request._page_cache_tags = tag_versions(tags)
+
+
+def is_shared_page(request):
+    """True when the current response is cacheable and must not be personalized"""
+    return getattr(request, '_page_cache_tags', None) is not None
+
+
+def page_cache_key(request):
+    """Cache key for ``request``, or None if the page is not cacheable"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    params = CACHED_PAGES.get(match.view_name)
+    if params is None:
+        return None
+    query = urlencode(sorted(
+        (name, value) for name in params for value in request.GET.getlist(name) if value
+    ))
+    digest = hashlib.md5(f'{request.get_host()}{request.path}?{query}'.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}{match.view_name}:{digest}'
+
+
+def has_user_state(request, response):
+    """Session or pending messages cookie after ``response`` is applied"""
+    for name in (settings.SESSION_COOKIE_NAME, 'messages'):
+        if name in response.cookies:
+            if response.cookies[name].value:
+                return True
+        elif name in request.COOKIES:
+            return True
+    return False
+
+
+def update_fragment_hint(request, response):
+    """Keep the jn_fragments cookie in line with the session/messages cookies"""
+    wanted = has_user_state(request, response)
+    if wanted and FRAGMENT_HINT_COOKIE not in request.COOKIES:
+        response.set_cookie(
+            FRAGMENT_HINT_COOKIE, '1', max_age=settings.SESSION_COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+        )
+    elif not wanted and FRAGMENT_HINT_COOKIE in request.COOKIES:
+        response.delete_cookie(FRAGMENT_HINT_COOKIE, samesite='Lax')
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+class PageCacheMiddleware:
+    """Serves and stores shared catalog pages (see module docstring)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT)
+
+    def __call__(self, request):
+        key = page_cache_key(request)
+        if key is not None:
+            entry = cache.get(key)
+            if entry is not None and tag_versions(entry['tags']) == entry['tags']:
+                response = self.cached_response(request, entry)
+                update_fragment_hint(request, response)
+                return response
+
+        response = self.get_response(request)
+        if key is not None:
+            tags = getattr(request, '_page_cache_tags', None)
+            if tags is not None and self.can_store(response):
+                cache.set(key, self.make_entry(response, tags), self.timeout)
+                response['X-Page-Cache'] = 'MISS'
+            patch_vary_headers(response, ['Accept-Encoding'])
+        # After storing: the hint is per visitor and must not be cached
+        update_fragment_hint(request, response)
+        return response
+
+    def can_store(self, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not response.has_header('Content-Encoding')
+            and 'private' not in response.get('Cache-Control', '')
+        )
+
+    def make_entry(self, response, tags):
+        return {
+            'tags': tags,
+            'headers': [
+                (name, value) for name, value in response.items()
+                if name.lower() not in SKIP_HEADERS
+            ],
+            'body': gzip.compress(response.content, compresslevel=6),
+        }
+
+    def cached_response(self, request, entry):
+        headers = {name.lower(): value for name, value in entry['headers']}
+        if 'etag' in headers or 'last-modified' in headers:
+            not_modified = get_conditional_response(
+                request,
+                etag=headers.get('etag'),
+                last_modified=parse_http_date_safe(headers.get('last-modified', '')),
+            )
+            if not_modified is not None:
+                for name, value in entry['headers']:
+                    if name.lower() in ('etag', 'last-modified', 'cache-control', 'vary', 'expires'):
+                        not_modified[name] = value
+                not_modified['X-Page-Cache'] = 'HIT'
+                return not_modified
+
+        if accepts_gzip(request):
+            response = HttpResponse(entry['body'])
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(entry['body']))
+        for name, value in entry['headers']:
+            response[name] = value
+        response['Content-Length'] = len(response.content)
+        response['X-Page-Cache'] = 'HIT'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if request.method == 'HEAD':
+            response.content = b''
+        return response
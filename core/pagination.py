@@ -0,0 +1,371 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of ``OFFSET n`` + ``COUNT(*)`` every page is fetched with a
+``WHERE (sort_key, id) < (last_sort_key, last_id)`` condition, so page 500
+costs the same as page 1 and no count is needed. Cursors are opaque, signed
+tokens holding the sort values of the first/last row on the current page.
+
+    page = paginate(request, queryset, per_page=20)
+
+``paginate`` uses the queryset's ``order_by()``; ``-id`` is appended as the
+tiebreaker when the ordering does not already end in the primary key.
+Classic page numbers stay available as an opt-in: a request with
+``?page=N`` (and no cursor) gets a Django ``Page`` from
+``ApproximateCountPaginator``, which avoids exact ``COUNT(*)`` on large sets.
+"""
+import datetime
+import decimal
+from functools import reduce
+import hashlib
+import json
+import logging
+import operator
+from urllib.parse import urlencode
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+
+CURSOR_PARAM = 'cursor'
+PAGE_PARAM = 'page'
+CURSOR_SALT = 'core.pagination.cursor'
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+# Sets up to this size are counted exactly (a LIMITed count stays cheap)
+EXACT_COUNT_LIMIT = 1000
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+class InvalidCursor(Exception):
+    """Cursor token is malformed, tampered with or does not match the ordering"""
+
+
+# ==================== APPROXIMATE COUNTS ====================
+
+def planner_estimate(queryset):
+    """Row estimate from the PostgreSQL planner (EXPLAIN, nothing is executed)"""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_cache_key(queryset):
+    """One cache key per distinct filter set (the compiled SQL + params)"""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode('utf-8')).hexdigest()
+    return f'pagination:count:{digest}'
+
+
+def approximate_count(queryset, exact_limit=EXACT_COUNT_LIMIT, use_estimates=True):
+    """
+    Cheap row count for ``queryset``. Returns (count, is_approximate).
+
+    1. Count at most ``exact_limit + 1`` rows - small sets get an exact answer.
+    2. Larger sets on PostgreSQL use the planner's row estimate.
+    3. Otherwise an exact count is cached per filter set for COUNT_CACHE_TIMEOUT
+       (reported as exact, though it may lag writes by that long).
+    """
+    queryset = queryset.order_by()
+    bounded = queryset.values('pk')[:exact_limit + 1].count()
+    if bounded <= exact_limit:
+        return bounded, False
+
+    if use_estimates and connections[queryset.db].vendor == 'postgresql':
+        try:
+            return max(planner_estimate(queryset), bounded), True
+        except DatabaseError:
+            logger.warning("Planner estimate failed, falling back to a cached count", exc_info=True)
+
+    key = count_cache_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count, False
+
+
+class ApproximatePage(Page):
+    """Page whose has_next comes from fetching one row past it, not from the count"""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Drop-in ``Paginator`` that never runs an unbounded COUNT(*) on large sets.
+    ``paginator.is_approximate`` tells templates to say "about N results".
+    Pages of large sets are checked against the rows themselves, so a low
+    estimate (or a stale cached count) never hides the last pages.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 exact_limit=EXACT_COUNT_LIMIT, use_estimates=True):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.exact_limit = exact_limit
+        self.use_estimates = use_estimates
+        self.is_approximate = False
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        count, self.is_approximate = approximate_count(
+            self.object_list, self.exact_limit, self.use_estimates,
+        )
+        return count
+
+    @property
+    def _counted_roughly(self):
+        return hasattr(self.object_list, 'query') and self.count > self.exact_limit
+
+    def _set_count(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+
+    def validate_number(self, number):
+        if not self._counted_roughly:
+            return super().validate_number(number)
+        # No upper bound: page() finds the end from the rows
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        if not self._counted_roughly:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        # One extra row tells us whether there is another page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            # Past the end of an overestimated set: count exactly (only on this
+            # path) so the caller's fallback to num_pages lands on the last page
+            self._set_count(self.object_list.count())
+            self.is_approximate = False
+            raise EmptyPage(_("That page contains no results"))
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        seen = bottom + len(rows) + has_next
+        if seen > self.count:
+            self._set_count(seen)  # the estimate was low; at least this many
+            self.is_approximate = True
+        return ApproximatePage(rows, number, self, has_next)
+
+
+def _dump_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class CursorPage:
+    """One page of a keyset-paginated queryset (iterable like a Django Page)"""
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, params=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f"<CursorPage: {len(self)} objects>"
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _query_string(self, cursor):
+        query = self.params.copy() if self.params is not None else {}
+        query.pop(PAGE_PARAM, None)
+        query.pop(CURSOR_PARAM, None)
+        if cursor:
+            query[CURSOR_PARAM] = cursor
+        if hasattr(query, 'urlencode'):
+            return f"?{query.urlencode()}"
+        return f"?{urlencode(query)}"
+
+    @property
+    def first_query(self):
+        return self._query_string(None)
+
+    @property
+    def next_query(self):
+        return self._query_string(self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_query(self):
+        return self._query_string(self.previous_cursor) if self.has_previous else ''
+
+
+class CursorPaginator:
+    """
+    Keyset paginator over ``queryset`` ordered by ``ordering`` (defaults to
+    the queryset's own order_by). Ordering entries must be model fields or
+    annotations readable as attributes on the returned objects.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        ordering = list(ordering or queryset.query.order_by)
+        if not ordering:
+            raise ValueError("CursorPaginator needs an ordered queryset")
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = [name.startswith('-') for name in ordering]
+
+    # -------------------- cursor encoding --------------------
+
+    def encode_cursor(self, obj, direction):
+        values = [_dump_value(getattr(obj, field)) for field in self.fields]
+        return signing.dumps({'d': direction, 'o': self.ordering, 'v': values}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        try:
+            data = signing.loads(token, salt=CURSOR_SALT)
+            direction, ordering, values = data['d'], data['o'], data['v']
+        except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+            raise InvalidCursor(str(exc))
+        if direction not in (NEXT, PREVIOUS) or ordering != self.ordering or len(values) != len(self.fields):
+            raise InvalidCursor("cursor does not match this listing")
+
+        parsed = []
+        annotations = self.queryset.query.annotations
+        for field, value in zip(self.fields, values):
+            if field in annotations:
+                model_field = annotations[field].output_field  # e.g. search rank (numeric)
+            else:
+                try:
+                    model_field = self.queryset.model._meta.get_field('id' if field == 'pk' else field)
+                except FieldDoesNotExist:
+                    parsed.append(value)
+                    continue
+            try:
+                parsed.append(model_field.to_python(value))
+            except ValidationError as exc:
+                raise InvalidCursor(str(exc))
+        return direction, parsed
+
+    # -------------------- querying --------------------
+
+    def _after(self, values, reverse=False):
+        """Rows strictly after ``values`` in the ordering (before them if reverse)"""
+        clauses = []
+        for i, field in enumerate(self.fields):
+            descending = self.descending[i] != reverse
+            condition = Q(**{f"{field}__{'lt' if descending else 'gt'}": values[i]})
+            for j in range(i):
+                condition &= Q(**{self.fields[j]: values[j]})
+            clauses.append(condition)
+        return reduce(operator.or_, clauses)
+
+    def page(self, cursor=None, params=None):
+        """
+        Page after/before ``cursor`` (first page when empty).
+        Raises InvalidCursor for bad tokens.
+        """
+        direction, values = self.decode_cursor(cursor) if cursor else (NEXT, None)
+        backwards = direction == PREVIOUS
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse=backwards))
+        if backwards:
+            queryset = queryset.order_by(*[
+                field if descending else f"-{field}"
+                for field, descending in zip(self.fields, self.descending)
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # One extra row tells us whether there is another page
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.encode_cursor(rows[-1], NEXT) if rows else None,
+            previous_cursor=self.encode_cursor(rows[0], PREVIOUS) if rows else None,
+            params=params,
+        )
+
+
+def paginate(request, queryset, per_page, ordering=None):
+    """
+    Paginate ``queryset`` for ``request``.
+    Cursor pagination by default; ``?page=N`` opts into OFFSET pagination
+    and returns a Django Page (with approximate counts for large sets).
+    Bad cursors fall back to the first page.
+    """
+    cursor = request.GET.get(CURSOR_PARAM, '')
+    page = request.GET.get(PAGE_PARAM)
+
+    if page and not cursor:
+        paginator = ApproximateCountPaginator(queryset, per_page)
+        try:
+            return paginator.page(page)
+        except PageNotAnInteger:
+            return paginator.page(1)
+        except EmptyPage:
+            return paginator.page(paginator.num_pages)
+
+    paginator = CursorPaginator(queryset, per_page, ordering)
+    try:
+        return paginator.page(cursor, params=request.GET)
+    except InvalidCursor:
+        return paginator.page(None, params=request.GET)
@@ -0,0 +1,101 @@
+"""
+Stampede-safe cached values.
+
+With a plain ``cache.get_or_set`` every worker that misses at the moment a
+hot key expires runs the expensive query at the same time. ``cached_value``
+prevents that:
+
+    stats = cached_value('admin:dashboard', compute_stats, timeout=60 * 5)
+
+- single flight: only the process that wins ``cache.add(<key>:lock)``
+  recomputes; the others keep serving the previous value (or, when there
+  is none yet, wait for the winner instead of running the query too)
+- early recomputation (XFetch): as the soft expiry approaches, a request
+  recomputes with a probability that grows with how long the last
+  computation took, so the value is usually refreshed before it expires
+- stale-while-revalidate: entries live ``stale_timeout`` seconds past
+  their soft expiry (and past a bump of their ``tags``, see
+  core/cache_tags.py) so there is always something to serve; a failing
+  refresh serves the stale value too
+"""
+import logging
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from .cache_tags import tag_versions
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'swr:'
+# Larger beta = earlier recomputation
+DEFAULT_BETA = 1.0
+# Upper bound for one recomputation (the lock expires after it)
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+
+
+def _should_refresh(entry, versions, beta):
+    """Tags bumped, or XFetch: now - delta * beta * ln(rand) >= expiry"""
+    if entry['tags'] != versions:
+        return True
+    jitter = -entry['delta'] * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= entry['expires']
+
+
+def _compute_and_store(entry_key, compute, timeout, stale_timeout, versions):
+    started = time.monotonic()
+    value = compute()
+    cache.set(entry_key, {
+        'value': value,
+        'tags': versions,
+        'delta': time.monotonic() - started,
+        'expires': time.time() + timeout,
+    }, timeout + stale_timeout)
+    return value
+
+
+def cached_value(key, compute, timeout, tags=(), stale_timeout=None, beta=DEFAULT_BETA,
+                 lock_timeout=LOCK_TIMEOUT):
+    """
+    Value of ``compute()`` cached under ``key`` for ``timeout`` seconds
+    (plus ``stale_timeout``, default ``timeout``, of stale serving).
+    ``tags`` invalidate it like ``get_or_set_tagged`` does.
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout
+    entry_key = f'{KEY_PREFIX}{key}'
+    lock_key = f'{entry_key}:lock'
+    versions = tag_versions(tags) if tags else {}
+
+    entry = cache.get(entry_key)
+    if entry is not None:
+        if not _should_refresh(entry, versions, beta):
+            return entry['value']
+        if not cache.add(lock_key, 1, lock_timeout):
+            return entry['value']  # someone else is refreshing
+        try:
+            return _compute_and_store(entry_key, compute, timeout, stale_timeout, versions)
+        except Exception:
+            logger.exception('Refreshing %s failed, serving the stale value', key)
+            return entry['value']
+        finally:
+            cache.delete(lock_key)
+
+    # Nothing to serve yet: one process computes, the others wait for it
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            return _compute_and_store(entry_key, compute, timeout, stale_timeout, versions)
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(entry_key)
+        if entry is not None:
+            return entry['value']
+    # The lock holder died or is very slow
+    return _compute_and_store(entry_key, compute, timeout, stale_timeout, versions)
@@ -0,0 +1,51 @@
+"""
+Template compilation at worker start-up.
+
+Django's cached template loader compiles a template the first time a
+process renders it, so every fresh gunicorn worker pays for parsing on its
+first requests. ``compile_templates()`` loads every project/app template up
+front; config/wsgi.py calls it once per worker (gunicorn runs without
+--preload, so wsgi.py is imported in each worker).
+"""
+import logging
+import os
+import time
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def template_names(engine):
+    """Names of the templates under the engine's directories (app directories included)"""
+    seen = set()
+    for directory in (str(path) for path in engine.template_dirs):
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                if not name.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                template_name = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+                if template_name not in seen:
+                    seen.add(template_name)
+                    yield template_name
+
+
+def compile_templates():
+    """Compile every template into this process's cached loaders. Returns (compiled, failed)."""
+    started = time.perf_counter()
+    compiled = failed = 0
+    for engine in engines.all():
+        for template_name in template_names(engine):
+            try:
+                engine.get_template(template_name)
+                compiled += 1
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                logger.warning("Template %s does not compile: %s", template_name, str(e).splitlines()[0])
+                failed += 1
+    logger.info(
+        "Templates compiled: %d (%d failed) in %.0f ms",
+        compiled, failed, (time.perf_counter() - started) * 1000,
+    )
+    return compiled, failed
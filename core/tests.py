@@ -1,3 +1,323 @@
-from django.test import TestCase
+from decimal import Decimal
+import gzip
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, Value, When
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from apps.models import App
+from categories.models import Category
+from .cache_tags import CATALOG, app_tag, category_tag, tag_versions
+from .page_cache import FRAGMENT_HINT_COOKIE, PageCacheMiddleware, mark_page_cacheable, page_cache_key
+from .pagination import CURSOR_SALT, CursorPaginator, InvalidCursor, paginate
+from .stampede import cached_value
+from .template_warmup import compile_templates
+
+
+def create_apps(downloads):
+    """Published apps with the given download counts (ids ascending)"""
+    owner = get_user_model().objects.create_user(username='dev', password='secret-pass-123')
+    category = Category.objects.create(name='Tools', slug='tools')
+    return [
+        App.objects.create(
+            owner=owner, category=category, title=f'App {n}', slug=f'app-{n}',
+            downloads=count, is_published=True,
+        )
+        for n, count in enumerate(downloads)
+    ]
+
+
+# ==================== TEMPLATE WARM-UP ====================
+
+class CompileTemplatesTests(SimpleTestCase):
+    def test_templates_land_in_the_cached_loader(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        with self.assertLogs('core.template_warmup', 'INFO'):
+            compiled, _failed = compile_templates()
+        self.assertGreater(compiled, 0)
+        self.assertTrue(any(key.startswith('base.html') for key in loader.get_template_cache))
+
+
+# ==================== CURSOR PAGINATION ====================
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        # Ties on the sort key: -id breaks them
+        self.apps = create_apps([50, 30, 30, 30, 10, 10, 0])
+        self.queryset = App.objects.order_by('-downloads')
+        self.expected = [app.pk for app in sorted(self.apps, key=lambda app: (-app.downloads, -app.pk))]
+
+    def walk(self, paginator):
+        page, seen = paginator.page(), []
+        while True:
+            seen += [app.pk for app in page]
+            if not page.has_next:
+                return seen, page
+            page = paginator.page(page.next_cursor)
+
+    def test_walks_every_row_once_across_ties(self):
+        seen, last = self.walk(CursorPaginator(self.queryset, 2))
+        self.assertEqual(seen, self.expected)
+        self.assertFalse(last.has_next)
+        self.assertTrue(last.has_previous)
+        self.assertEqual(len(last), 1)
+
+    def test_previous_cursor_returns_the_previous_page(self):
+        paginator = CursorPaginator(self.queryset, 3)
+        second = paginator.page(paginator.page().next_cursor)
+        first = paginator.page(second.previous_cursor)
+        self.assertEqual([app.pk for app in first], self.expected[:3])
+        self.assertFalse(first.has_previous)
+        self.assertTrue(first.has_next)
+
+    def test_tampered_cursor_is_rejected(self):
+        paginator = CursorPaginator(self.queryset, 2)
+        cursor = paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            paginator.page(cursor[:-2] + ('A' if cursor[-2] != 'A' else 'B') + cursor[-1])
+        forged = signing.dumps({'d': 'n', 'o': ['-downloads', '-id'], 'v': [0, 0]}, salt='another.salt')
+        with self.assertRaises(InvalidCursor):
+            paginator.page(forged)
+
+    def test_cursor_of_another_listing_is_rejected(self):
+        foreign = CursorPaginator(App.objects.order_by('title'), 2).page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            CursorPaginator(self.queryset, 2).page(foreign)
+
+    def test_paginate_falls_back_to_the_first_page_on_a_bad_cursor(self):
+        request = RequestFactory().get('/', {'cursor': 'not-a-cursor'})
+        page = paginate(request, self.queryset, 2)
+        self.assertEqual([app.pk for app in page], self.expected[:2])
+        self.assertFalse(page.has_previous)
+
+    def test_decimal_rank_key(self):
+        # Like search_rank: a numeric annotation, with ties
+        ranks = [Decimal('0.75'), Decimal('0.5'), Decimal('0.5'), Decimal('0.5'), Decimal('0.25'), Decimal('0.25'), Decimal('0')]
+        rank = Case(
+            *[When(pk=app.pk, then=Value(value)) for app, value in zip(self.apps, ranks)],
+            output_field=DecimalField(max_digits=12, decimal_places=6),
+        )
+        paginator = CursorPaginator(App.objects.annotate(search_rank=rank).order_by('-search_rank'), 2)
+        seen, _last = self.walk(paginator)
+        self.assertEqual(seen, [app.pk for app, _ in sorted(zip(self.apps, ranks), key=lambda pair: (-pair[1], -pair[0].pk))])
+
+        cursor = paginator.page().next_cursor
+        _direction, values = paginator.decode_cursor(cursor)
+        self.assertEqual(values[0], Decimal('0.5'))
+        self.assertIsInstance(values[0], Decimal)
+        stored = signing.loads(cursor, salt=CURSOR_SALT)['v'][0]
+        self.assertIsInstance(stored, str)  # serialized exactly, not as a float
+        self.assertEqual(Decimal(stored), Decimal('0.5'))
+
+
+# ==================== CACHE TAGS ====================
+
+class AppCacheTagsTests(TestCase):
+    """apps.signals.app_cache_tags_handler bumps the tags of the pages showing an app"""
+
+    def setUp(self):
+        (self.app,) = create_apps([10])
+        self.games = Category.objects.create(name='Games', slug='games')
+
+    def bumped(self, write, tags):
+        """Tags among ``tags`` whose version changed across ``write()`` (and its commit)"""
+        before = tag_versions(tags)
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        after = tag_versions(tags)
+        return {tag for tag in tags if before[tag] != after[tag]}
+
+    def test_quiet_save_bumps_nothing(self):
+        tags = {app_tag(self.app.pk), category_tag('tools'), CATALOG}
+        self.app.downloads += 1
+        self.assertEqual(self.bumped(lambda: self.app.save(update_fields=['downloads']), tags), set())
+
+    def test_category_move_bumps_both_categories(self):
+        tags = {app_tag(self.app.pk), category_tag('tools'), category_tag('games'), CATALOG}
+        self.app.category = self.games
+        self.assertEqual(self.bumped(self.app.save, tags), tags)
+
+    def test_delete_bumps_the_app_tag(self):
+        app_id = self.app.pk  # delete() clears it
+        tags = {app_tag(app_id), category_tag('tools'), category_tag('games')}
+        self.assertEqual(self.bumped(self.app.delete, tags), {app_tag(app_id), category_tag('tools')})
+
+
+# ==================== PAGE CACHE ====================
+
+class PageCacheTests(TestCase):
+    """Shared pages are stored once and replayed to anonymous and signed-in visitors alike"""
+
+    def setUp(self):
+        cache.clear()
+        (self.app,) = create_apps([5])
+        self.url = self.app.get_absolute_url()
+        self.reader = get_user_model().objects.create_user(
+            username='reader-zoe', first_name='Zephyrine', password='secret-pass-123',
+        )
+
+    def test_anonymous_hit_is_served_gzipped(self):
+        miss = self.client.get(self.url)
+        self.assertEqual(miss['X-Page-Cache'], 'MISS')
+
+        hit = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(hit['X-Page-Cache'], 'HIT')
+        self.assertEqual(hit['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(hit.content), miss.content)
+        self.assertIn('Accept-Encoding', hit['Vary'])
+
+        plain = self.client.get(self.url)
+        self.assertEqual(plain['X-Page-Cache'], 'HIT')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, miss.content)
+
+    def test_write_to_the_app_invalidates_the_page(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.app.title = 'Renamed'
+            self.app.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Renamed')
+
+    def test_signed_in_visitor_gets_the_shared_body_and_their_fragments(self):
+        self.client.get(self.url)
+        self.client.force_login(self.reader)
+
+        page = self.client.get(self.url)
+        self.assertEqual(page['X-Page-Cache'], 'HIT')
+        self.assertNotContains(page, 'Zephyrine')
+        self.assertContains(page, 'data-fragment="profile_button"')
+        # The hint tells static/js/fragments.js to fetch the user's slots
+        self.assertEqual(page.cookies[FRAGMENT_HINT_COOKIE].value, '1')
+
+        fragments = self.client.get(reverse('page_fragments'), {'app': self.app.slug}).json()
+        self.assertTrue(fragments['authenticated'])
+        self.assertIn('Zephyrine', fragments['fragments']['bottom_menu_title'])
+        self.assertIn('Write Review', fragments['fragments']['app_actions'])
+
+
+class PageCacheStoreTests(TestCase):
+    """Responses that belong to one visitor are never stored"""
+
+    def setUp(self):
+        cache.clear()
+        (self.app,) = create_apps([5])
+        self.path = self.app.get_absolute_url()
+
+    def serve(self, **headers):
+        """Run the middleware over a shared page view; returns (response, stored)"""
+        def view(request):
+            mark_page_cacheable(request, CATALOG)
+            response = HttpResponse('<p>page</p>')
+            for name, value in headers.items():
+                if name == 'Set-Cookie':
+                    response.set_cookie(*value)
+                else:
+                    response[name] = value
+            return response
+
+        request = RequestFactory().get(self.path)
+        response = PageCacheMiddleware(view)(request)
+        return response, cache.get(page_cache_key(request)) is not None
+
+    def test_shared_page_is_stored(self):
+        response, stored = self.serve()
+        self.assertTrue(stored)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+
+    def test_response_setting_the_session_cookie_is_not_stored(self):
+        response, stored = self.serve(**{'Set-Cookie': (settings.SESSION_COOKIE_NAME, 'abc')})
+        self.assertFalse(stored)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_private_response_is_not_stored(self):
+        _response, stored = self.serve(**{'Cache-Control': 'private'})
+        self.assertFalse(stored)
+
+
+# ==================== STAMPEDE ====================
+
+class CachedValueTests(SimpleTestCase):
+    """cached_value recomputes in one caller at a time"""
+
+    def setUp(self):
+        self.key = self.id()
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.addCleanup(cache.delete_many, [f'swr:{self.key}', f'swr:{self.key}:lock'])
+
+    def slow_compute(self):
+        self.calls += 1
+        self.started.set()
+        self.assertTrue(self.release.wait(5))
+        return 'new'
+
+    def expire(self):
+        entry = cache.get(f'swr:{self.key}')
+        entry['expires'] = 0
+        cache.set(f'swr:{self.key}', entry)
+
+    def race(self, callers):
+        """Run cached_value in ``callers`` threads; the first one blocks inside compute"""
+        results = []
+
+        def call():
+            results.append(cached_value(self.key, self.slow_compute, timeout=60))
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        threads[0].start()
+        self.assertTrue(self.started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        return threads, results
+
+    def test_fresh_value_is_not_recomputed(self):
+        self.assertEqual(cached_value(self.key, lambda: 'old', timeout=60), 'old')
+        self.assertEqual(cached_value(self.key, self.slow_compute, timeout=60), 'old')
+        self.assertEqual(self.calls, 0)
+
+    def test_one_caller_refreshes_while_the_others_get_the_stale_value(self):
+        cached_value(self.key, lambda: 'old', timeout=60)
+        self.expire()
+
+        threads, results = self.race(5)
+        for thread in threads[1:]:
+            thread.join(5)
+        self.assertEqual(results, ['old'] * 4)  # served without waiting for the refresh
+
+        self.release.set()
+        threads[0].join(5)
+        self.assertEqual(sorted(results), ['new'] + ['old'] * 4)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cached_value(self.key, self.slow_compute, timeout=60), 'new')
+
+    def test_first_fill_is_computed_once(self):
+        with mock.patch('core.stampede.WAIT_INTERVAL', 0.01):
+            threads, results = self.race(3)
+            self.release.set()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(results, ['new'] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_refresh_serves_the_stale_value(self):
+        cached_value(self.key, lambda: 'old', timeout=60)
+        self.expire()
+
+        def fail():
+            raise RuntimeError('database down')
+
+        with self.assertLogs('core.stampede', 'ERROR'):
+            self.assertEqual(cached_value(self.key, fail, timeout=60), 'old')
+        self.assertIsNone(cache.get(f'swr:{self.key}:lock'))
@@ -5,16 +5,24 @@ from django.contrib import messages
 from django.db.models import Count, Sum, Avg, Q, F
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils.cache import add_never_cache_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.core.mail import send_mail
 from django.utils import timezone
 import django
 import os
 from accounts.models import User
-from apps.models import App
+from apps.models import App, Favorite
 from apps.forms import AppUploadForm
+from apps.facets import faceted_search
+from apps.search import search_apps
+from apps.search_log import search_log
 from categories.models import Category
+from core.cache_tags import CATALOG
+from core.pagination import approximate_count, paginate
+from core.stampede import cached_value
 from reviews.models import Review
 
 
@@ -72,9 +80,54 @@ def service_worker(request):
         return HttpResponse(error_msg, status=500, content_type='text/plain')
 
 
+def home_shelf():
+    """Top 4 apps for the home page"""
+    return list(App.objects.filter(is_published=True).order_by('-rank_score', '-id').cards()[:4])
+
+
 def home(request):
-    messages.success(request, 'Welcome! This is a test message.')
-    return render(request, "home.html")
+    popular_apps = cached_value('home:popular_apps', home_shelf, timeout=60 * 10, tags=[CATALOG])
+    return render(request, "home.html", {"popular_apps": popular_apps})
+
+# Per-user pieces of shared (cached) pages - see core/page_cache.py
+USER_FRAGMENTS = (
+    'profile_button', 'profile_menu_top', 'profile_menu_bottom',
+    'bottom_menu_title', 'bottom_menu_user', 'bottom_menu_account', 'messages',
+)
+APP_FRAGMENTS = ('app_actions', 'app_owner_actions')
+
+
+@require_http_methods(["GET"])
+def page_fragments(request):
+    """
+    Render the user menu, flash messages and (with ?app=<slug>) the
+    favorite/owner actions for the current visitor, as JSON for
+    static/js/fragments.js. Never cached.
+    """
+    user = request.user
+    context = {'user': user}
+    names = list(USER_FRAGMENTS)
+
+    slug = request.GET.get('app')
+    if slug:
+        app = App.objects.filter(slug=slug, is_published=True).only('id', 'slug', 'owner_id').first()
+        if app is not None:
+            context['app'] = app
+            context['is_favorite'] = (
+                user.is_authenticated and Favorite.objects.filter(user=user, app=app).exists()
+            )
+            names.extend(APP_FRAGMENTS)
+
+    response = JsonResponse({
+        'authenticated': user.is_authenticated,
+        'fragments': {
+            name: render_to_string(f'fragments/{name}.html', context, request=request)
+            for name in names
+        },
+    })
+    add_never_cache_headers(response)
+    return response
+
 
 def support(request):
     """Support and community guidelines page"""
@@ -111,42 +164,37 @@ def is_admin(user):
     return user.is_staff
 
 
+def dashboard_stats():
+    """Site-wide counters for the admin dashboard"""
+    return {
+        'total_apps': App.objects.count(),
+        'published_apps': App.objects.filter(is_published=True).count(),
+        'draft_apps': App.objects.filter(is_published=False).count(),
+        'pending_apps': App.objects.filter(is_published=False).count(),
+        'pending_deletions': App.objects.filter(is_pending_deletion=True).count(),
+        'total_users': User.objects.count(),
+        'active_users': User.objects.filter(is_active=True).count(),
+        'total_downloads': App.objects.aggregate(total=Sum('downloads'))['total'] or 0,
+        'total_reviews': Review.objects.count(),
+        'avg_rating': Review.objects.aggregate(avg=Avg('rating'))['avg'] or 0,
+        'flagged_reviews': Review.objects.filter(is_flagged=True).count(),
+    }
+
+
 @login_required(login_url='accounts:login')
 @user_passes_test(is_admin)
 def dashboard(request):
     """Admin dashboard with statistics"""
     
-    # Calculate stats
-    total_apps = App.objects.count()
-    published_apps = App.objects.filter(is_published=True).count()
-    draft_apps = App.objects.filter(is_published=False).count()
-    pending_apps = App.objects.filter(is_published=False).count()
-    pending_deletions = App.objects.filter(is_pending_deletion=True).count()
-    
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    
-    total_downloads = App.objects.aggregate(total=Sum('downloads'))['total'] or 0
-    total_reviews = Review.objects.count()
-    avg_rating = Review.objects.aggregate(avg=Avg('rating'))['avg'] or 0
-    flagged_reviews = Review.objects.filter(is_flagged=True).count()
+    # Stats are shared for 5 minutes and recomputed by one worker at a time
+    stats = cached_value('admin:dashboard_stats', dashboard_stats, timeout=60 * 5)
     
     # Recent activity
     recent_apps = App.objects.all().order_by('-created_at')[:5]
     recent_reviews = Review.objects.all().order_by('-created_at')[:5]
     
     context = {
-        'total_apps': total_apps,
-        'published_apps': published_apps,
-        'draft_apps': draft_apps,
-        'pending_apps': pending_apps,
-        'pending_deletions': pending_deletions,
-        'total_users': total_users,
-        'active_users': active_users,
-        'total_downloads': total_downloads,
-        'total_reviews': total_reviews,
-        'avg_rating': avg_rating,
-        'flagged_reviews': flagged_reviews,
+        **stats,
         'recent_apps': recent_apps,
         'recent_reviews': recent_reviews,
         'title': 'Admin Dashboard',
@@ -160,14 +208,11 @@ def apps_list(request):
     """Admin view for managing all apps with pagination and optimized queries"""
     q = request.GET.get("q", "").strip()
     status = request.GET.get("status", "").strip()  # published or draft
-    page = request.GET.get('page', 1)
     
     # Base queryset with optimized queries
     apps_qs = App.objects.select_related(
         "category", "owner"
-    ).annotate(
-        review_count=Count("reviews")
-    ).order_by('-created_at')
+    ).order_by('-created_at', '-id')
     
     # Filter by status
     if status == "published":
@@ -192,14 +237,8 @@ def apps_list(request):
         total_downloads=Sum('downloads') or 0,
     )
     
-    # Pagination (20 apps per page)
-    paginator = Paginator(apps_qs, 20)
-    try:
-        apps = paginator.page(page)
-    except PageNotAnInteger:
-        apps = paginator.page(1)
-    except EmptyPage:
-        apps = paginator.page(paginator.num_pages)
+    # Cursor pagination (20 apps per page), ?page=N for page numbers
+    apps = paginate(request, apps_qs, 20)
     
     context = {
         'apps': apps,
@@ -231,7 +270,7 @@ def app_detail(request, slug):
     app_versions = app.versions.all().order_by('-released_at')
     
     # Stats
-    reviews_count = reviews.count()
+    reviews_count = app.review_count
     total_downloads = app.downloads
     
     context = {
@@ -794,7 +833,7 @@ def audit_logs(request):
     search_query = request.GET.get('q', '').strip()
     
     # Base queryset
-    logs = AuditLog.objects.select_related('admin_user').order_by('-timestamp')
+    logs = AuditLog.objects.select_related('admin_user').order_by('-timestamp', '-id')
     
     # Apply filters
     if action_filter:
@@ -810,23 +849,15 @@ def audit_logs(request):
             Q(ip_address__icontains=search_query)
         )
     
-    # Pagination
-    from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-    page = request.GET.get('page', 1)
-    paginator = Paginator(logs, 50)
-    try:
-        logs_page = paginator.page(page)
-    except PageNotAnInteger:
-        logs_page = paginator.page(1)
-    except EmptyPage:
-        logs_page = paginator.page(paginator.num_pages)
+    # Cursor pagination (50 logs per page), ?page=N for page numbers
+    logs_page = paginate(request, logs, 50)
     
     # Get unique values for filters
     all_actions = AuditLog.objects.values_list('action', flat=True).distinct()
     all_object_types = AuditLog.objects.values_list('object_type', flat=True).distinct()
     
     # Stats
-    total_logs = AuditLog.objects.count()
+    total_logs, total_logs_approximate = approximate_count(AuditLog.objects.all())
     today_logs = AuditLog.objects.filter(timestamp__date=timezone.now().date()).count()
     
     context = {
@@ -837,6 +868,7 @@ def audit_logs(request):
         'all_actions': all_actions,
         'all_object_types': all_object_types,
         'total_logs': total_logs,
+        'total_logs_approximate': total_logs_approximate,
         'today_logs': today_logs,
         'title': 'Audit Logs',
     }
@@ -994,13 +1026,46 @@ def dmca_success(request):
 
 def search(request):
     """
-    Search results page
+    Search results page (server-rendered, paginated, with facet counts)
     Handles search queries from the search component
-    Query parameter: ?q=searchterm
+    Query parameters: ?q=searchterm&category=&age_rating=&is_free=&has_iap=&api=&page=
     """
     query = request.GET.get('q', '').strip()
+    page = request.GET.get('page', 1)
+    
+    apps_qs = App.objects.filter(is_published=True).select_related(
+        'category', 'owner'
+    ).order_by('-downloads', '-id')
+    if query:
+        apps_qs = search_apps(apps_qs, query)
+    
+    # All facet counts (and the result total) come from one grouped query
+    apps_qs, facets, total_results, active_filters = faceted_search(apps_qs, request.GET)
+    
+    # Pagination (20 apps per page) - total is already known, skip COUNT(*)
+    paginator = Paginator(apps_qs, 20)
+    paginator.count = total_results
+    try:
+        apps = paginator.page(page)
+    except PageNotAnInteger:
+        apps = paginator.page(1)
+    except EmptyPage:
+        apps = paginator.page(paginator.num_pages)
+    
+    # Query log (buffered in memory, flushed to the database in bulk)
+    if query and str(page) == '1':  # first page only; ?page=1 arrives as a string
+        search_log.record(query, 'page', total_results)
+    
+    page_params = request.GET.copy()
+    page_params.pop('page', None)
+    
     context = {
         'query': query,
+        'apps': apps,
+        'facets': facets,
+        'active_filters': active_filters,
+        'total_results': total_results,
+        'page_query': page_params.urlencode(),
     }
     return render(request, 'search.html', context)
 
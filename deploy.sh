@@ -14,6 +14,9 @@ NC='\033[0m'
 PROJECT_PATH="/var/www/jndroid.store/backend"  # Change this to your actual path
 PYTHON_VERSION="python3"
 VENV_NAME="venv"
+GUNICORN_SERVICE="gunicorn_jndroid"
+APK_WORKER_SERVICE="jndroid_apk_worker"  # manage.py process_apks --loop
+SITE_URL="https://jndroid.store"  # Warmed through the live site after the restart
 
 echo -e "${YELLOW}[Step 1] Navigating to project directory...${NC}"
 cd $PROJECT_PATH || { echo "Project directory not found!"; exit 1; }
@@ -46,14 +49,38 @@ echo -e "${YELLOW}[Step 6] Running migrations...${NC}"
 $PYTHON_VERSION manage.py migrate --noinput
 echo -e "${GREEN}✓ Migrations completed${NC}"
 
-echo -e "${YELLOW}[Step 7] Collecting static files...${NC}"
+echo -e "${YELLOW}[Step 7] Refreshing app rank scores...${NC}"
+$PYTHON_VERSION manage.py recompute_rank_scores
+echo -e "${GREEN}✓ Rank scores refreshed${NC}"
+
+echo -e "${YELLOW}[Step 8] Collecting static files...${NC}"
 $PYTHON_VERSION manage.py collectstatic --noinput
 echo -e "${GREEN}✓ Static files collected${NC}"
 
-echo -e "${YELLOW}[Step 8] Verifying installation...${NC}"
+echo -e "${YELLOW}[Step 9] Verifying installation...${NC}"
 $PYTHON_VERSION archived-scripts/final_verify.py
 echo -e "${GREEN}✓ Installation verified${NC}"
 
+echo -e "${YELLOW}[Step 10] Restarting Gunicorn and warming caches...${NC}"
+if systemctl is-active --quiet $GUNICORN_SERVICE; then
+    systemctl restart $GUNICORN_SERVICE
+    sleep 3
+    # Through the live site, so the shared cache files are written by www-data
+    $PYTHON_VERSION manage.py warm_caches --url $SITE_URL
+    echo -e "${GREEN}✓ Caches warmed${NC}"
+else
+    echo -e "${YELLOW}! $GUNICORN_SERVICE is not running - skipping cache warming${NC}"
+fi
+if systemctl is-active --quiet $APK_WORKER_SERVICE; then
+    systemctl restart $APK_WORKER_SERVICE
+    echo -e "${GREEN}✓ APK metadata worker restarted${NC}"
+fi
+
+echo -e "${YELLOW}[Step 11] Installing scheduled jobs...${NC}"
+cp jndroid.cron /etc/cron.d/jndroid
+chmod 644 /etc/cron.d/jndroid
+echo -e "${GREEN}✓ Cron jobs installed (flush_download_counts, recompute_rank_scores, ...)${NC}"
+
 echo ""
 echo "========================================="
 echo -e "${GREEN}✓ DEPLOYMENT COMPLETED!${NC}"
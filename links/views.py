@@ -12,6 +12,7 @@ from datetime import datetime
 from accounts.models import User
 from .models import Link, LinkCategory, LinkClick
 from .forms import LinkForm, LinkCategoryForm
+from core.pagination import paginate
 
 
 @login_required(login_url='accounts:login')
@@ -297,13 +298,10 @@ def admin_links_list(request):
     valid_sorts = ['-created_at', 'created_at', '-click_count', 'click_count', 'title', '-title']
     if sort_by not in valid_sorts:
         sort_by = '-created_at'
-    links = links.order_by(sort_by)
+    links = links.order_by(sort_by, '-id' if sort_by.startswith('-') else 'id')
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(links, 20)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Cursor pagination (20 links per page), ?page=N for page numbers
+    page_obj = paginate(request, links, 20)
     
     context = {
         'page_obj': page_obj,
@@ -0,0 +1,44 @@
+"""
+Django Management Command to reconcile App review aggregates with the reviews table
+Repairs drift in review_count, total_ratings, avg_rating and the star histogram
+(e.g. after raw SQL, fixtures loaded with --raw, or queryset.update() on ratings)
+Usage: python manage.py reconcile_review_stats [--batch-size 500] [--app ID ...]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.stats import reconcile_review_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized review counts, ratings and histograms on App'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Apps per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--app',
+            type=int,
+            nargs='+',
+            dest='app_ids',
+            help='Only reconcile these app IDs'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked, fixed = reconcile_review_stats(
+            batch_size=options['batch_size'],
+            app_ids=options['app_ids'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Checked {checked} app(s), fixed {fixed} in {elapsed:.2f}s'
+            )
+        )
@@ -0,0 +1,45 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_review_stats(apps, schema_editor):
+    """Populate the new App review aggregates from existing reviews"""
+    App = apps.get_model('apps', 'App')
+    Review = apps.get_model('reviews', 'Review')
+
+    histograms = {}
+    rows = Review.objects.order_by().values_list('app_id', 'rating').annotate(n=Count('id'))
+    for app_id, rating, n in rows:
+        stars = max(1, min(5, rating or 0))
+        histogram = histograms.setdefault(app_id, [0] * 6)
+        histogram[stars] += n
+
+    to_update = []
+    for app in App.objects.filter(id__in=histograms).only('id'):
+        histogram = histograms[app.id]
+        total = sum(histogram)
+        app.review_count = total
+        app.total_ratings = total
+        app.avg_rating = (
+            Decimal(sum(stars * histogram[stars] for stars in range(1, 6))) / total
+        ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        for stars in range(1, 6):
+            setattr(app, f'rating_count_{stars}', histogram[stars])
+        to_update.append(app)
+
+    fields = ['review_count', 'total_ratings', 'avg_rating'] + [f'rating_count_{s}' for s in range(1, 6)]
+    App.objects.bulk_update(to_update, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_review_approved_at_review_is_approved_and_more'),
+        ('apps', '0022_app_review_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
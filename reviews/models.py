@@ -1,6 +1,16 @@
 from django.conf import settings
 from django.db import models
 from apps.models import App
+from core.cache_tags import InvalidatingQuerySet, app_tag
+
+
+class ReviewQuerySet(InvalidatingQuerySet):
+    def cache_tags(self):
+        return {app_tag(app_id) for app_id in self.order_by().values_list('app_id', flat=True).distinct()}
+
+    def cache_tags_for(self, reviews):
+        return {app_tag(review.app_id) for review in reviews}
+
 
 class Review(models.Model):
     app = models.ForeignKey(App, on_delete=models.CASCADE, related_name="reviews")
@@ -16,6 +26,8 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True, blank=True)
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         unique_together = ("app", "user")  # one review per user per app
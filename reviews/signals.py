@@ -0,0 +1,55 @@
+"""
+Django signals for reviews app
+Keeps App review aggregates (review_count, avg_rating, histogram) in sync
+with Review writes - see reviews/stats.py - and bumps the app's cache tag
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache_tags import app_tag, bump_tags
+from .models import Review
+from .stats import apply_rating_delta
+
+
+def _snapshot(instance):
+    instance._stats_snapshot = (instance.app_id, instance.rating) if instance.pk else None
+
+
+@receiver(post_init, sender=Review)
+def review_loaded_handler(sender, instance, **kwargs):
+    """Remember the stored app/rating so updates can apply a delta"""
+    _snapshot(instance)
+
+
+@receiver(post_save, sender=Review)
+def review_saved_handler(sender, instance, created, raw=False, **kwargs):
+    """Apply a created/changed rating to the app's aggregates"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_stats_snapshot', None)
+    current = (instance.app_id, instance.rating)
+
+    if previous is None:
+        apply_rating_delta(instance.app_id, added=[instance.rating])
+    elif previous != current:
+        old_app_id, old_rating = previous
+        if old_app_id == instance.app_id:
+            apply_rating_delta(instance.app_id, added=[instance.rating], removed=[old_rating])
+        else:
+            apply_rating_delta(old_app_id, removed=[old_rating])
+            apply_rating_delta(instance.app_id, added=[instance.rating])
+    _snapshot(instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted_handler(sender, instance, **kwargs):
+    """Remove a deleted review from the app's aggregates"""
+    app_id, rating = getattr(instance, '_stats_snapshot', None) or (instance.app_id, instance.rating)
+    apply_rating_delta(app_id, removed=[rating])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_cache_tags_handler(sender, instance, **kwargs):
+    """Comment/approval changes show on the app page even when the rating is unchanged"""
+    bump_tags({app_tag(instance.app_id)})
@@ -0,0 +1,131 @@
+"""
+Review aggregates denormalized onto App.
+
+    review_count, total_ratings, avg_rating, rating_count_1 .. rating_count_5
+
+Review writes adjust the counters with a single UPDATE using F() expressions
+(see reviews/signals.py), so listings read plain columns instead of joining
+and grouping the review table. ``manage.py reconcile_review_stats``
+recomputes everything from the reviews table to repair drift.
+"""
+from collections import Counter, defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from apps.models import App
+from core.cache_tags import app_tag, bump_tags
+from .models import Review
+
+
+STARS = range(1, 6)
+
+
+def histogram_field(stars):
+    return f'rating_count_{stars}'
+
+
+def clamp_rating(rating):
+    return max(1, min(5, int(rating or 0)))
+
+
+def apply_rating_delta(app_id, added=(), removed=()):
+    """
+    Add/remove star ratings to an app's aggregates in one UPDATE.
+    avg_rating is recalculated in SQL from the (pre-update) histogram, so
+    concurrent reviews on the same app never overwrite each other.
+    Also clears rank_computed_at so the next rank recompute picks the app up.
+    The counters are quiet fields: no cache tag is bumped here (the review
+    signals bump the app's tag), so a review does not purge catalog pages.
+    """
+    added = [clamp_rating(rating) for rating in added]
+    removed = [clamp_rating(rating) for rating in removed]
+    bucket_delta = Counter(added)
+    bucket_delta.subtract(removed)
+    count_delta = len(added) - len(removed)
+    weighted_delta = sum(added) - sum(removed)
+
+    ratings = sum((F(histogram_field(stars)) for stars in STARS), Value(count_delta))
+    weighted = sum((F(histogram_field(stars)) * stars for stars in STARS), Value(weighted_delta))
+
+    updates = {
+        'review_count': F('review_count') + count_delta,
+        'total_ratings': ratings,
+        # Float division (0 when no ratings are left); the column rounds it to 2 places
+        'avg_rating': Coalesce(
+            Cast(weighted, FloatField()) / NullIf(Cast(ratings, FloatField()), Value(0.0)),
+            Value(0.0),
+        ),
+        'rank_computed_at': None,
+    }
+    for stars, delta in bucket_delta.items():
+        if delta:
+            updates[histogram_field(stars)] = F(histogram_field(stars)) + delta
+    return App.objects.filter(pk=app_id).update(**updates)
+
+
+def review_histograms(app_ids):
+    """{app_id: Counter({stars: n})} straight from the reviews table"""
+    histograms = defaultdict(Counter)
+    rows = (
+        Review.objects
+        .filter(app_id__in=app_ids)
+        .order_by()
+        .values_list('app_id', 'rating')
+        .annotate(n=Count('id'))
+    )
+    for app_id, rating, n in rows:
+        histograms[app_id][clamp_rating(rating)] += n
+    return histograms
+
+
+def stats_from_histogram(histogram):
+    total = sum(histogram.values())
+    weighted = sum(stars * n for stars, n in histogram.items())
+    stats = {
+        'review_count': total,
+        'total_ratings': total,
+        'avg_rating': (
+            (Decimal(weighted) / total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            if total else Decimal('0')
+        ),
+    }
+    for stars in STARS:
+        stats[histogram_field(stars)] = histogram.get(stars, 0)
+    return stats
+
+
+STAT_FIELDS = ['review_count', 'total_ratings', 'avg_rating'] + [histogram_field(stars) for stars in STARS]
+
+
+def reconcile_review_stats(batch_size=500, app_ids=None):
+    """
+    Recompute review aggregates from the reviews table in id batches and
+    write back only apps that drifted. Returns (checked, fixed).
+    """
+    queryset = App.objects.only('id', *STAT_FIELDS).order_by('id')
+    if app_ids is not None:
+        queryset = queryset.filter(id__in=app_ids)
+
+    checked = fixed = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        histograms = review_histograms([app.id for app in batch])
+        changed = []
+        for app in batch:
+            stats = stats_from_histogram(histograms.get(app.id, {}))
+            if any(float(getattr(app, field)) != float(value) for field, value in stats.items()):
+                for field, value in stats.items():
+                    setattr(app, field, value)
+                app.rank_computed_at = None
+                changed.append(app)
+        App.objects.bulk_update(changed, STAT_FIELDS + ['rank_computed_at'])
+        bump_tags(app_tag(app.id) for app in changed)  # quiet fields: bulk_update bumps nothing
+        checked += len(batch)
+        fixed += len(changed)
+        last_id = batch[-1].id
+    return checked, fixed
@@ -1,3 +1,100 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from apps.models import App
+from categories.models import Category
+from .models import Review
+from .stats import STAT_FIELDS, reconcile_review_stats
+
+
+# ==================== REVIEW STATS ====================
+
+class ReviewStatsTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        owner = User.objects.create_user(username='dev', password='secret-pass-123')
+        category = Category.objects.create(name='Tools', slug='tools')
+        self.app, self.other = (
+            App.objects.create(owner=owner, category=category, title=title, slug=title.lower(), is_published=True)
+            for title in ('Alpha', 'Beta')
+        )
+        self.users = [
+            User.objects.create_user(username=f'reader{n}', password='secret-pass-123')
+            for n in range(3)
+        ]
+
+    def review(self, user, rating, app=None):
+        return Review.objects.create(app=app or self.app, user=user, rating=rating, is_approved=True)
+
+    def assertStats(self, app, count, avg, histogram):
+        app.refresh_from_db()
+        self.assertEqual(app.review_count, count)
+        self.assertEqual(app.total_ratings, count)
+        self.assertEqual(app.avg_rating, Decimal(avg))
+        self.assertEqual(
+            [getattr(app, f'rating_count_{stars}') for stars in range(1, 6)],
+            histogram,
+        )
+
+    def test_create_adds_to_the_aggregates(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 4)
+        self.review(self.users[2], 4)
+        self.assertStats(self.app, 3, '4.33', [0, 0, 0, 2, 1])
+
+    def test_rating_edit_moves_the_review_between_buckets(self):
+        review = self.review(self.users[0], 5)
+        self.review(self.users[1], 3)
+        review.rating = 1
+        review.save()
+        self.assertStats(self.app, 2, '2.00', [1, 0, 1, 0, 0])
+
+    def test_edit_of_a_reloaded_review_applies_the_stored_rating(self):
+        self.review(self.users[0], 5)
+        review = Review.objects.get()
+        review.rating = 2
+        review.save()
+        self.assertStats(self.app, 1, '2.00', [0, 1, 0, 0, 0])
+
+    def test_comment_only_edit_leaves_the_aggregates_alone(self):
+        review = self.review(self.users[0], 4)
+        review.comment = 'Still good'
+        review.save()
+        self.assertStats(self.app, 1, '4.00', [0, 0, 0, 1, 0])
+
+    def test_moving_a_review_to_another_app(self):
+        review = self.review(self.users[0], 5)
+        review.app = self.other
+        review.save()
+        self.assertStats(self.app, 0, '0.00', [0, 0, 0, 0, 0])
+        self.assertStats(self.other, 1, '5.00', [0, 0, 0, 0, 1])
+
+    def test_delete_removes_the_rating(self):
+        self.review(self.users[0], 5)
+        review = self.review(self.users[1], 2)
+        review.delete()
+        self.assertStats(self.app, 1, '5.00', [0, 0, 0, 0, 1])
+
+    def test_reconcile_repairs_drift_only(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 3)
+        self.review(self.users[2], 4, app=self.other)
+        # Drift the first app behind the signals' back
+        App.objects.filter(pk=self.app.pk).update(review_count=7, rating_count_5=0, avg_rating=1)
+
+        self.assertEqual(reconcile_review_stats(batch_size=1), (2, 1))
+        self.assertStats(self.app, 2, '4.00', [0, 0, 1, 0, 1])
+        self.assertStats(self.other, 1, '4.00', [0, 0, 0, 1, 0])
+        self.assertIsNone(App.objects.get(pk=self.app.pk).rank_computed_at)
+
+        # Already consistent: nothing left to write
+        self.assertEqual(reconcile_review_stats(), (2, 0))
+
+    def test_reconcile_matches_the_signal_maintained_stats(self):
+        for user, rating in zip(self.users, (5, 4, 4)):
+            self.review(user, rating)
+        before = App.objects.values(*STAT_FIELDS).get(pk=self.app.pk)
+        reconcile_review_stats(app_ids=[self.app.pk])
+        self.assertEqual(App.objects.values(*STAT_FIELDS).get(pk=self.app.pk), before)
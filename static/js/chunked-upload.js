@@ -0,0 +1,120 @@
+// ==================== Chunked App Upload ====================
+// Sends the selected app file in ordered chunks (apps/chunked_upload.py)
+// before the form is submitted, so large APKs survive dropped connections:
+// the session id is remembered per file, and a retry - even after a page
+// reload - resumes from the offset the server reports. The form is then
+// submitted without the file, carrying only the finished upload session.
+
+document.addEventListener('DOMContentLoaded', function() {
+  const form = document.querySelector('form[data-chunked-upload]');
+  if (!form || !window.fetch) return;
+
+  const fileInput = form.querySelector('input[type="file"][name="apk_file"]');
+  const sessionInput = form.querySelector('input[name="upload_session"]');
+  const baseUrl = form.dataset.chunkedUpload;
+  const csrfToken = form.querySelector('input[name="csrfmiddlewaretoken"]').value;
+  const MAX_RETRIES = 5;
+  let uploading = false;
+
+  const status = document.createElement('div');
+  status.className = 'form-help chunked-upload-status';
+  fileInput.insertAdjacentElement('afterend', status);
+
+  function storageKey(file) {
+    return `jn_upload:${file.name}:${file.size}:${file.lastModified}`;
+  }
+
+  function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+  }
+
+  async function request(url, options) {
+    const response = await fetch(url, Object.assign({
+      credentials: 'same-origin',
+      headers: { 'X-CSRFToken': csrfToken, 'Content-Type': 'application/json' },
+    }, options));
+    const data = await response.json().catch(() => ({}));
+    return { ok: response.ok, status: response.status, data: data };
+  }
+
+  async function startSession(file) {
+    const saved = localStorage.getItem(storageKey(file));
+    if (saved) {
+      const existing = await request(`${baseUrl}${saved}/`, { method: 'GET' });
+      if (existing.ok) return existing.data;
+      localStorage.removeItem(storageKey(file));
+    }
+    const created = await request(baseUrl, {
+      method: 'POST',
+      body: JSON.stringify({ filename: file.name, size: file.size }),
+    });
+    if (!created.ok) throw new Error(created.data.error || 'Could not start the upload.');
+    localStorage.setItem(storageKey(file), created.data.id);
+    return created.data;
+  }
+
+  async function sendChunks(file, session) {
+    let offset = session.offset;
+    let retries = 0;
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + session.chunk_size);
+      status.textContent = `Uploading… ${Math.floor((offset / file.size) * 100)}%`;
+      let result;
+      try {
+        result = await request(`${baseUrl}${session.id}/chunk/?offset=${offset}`, {
+          method: 'POST',
+          headers: { 'X-CSRFToken': csrfToken, 'Content-Type': 'application/octet-stream' },
+          body: chunk,
+        });
+      } catch (error) {
+        result = { ok: false, status: 0, data: {} };  // network error
+      }
+      if (result.ok || (result.status === 409 && result.data.offset !== undefined)) {
+        offset = result.data.offset;  // 409: the server tells where to resume
+        retries = 0;
+        continue;
+      }
+      if ((result.status >= 400 && result.status < 500) || ++retries > MAX_RETRIES) {
+        throw new Error(result.data.error || 'Upload interrupted. Submit again to resume.');
+      }
+      await sleep(1000 * 2 ** retries);
+      const current = await request(`${baseUrl}${session.id}/`, { method: 'GET' }).catch(() => null);
+      if (current && current.ok) offset = current.data.offset;
+    }
+  }
+
+  async function upload(file) {
+    const session = await startSession(file);
+    if (session.status !== 'complete') {
+      await sendChunks(file, session);
+      status.textContent = 'Verifying…';
+      const done = await request(`${baseUrl}${session.id}/complete/`, { method: 'POST', body: '{}' });
+      if (!done.ok) throw new Error(done.data.error || 'Could not finish the upload.');
+    }
+    localStorage.removeItem(storageKey(file));
+    return session.id;
+  }
+
+  form.addEventListener('submit', function(event) {
+    const file = fileInput.files[0];
+    if (!file || uploading) {
+      if (uploading) event.preventDefault();
+      return;
+    }
+    event.preventDefault();
+    uploading = true;
+    upload(file)
+      .then((sessionId) => {
+        sessionInput.value = sessionId;
+        fileInput.value = '';
+        status.textContent = '✅ File uploaded';
+        HTMLFormElement.prototype.submit.call(form);
+      })
+      .catch((error) => {
+        status.textContent = `⚠️ ${error.message}`;
+      })
+      .finally(() => {
+        uploading = false;
+      });
+  });
+});
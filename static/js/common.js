@@ -17,14 +17,13 @@ function initHeaderFunctionality() {
     });
 
     // Close profile dropdown when clicking on a menu item
-    const menuItems = profileMenu.querySelectorAll('.profile-menu-item, button');
-    menuItems.forEach(item => {
-      item.addEventListener('click', () => {
-        // Only close if it's not a dropdown toggle button (theme toggle)
-        if (!item.classList.contains('theme-toggle-menu')) {
-          profileDropdown.classList.remove('active');
-        }
-      });
+    // (delegated: items inside [data-fragment] slots are replaced after load)
+    profileMenu.addEventListener('click', (e) => {
+      const item = e.target.closest('.profile-menu-item, button');
+      // Only close if it's not a dropdown toggle button (theme toggle)
+      if (item && !item.classList.contains('theme-toggle-menu')) {
+        profileDropdown.classList.remove('active');
+      }
     });
 
     // Close profile dropdown when clicking outside
@@ -50,7 +49,6 @@ function initBottomMenuFunctionality() {
   const bottomMenuModal = document.getElementById('bottomMenuModal');
   const bottomMenuClose = document.getElementById('bottomMenuClose');
   const bottomMenuOverlay = document.getElementById('bottomMenuOverlay');
-  const bottomMenuItems = document.querySelectorAll('.bottom-menu-item');
 
   if (!moreMenuBtn || !bottomMenuModal) return;
 
@@ -76,17 +74,11 @@ function initBottomMenuFunctionality() {
     bottomMenuOverlay.addEventListener('click', closeBottomMenu);
   }
 
-  // Close menu when clicking on a link/item
-  bottomMenuItems.forEach(item => {
-    item.addEventListener('click', closeBottomMenu);
-  });
-
-  // Also close menu when clicking form buttons in the menu
-  const bottomMenuForms = document.querySelectorAll('.bottom-menu-nav form');
-  bottomMenuForms.forEach(form => {
-    const submitBtn = form.querySelector('button[type="submit"]');
-    if (submitBtn) {
-      submitBtn.addEventListener('click', closeBottomMenu);
+  // Close menu when clicking on a link/item or a form button in the menu
+  // (delegated: items inside [data-fragment] slots are replaced after load)
+  bottomMenuModal.addEventListener('click', (e) => {
+    if (e.target.closest('.bottom-menu-item, .bottom-menu-nav form button[type="submit"]')) {
+      closeBottomMenu();
     }
   });
 
@@ -0,0 +1,34 @@
+// ==================== Page Fragments ====================
+// Shared (cached) pages render the anonymous version of the user menu,
+// messages and per-app actions. Visitors with a session or pending
+// messages (signalled by the jn_fragments cookie) fetch their own
+// versions here and swap them into the [data-fragment] slots.
+
+document.addEventListener('DOMContentLoaded', function() {
+  const config = document.getElementById('pageFragments');
+  if (!config) return;
+
+  const hasState = document.cookie.split('; ').some((cookie) => cookie.startsWith('jn_fragments='));
+  if (!hasState) return;
+
+  const url = new URL(config.dataset.url, window.location.origin);
+  if (config.dataset.app) {
+    url.searchParams.set('app', config.dataset.app);
+  }
+
+  fetch(url, { credentials: 'same-origin', headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+    .then((response) => (response.ok ? response.json() : null))
+    .then((data) => {
+      if (!data) return;
+      document.querySelectorAll('[data-fragment]').forEach((slot) => {
+        const html = data.fragments[slot.dataset.fragment];
+        if (html !== undefined) {
+          slot.innerHTML = html;
+        }
+      });
+      document.dispatchEvent(new CustomEvent('fragments:loaded', { detail: data }));
+    })
+    .catch(() => {
+      // Keep the anonymous fallback markup
+    });
+});
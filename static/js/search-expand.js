@@ -5,6 +5,7 @@
  */
 
 let searchTimeout; // Debounce টাইমার
+let lastRealtimeQuery = ''; // যে কোয়েরির রেজাল্ট এখন দেখানো হচ্ছে
 
 function initSearchExpandFunctionality() {
   const appSearch = document.querySelector('.app-search');
@@ -113,6 +114,7 @@ function performRealtimeSearch(query) {
 function displayRealtimeSearchResults(apps, query) {
   const overlay = document.getElementById('search-results-overlay');
   if (!overlay) return;
+  lastRealtimeQuery = query;
   
   let html = `<div>
     <div class="search-results-header">
@@ -122,7 +124,7 @@ function displayRealtimeSearchResults(apps, query) {
   
   apps.forEach(app => {
     html += `
-      <div class="search-result-card" onclick="window.location.href='/apps/${app.slug}/';">
+      <div class="search-result-card" onclick="openSearchResult('${app.slug}');">
         <img src="${app.icon}" alt="${app.title}" onerror="this.src='/static/images/default-app-icon.png'">
         <div class="search-result-content">
           <h4 class="search-result-title">${app.title}</h4>
@@ -143,6 +145,19 @@ function displayRealtimeSearchResults(apps, query) {
   overlay.style.display = 'flex';
 }
 
+/**
+ * রেজাল্ট খোলো - আর কোয়েরিটা চূড়ান্ত হিসেবে লগ করো (final=1)
+ * টাইপ করার সময়ের রিকোয়েস্টগুলো লগ হয় না, তাই জনপ্রিয় কোয়েরিতে প্রিফিক্স আসে না
+ * @param {string} slug - অ্যাপের slug
+ */
+function openSearchResult(slug) {
+  if (lastRealtimeQuery) {
+    fetch(`/apps/api/search/?q=${encodeURIComponent(lastRealtimeQuery)}&final=1`, { keepalive: true })
+      .catch(() => {});
+  }
+  window.location.href = `/apps/${slug}/`;
+}
+
 /**
  * কোনো রেজাল্ট না পাওয়া গেলে দেখাও
  * @param {string} query - সার্চ কোয়েরি